@@ -10,7 +10,7 @@ from typing import Sequence, Union
 
 from alembic import op
 
-from backend.database_models.seeders.studies_seeder import delete_studies, studies_seed
+from backend.database_models.seeders.studies_seeder import delete_studies
 
 # revision identifiers, used by Alembic.
 revision: str = "3cc2e22f0b6b"
@@ -20,7 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    studies_seed(op)
+    # Transcripts are loaded by the bulk importer only, see `make import-transcripts`
+    pass
 
 
 def downgrade() -> None:
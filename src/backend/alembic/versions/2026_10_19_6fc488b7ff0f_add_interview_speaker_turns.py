@@ -0,0 +1,114 @@
+"""add interview speaker_turns
+
+Revision ID: 6fc488b7ff0f
+Revises: 9d3e6b1a4c2f
+Create Date: 2026-10-19 15:12:40.301877
+
+"""
+import pathlib
+import re
+import zlib
+from collections import Counter
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from backend.config.settings import Settings
+
+# revision identifiers, used by Alembic.
+revision: str = '6fc488b7ff0f'
+down_revision: Union[str, None] = '9d3e6b1a4c2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of services/speaker_turns.py at this revision, with its default labels
+SPEAKER_LABEL = re.compile(
+    r"^[ \t]*(?P<speaker>[^\W\d_][\w.\-]{0,19}(?:[ \t][\w.\-]{1,20}){0,2})[ \t]*:",
+    re.MULTILINE,
+)
+MIN_LABEL_OCCURRENCES = 2
+INTERVIEWER_LABELS = {
+    label.casefold()
+    for label in (
+        "I",
+        "Int",
+        "Interviewer",
+        "Interviewerin",
+        "M",
+        "Mod",
+        "Moderator",
+        "Moderatorin",
+        "Moderation",
+    )
+}
+
+
+def decode_transcript(row) -> str:
+    # Frozen copy of the transcript storage backends of this revision
+    if row.storage_backend == "compressed":
+        return zlib.decompress(row.compressed_text).decode() if row.compressed_text else ""
+    if row.storage_backend == "file":
+        directory = pathlib.Path(Settings().transcript_storage.directory)
+        path = directory / row.content_hash[:2] / f"{row.content_hash}.txt"
+        return path.read_bytes().decode()
+    return row.inline_text or ""
+
+
+def split_speaker_turns(text: str) -> list[dict]:
+    labels = list(SPEAKER_LABEL.finditer(text))
+    counts = Counter(label["speaker"] for label in labels)
+    labels = [
+        label for label in labels if counts[label["speaker"]] >= MIN_LABEL_OCCURRENCES
+    ]
+
+    turns = []
+    for label, next_label in zip(labels, labels[1:] + [None]):
+        start = label.end()
+        end = next_label.start() if next_label is not None else len(text)
+        content = text[start:end]
+        stripped = content.strip()
+        if not stripped:
+            continue
+        start += len(content) - len(content.lstrip())
+        turns.append(
+            {
+                "speaker": label["speaker"],
+                "is_interviewer": label["speaker"].casefold() in INTERVIEWER_LABELS,
+                "start_pos": start,
+                "end_pos": start + len(stripped),
+            }
+        )
+
+    has_interviewer = any(turn["is_interviewer"] for turn in turns)
+    has_respondent = any(not turn["is_interviewer"] for turn in turns)
+    return turns if has_interviewer and has_respondent else []
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('interviews', sa.Column('speaker_turns', sa.JSON(), nullable=True))
+    # ### end Alembic commands ###
+
+    # Splits the existing transcripts into speaker turns
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text(
+            "SELECT id, storage_backend, content_hash, text AS inline_text, compressed_text "
+            "FROM interviews"
+        )
+    )
+    update = sa.text(
+        "UPDATE interviews SET speaker_turns = :speaker_turns WHERE id = :id"
+    ).bindparams(sa.bindparam("speaker_turns", type_=sa.JSON()))
+    for row in rows.fetchall():
+        connection.execute(
+            update,
+            {"speaker_turns": split_speaker_turns(decode_transcript(row)), "id": row.id},
+        )
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column('interviews', 'speaker_turns')
+    # ### end Alembic commands ###
@@ -0,0 +1,91 @@
+"""
+Benchmark of the authentication overhead per request.
+
+Compares the previous dependencies, which decoded the bearer token with a new
+`JWTService` in `validate_authorization` and again in every
+`get_header_user_id`, with the request-scoped auth context. Both include the
+blacklist query, against an in-memory SQLite database.
+
+    AUTH_SECRET_KEY=... python -m backend.benchmarks.auth [--requests 2000]
+"""
+
+import argparse
+import os
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database_models import Blacklist
+from backend.services.auth.jwt import JWTService
+from backend.services.auth.request_validators import validate_authorization
+from backend.services.auth.utils import get_header_user_id
+
+
+def get_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/v1/conversations",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def previous_dependencies(request: Request, session: Session, user_id_calls: int) -> str:
+    _, token = request.headers["Authorization"].split(" ")
+    decoded = JWTService().decode_jwt(token)
+    session.query(Blacklist).filter(Blacklist.token_id == decoded["jti"]).first()
+
+    user_id = ""
+    for _ in range(user_id_calls):
+        _, token = request.headers["Authorization"].split(" ")
+        user_id = JWTService().decode_jwt(token)["context"]["id"]
+    return user_id
+
+
+def request_scoped_dependencies(
+    request: Request, session: Session, user_id_calls: int
+) -> str:
+    validate_authorization(request, session)
+
+    user_id = ""
+    for _ in range(user_id_calls):
+        user_id = get_header_user_id(request)
+    return user_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    # E.g. validate_user_header, validate_chat_request and the handler
+    parser.add_argument("--user-id-calls", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AUTH_SECRET_KEY", "benchmark")
+    token = JWTService().create_and_encode_jwt({"id": "benchmark-user"})
+
+    engine = create_engine("sqlite://")
+    Blacklist.__table__.create(engine)
+
+    print(
+        f"Auth overhead of {args.requests} requests,"
+        f" {args.user_id_calls} user ID lookups each"
+    )
+    with Session(engine) as session:
+        for name, dependencies in (
+            ("previous", previous_dependencies),
+            ("request-scoped", request_scoped_dependencies),
+        ):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                user_id = dependencies(get_request(token), session, args.user_id_calls)
+                assert user_id == "benchmark-user"
+            microseconds = (time.perf_counter() - start) * 1e6 / args.requests
+            print(f"  {name:<16} {microseconds:>8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
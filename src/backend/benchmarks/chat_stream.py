@@ -0,0 +1,153 @@
+"""
+Benchmark of accumulating streamed chat responses.
+
+Compares the previous accumulator, which appended every text delta to a string
+in a dict and round-tripped the end event through JSON, with
+`StreamAccumulator`, and measures the full streamed and non-streamed chat
+paths on responses of 4k tokens, without a database or TGI.
+
+    python -m backend.benchmarks.chat_stream [--tokens 4096] [--responses 50]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator
+from uuid import uuid4
+
+from backend.schemas.chat import FinishReason, StreamEnd, StreamEvent
+from backend.schemas.citation import Citation, CitationList
+from backend.services.chat import (
+    StreamAccumulator,
+    generate_chat_response,
+    generate_chat_stream,
+)
+
+TOKENS = ["Die", " Befragte", " erzählt", " von", " ihrer", " Arbeit", ".", "\n"]
+
+
+class BenchmarkMessage:
+    """Stand-in for the response message, the benchmark doesn't store anything."""
+
+    def __init__(self):
+        self.id = str(uuid4())
+        self.text = ""
+        self.generation_id = None
+        self.finish_reason = None
+
+
+def get_events(tokens: int, interviews: int = 8) -> list[dict[str, Any]]:
+    events: list[dict[str, Any]] = [
+        {"event_type": StreamEvent.STREAM_START, "generation_id": ""}
+    ]
+    for i in range(interviews):
+        events.append(
+            {
+                "event_type": StreamEvent.SEARCH_RESULTS,
+                "interview_id": str(i),
+                "search_results": CitationList(
+                    zitate=[
+                        Citation(
+                            erklaerung="Beschreibt die Dauer der Anstellung.",
+                            text="Ich arbeite seit zehn Jahren dort.",
+                            bewertung=0.9,
+                        )
+                    ]
+                    * 5
+                ),
+            }
+        )
+    for i in range(tokens):
+        events.append(
+            {"event_type": StreamEvent.TEXT_GENERATION, "text": TOKENS[i % len(TOKENS)]}
+        )
+    events.append(
+        {"event_type": StreamEvent.STREAM_END, "finish_reason": FinishReason.COMPLETE}
+    )
+    return events
+
+
+def accumulate_previous(events: list[dict[str, Any]], message_id: str) -> StreamEnd:
+    stream_end_data: dict[str, Any] = {
+        "message_id": message_id,
+        "conversation_id": "benchmark",
+        "text": "",
+        "search_results": {},
+    }
+    for event in events:
+        event_type = event["event_type"]
+        if event_type == StreamEvent.TEXT_GENERATION:
+            stream_end_data["text"] += event["text"]
+        elif event_type == StreamEvent.SEARCH_RESULTS:
+            stream_end_data["search_results"][event["interview_id"]] = event[
+                "search_results"
+            ]
+        elif event_type == StreamEvent.STREAM_START:
+            stream_end_data["generation_id"] = event["generation_id"]
+        elif event_type == StreamEvent.STREAM_END:
+            end_event = json.loads(
+                json.dumps(
+                    event,
+                    default=lambda o: o.__dict__ if hasattr(o, "__dict__") else str(o),
+                )
+            )
+            stream_end_data["chat_history"] = end_event.get("response", {}).get(
+                "chat_history", []
+            )
+            return StreamEnd.model_validate(event | stream_end_data)
+    raise ValueError("The stream has no end event.")
+
+
+def accumulate(events: list[dict[str, Any]], message_id: str) -> StreamEnd:
+    accumulator = StreamAccumulator(message_id, "benchmark")
+    for event in events:
+        accumulator.add(event)
+    return accumulator.to_stream_end()
+
+
+async def replay(events: list[dict[str, Any]]) -> AsyncGenerator[Any, Any]:
+    for event in events:
+        yield dict(event)
+
+
+async def stream_response(events: list[dict[str, Any]]) -> None:
+    async for _ in generate_chat_stream(
+        None, replay(events), BenchmarkMessage(), "benchmark", "benchmark", False
+    ):
+        pass
+
+
+async def complete_response(events: list[dict[str, Any]]) -> None:
+    await generate_chat_response(
+        None, replay(events), BenchmarkMessage(), "benchmark", "benchmark", False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=4096)
+    parser.add_argument("--responses", type=int, default=50)
+    args = parser.parse_args()
+
+    events = get_events(args.tokens)
+
+    print(f"Accumulation of {args.responses} responses of {args.tokens} tokens")
+    for name, function in (("previous", accumulate_previous), ("accumulator", accumulate)):
+        start = time.perf_counter()
+        for _ in range(args.responses):
+            function(events, "benchmark")
+        milliseconds = (time.perf_counter() - start) * 1000 / args.responses
+        print(f"  {name:<12} {milliseconds:>8.2f} ms/response")
+
+    print("\nChat paths")
+    for name, function in (("stream", stream_response), ("complete", complete_response)):
+        start = time.perf_counter()
+        for _ in range(args.responses):
+            asyncio.run(function(events))
+        milliseconds = (time.perf_counter() - start) * 1000 / args.responses
+        print(f"  {name:<12} {milliseconds:>8.2f} ms/response")
+
+
+if __name__ == "__main__":
+    main()
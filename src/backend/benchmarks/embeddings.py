@@ -0,0 +1,112 @@
+"""
+Relevance and CPU throughput benchmark of the dense embedding index.
+
+Compares BM25, dense and hybrid retrieval on the labelled sample of the text
+analysis benchmark, and measures how fast chunks are embedded and how many
+queries per second the memory-mapped index answers at different batch sizes.
+Requires sentence-transformers (`poetry install --with dense`).
+
+    python -m backend.benchmarks.embeddings [--transcripts /data/transcripts]
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+from backend.benchmarks.text_analysis import (
+    SAMPLE_PASSAGES,
+    SAMPLE_QUERIES,
+    load_chunks,
+)
+from backend.schemas.interview import InterviewChunk
+from backend.services.embeddings import DenseIndex, EmbeddingModel
+from backend.services.search_index import build_study_index
+from backend.services.text_analysis import TextAnalyzer
+
+
+def to_chunks(texts: list[str], analyzer: TextAnalyzer) -> list[InterviewChunk]:
+    return [
+        InterviewChunk(
+            interview_id=str(i),
+            original_text=text,
+            start_pos=0,
+            end_pos=len(text),
+            bm25_tokens=tokens,
+        )
+        for i, (text, tokens) in enumerate(zip(texts, analyzer.analyze_corpus(texts)))
+    ]
+
+
+def mean_reciprocal_rank(model: EmbeddingModel, dense_weight: float) -> float:
+    analyzer = TextAnalyzer()
+    chunks = to_chunks(SAMPLE_PASSAGES, analyzer)
+    index = build_study_index("benchmark", chunks)
+    index.dense = DenseIndex(
+        "benchmark", model.model_name, "", model.embed(SAMPLE_PASSAGES)
+    )
+    query_vectors = model.embed([query for query, _ in SAMPLE_QUERIES])
+
+    reciprocal_ranks = []
+    for (query, relevant), query_vector in zip(SAMPLE_QUERIES, query_vectors):
+        results = index.search(
+            index.analyze_query(query),
+            k=len(chunks),
+            query_embedding=query_vector if dense_weight > 0 else None,
+            dense_weight=dense_weight,
+        )
+        ranking = [int(chunk.interview_id) for chunk, _ in results]
+        hit = relevant in ranking
+        reciprocal_ranks.append(1 / (ranking.index(relevant) + 1) if hit else 0.0)
+
+    return sum(reciprocal_ranks) / len(reciprocal_ranks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", default="/data/transcripts")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--model", default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    )
+    parser.add_argument("--queries", type=int, default=256)
+    args = parser.parse_args()
+
+    model = EmbeddingModel(args.model)
+
+    print("Relevance (MRR on the labelled sample)")
+    for name, dense_weight in (("bm25", 0.0), ("hybrid", 0.5), ("dense", 1.0)):
+        print(f"  {name:<8} {mean_reciprocal_rank(model, dense_weight):.3f}")
+
+    chunks = load_chunks(pathlib.Path(args.transcripts), args.limit)
+    start = time.perf_counter()
+    vectors = model.embed(chunks)
+    seconds = time.perf_counter() - start
+    print(f"\nIndex build: {len(chunks)} chunks in {seconds:.1f}s")
+    print(f"  {len(chunks) / seconds:.1f} chunks/s, {vectors.shape[1]} dimensions")
+
+    queries = [query for query, _ in SAMPLE_QUERIES]
+    queries = (queries * (args.queries // len(queries) + 1))[: args.queries]
+    start = time.perf_counter()
+    query_vectors = model.embed(queries)
+    seconds = time.perf_counter() - start
+    print(f"\nQuery embedding: {len(queries) / seconds:.1f} queries/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "embeddings.npy"
+        np.save(path, vectors)
+        index = DenseIndex("benchmark", model.model_name, "", np.load(path, mmap_mode="r"))
+
+        print(f"\nTop-10 search on the memory-mapped index ({len(chunks)} chunks)")
+        for batch_size in (1, 16, 64):
+            start = time.perf_counter()
+            for batch_start in range(0, len(query_vectors), batch_size):
+                index.search(query_vectors[batch_start : batch_start + batch_size], k=10)
+            seconds = time.perf_counter() - start
+            print(f"  batch size {batch_size:>3}: {len(query_vectors) / seconds:>10.0f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Relevance and throughput benchmark of the BM25 text analysis.
+
+Compares the bm25s default tokenizer (English stopwords, no stemming) with the
+German analysis pipeline on a small labelled sample, and measures tokenization
+throughput on transcripts.
+
+    python -m backend.benchmarks.text_analysis [--transcripts /data/transcripts]
+"""
+
+import argparse
+import pathlib
+import time
+
+import bm25s
+
+from backend.services.chunking import chunk_text
+from backend.services.text_analysis import TextAnalyzer
+
+SAMPLE_PASSAGES = [
+    "B: Morgens brauche ich erst mal meinen Kaffee, ohne die Kaffeemaschine geht bei uns gar nichts.",
+    "B: Beim Einkaufen achte ich schon auf die Preise, gerade bei Lebensmitteln ist alles teurer geworden.",
+    "B: Die Werbung im Fernsehen schaue ich eigentlich nie, da schalte ich immer um.",
+    "B: Auf der Arbeit sitze ich den ganzen Tag am Schreibtisch, mein Arbeitsplatz ist ziemlich ungemütlich.",
+    "B: Mit den Kindern fahren wir jedes Jahr an die Ostsee, die Urlaubsplanung macht meine Frau.",
+    "B: Ich kaufe fast nur noch Bioprodukte, weil mir die Umwelt wichtig ist.",
+    "B: Das Handy habe ich eigentlich immer dabei, vor allem für Nachrichten und soziale Netzwerke.",
+    "B: Beim Auto ist mir die Marke egal, Hauptsache es fährt zuverlässig.",
+]
+
+SAMPLE_QUERIES = [
+    ("Welche Rolle spielen Kaffeemaschinen?", 0),
+    ("Wie wichtig sind Preise beim Lebensmitteleinkauf?", 1),
+    ("Was halten die Befragten von Fernsehwerbung?", 2),
+    ("Wie wird der Arbeitsplatz beschrieben?", 3),
+    ("Wer plant den Urlaub?", 4),
+    ("Welche Bedeutung hat Umweltschutz beim Kauf?", 5),
+    ("Wofür wird das Smartphone genutzt? Nachricht", 6),
+    ("Spielen Automarken eine Rolle?", 7),
+]
+
+
+def mean_reciprocal_rank(tokenize, analyze_query) -> float:
+    corpus_tokens = tokenize(SAMPLE_PASSAGES)
+    retriever = bm25s.BM25()
+    retriever.index(corpus_tokens, show_progress=False)
+
+    reciprocal_ranks = []
+    for query, relevant in SAMPLE_QUERIES:
+        scores = retriever.get_scores(analyze_query(query, retriever.vocab_dict))
+        ranking = list(scores.argsort()[::-1])
+        hit = scores[relevant] > 0
+        reciprocal_ranks.append(1 / (ranking.index(relevant) + 1) if hit else 0.0)
+
+    return sum(reciprocal_ranks) / len(reciprocal_ranks)
+
+
+def load_chunks(transcripts: pathlib.Path, limit: int) -> list[str]:
+    texts = [path.read_text() for path in sorted(transcripts.glob("*/*.txt"))[:limit]]
+    if not texts:
+        # Number the sample passages so every chunk is distinct for the token cache
+        texts = [
+            "\n\n".join(
+                f"{passage} Interview {i} Absatz {j}"
+                for j in range(50)
+                for passage in SAMPLE_PASSAGES
+            )
+            for i in range(limit)
+        ]
+
+    return [
+        text[start:end] for text in texts for start, end in chunk_text(text)
+    ]
+
+
+def throughput(name: str, tokenize, chunks: list[str]) -> None:
+    start = time.perf_counter()
+    tokens = tokenize(chunks)
+    seconds = time.perf_counter() - start
+    num_tokens = sum(len(chunk_tokens) for chunk_tokens in tokens)
+    megabytes = sum(len(chunk) for chunk in chunks) / 1e6
+    print(
+        f"{name:<28} {len(chunks) / seconds:>10.0f} chunks/s "
+        f"{megabytes / seconds:>7.2f} MB/s {num_tokens:>10} tokens"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transcripts", default="/data/transcripts")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    def default_tokenize(texts):
+        return bm25s.tokenize(texts, return_ids=False, show_progress=False)
+
+    def default_query(query, _):
+        return default_tokenize([query])[0]
+
+    analyzer = TextAnalyzer()
+
+    print("Relevance (MRR on the labelled sample)")
+    print(f"  bm25s default: {mean_reciprocal_rank(default_tokenize, default_query):.3f}")
+    print(
+        f"  german:        {mean_reciprocal_rank(analyzer.analyze_corpus, analyzer.analyze):.3f}"
+    )
+
+    chunks = load_chunks(pathlib.Path(args.transcripts), args.limit)
+    print(f"\nThroughput on {len(chunks)} chunks")
+    throughput("bm25s default", default_tokenize, chunks)
+    throughput("german (cold cache)", analyzer.analyze_corpus, chunks)
+    throughput("german (warm cache)", analyzer.analyze_corpus, chunks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import argparse
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from backend.config.settings import Settings
+from backend.services.transcript_storage import DEFAULT_GC_MIN_AGE, collect_garbage
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Delete the transcript files of deleted or re-imported interviews."
+    )
+    parser.add_argument("--min-age", type=float, default=DEFAULT_GC_MIN_AGE)
+    parser.add_argument("--database-url", default=Settings().database.url)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as connection:
+        deleted = collect_garbage(connection, args.min_age)
+
+    print(f"[Transcripts] Deleted {deleted} unreferenced transcript files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import pathlib
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from backend.config.settings import Settings
+from backend.services.transcript_import import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_TRANSCRIPTS_DIR,
+    import_transcripts,
+)
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import interview transcripts, one folder per study."
+    )
+    parser.add_argument("--root", default=DEFAULT_TRANSCRIPTS_DIR)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--database-url", default=Settings().database.url)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    with engine.connect() as connection:
+        stats = import_transcripts(
+            connection,
+            pathlib.Path(args.root),
+            batch_size=args.batch_size,
+            max_workers=args.workers,
+        )
+
+    print(f"[Import] {stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from backend.config.settings import Settings
 from backend.services.auth import BasicAuthentication, GoogleOAuth, OpenIDConnect
+from backend.services.auth.well_known import well_known_cache
 
 load_dotenv()
 
@@ -64,3 +65,13 @@ async def get_auth_strategy_endpoints() -> None:
     for strategy in ENABLED_AUTH_STRATEGY_MAPPING.values():
         if hasattr(strategy, "get_endpoints"):
             await strategy.get_endpoints()
+
+
+async def close_auth_strategies() -> None:
+    """
+    Closes the connections of each enabled strategy to its provider.
+    """
+    for strategy in ENABLED_AUTH_STRATEGY_MAPPING.values():
+        if hasattr(strategy, "close"):
+            await strategy.close()
+    await well_known_cache.close()
@@ -24,6 +24,7 @@ class RouterName(StrEnum):
     DEFAULT_AGENT = "default_agent"
     SNAPSHOT = "snapshot"
     STUDY = "study"
+    PERSONA_INTERVIEW = "persona_interview"
 
 
 # Router dependency mappings
@@ -117,4 +118,14 @@ ROUTER_DEPENDENCIES = {
             Depends(validate_authorization),
         ],
     },
+    RouterName.PERSONA_INTERVIEW: {
+        "default": [
+            Depends(get_session),
+            Depends(validate_user_header),
+        ],
+        "auth": [
+            Depends(get_session),
+            Depends(validate_authorization),
+        ],
+    },
 }
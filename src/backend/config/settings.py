@@ -89,6 +89,18 @@ class AuthSettings(BaseSettings):
         default=None,
         validation_alias=AliasChoices("NEXT_PUBLIC_API_HOSTNAME", "backend_hostname"),
     )
+    # Threads that hash and check passwords, so logins don't block the event loop
+    password_hash_workers: Optional[int] = Field(
+        default=4,
+        validation_alias=AliasChoices(
+            "AUTH_PASSWORD_HASH_WORKERS", "password_hash_workers"
+        ),
+    )
+    # Seconds the OAuth discovery documents are cached
+    well_known_ttl: Optional[float] = Field(
+        default=3600.0,
+        validation_alias=AliasChoices("AUTH_WELL_KNOWN_TTL", "well_known_ttl"),
+    )
     oidc: Optional[OIDCSettings] = Field(default=OIDCSettings())
     google_oauth: Optional[GoogleOAuthSettings] = Field(default=GoogleOAuthSettings())
     scim: Optional[SCIMAuth] = Field(default=SCIMAuth())
@@ -148,7 +160,357 @@ class GoogleCloudSettings(BaseSettings):
 class DeploymentSettings(BaseSettings):
     model_config = SETTINGS_CONFIG
     default_deployment: Optional[str] = None
-    enabled_deployments: Optional[List[str]] = None
+    # Base URLs of the TGI replicas
+    enabled_deployments: Optional[List[str]] = Field(
+        default=["http://tgi:80"],
+        validation_alias=AliasChoices(
+            "DEPLOYMENTS_ENABLED_DEPLOYMENTS", "enabled_deployments"
+        ),
+    )
+    health_check_interval: Optional[float] = Field(
+        default=10.0,
+        validation_alias=AliasChoices(
+            "DEPLOYMENTS_HEALTH_CHECK_INTERVAL", "health_check_interval"
+        ),
+    )
+    # Outstanding tokens a replica may be ahead of the least loaded one and still keep its sessions
+    affinity_slack_tokens: Optional[int] = Field(
+        default=4096,
+        validation_alias=AliasChoices(
+            "DEPLOYMENTS_AFFINITY_SLACK_TOKENS", "affinity_slack_tokens"
+        ),
+    )
+
+
+class IngestionSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    upload_dir: Optional[str] = Field(
+        default="/data/uploads",
+        validation_alias=AliasChoices("INGESTION_UPLOAD_DIR", "upload_dir"),
+    )
+    index_dir: Optional[str] = Field(
+        default="/data/indexes",
+        validation_alias=AliasChoices("INGESTION_INDEX_DIR", "index_dir"),
+    )
+    upload_chunk_size: Optional[int] = Field(
+        default=1024 * 1024,
+        validation_alias=AliasChoices(
+            "INGESTION_UPLOAD_CHUNK_SIZE", "upload_chunk_size"
+        ),
+    )
+    max_workers: Optional[int] = Field(
+        default=2,
+        validation_alias=AliasChoices("INGESTION_MAX_WORKERS", "max_workers"),
+    )
+
+
+class TitleGenerationSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    batch_size: Optional[int] = Field(
+        default=16,
+        validation_alias=AliasChoices("TITLE_GENERATION_BATCH_SIZE", "batch_size"),
+    )
+    # Seconds to wait for more conversations before a batch is generated
+    max_wait: Optional[float] = Field(
+        default=2.0,
+        validation_alias=AliasChoices("TITLE_GENERATION_MAX_WAIT", "max_wait"),
+    )
+    max_new_tokens: Optional[int] = Field(
+        default=24,
+        validation_alias=AliasChoices(
+            "TITLE_GENERATION_MAX_NEW_TOKENS", "max_new_tokens"
+        ),
+    )
+
+
+class PersonaInterviewSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    # Personas of a job that are interviewed at the same time
+    max_concurrency: Optional[int] = Field(
+        default=8,
+        validation_alias=AliasChoices(
+            "PERSONA_INTERVIEW_MAX_CONCURRENCY", "max_concurrency"
+        ),
+    )
+    max_personas: Optional[int] = Field(
+        default=100,
+        validation_alias=AliasChoices("PERSONA_INTERVIEW_MAX_PERSONAS", "max_personas"),
+    )
+    max_questions: Optional[int] = Field(
+        default=50,
+        validation_alias=AliasChoices(
+            "PERSONA_INTERVIEW_MAX_QUESTIONS", "max_questions"
+        ),
+    )
+    # Seconds the progress of a finished job is kept
+    retention: Optional[float] = Field(
+        default=86400.0,
+        validation_alias=AliasChoices("PERSONA_INTERVIEW_RETENTION", "retention"),
+    )
+
+
+class UserCacheSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    # Seconds a known user ID is cached
+    ttl: Optional[float] = Field(
+        default=300.0,
+        validation_alias=AliasChoices("USER_CACHE_TTL", "ttl"),
+    )
+    # Seconds an unknown user ID is cached
+    negative_ttl: Optional[float] = Field(
+        default=30.0,
+        validation_alias=AliasChoices("USER_CACHE_NEGATIVE_TTL", "negative_ttl"),
+    )
+    max_size: Optional[int] = Field(
+        default=10000,
+        validation_alias=AliasChoices("USER_CACHE_MAX_SIZE", "max_size"),
+    )
+
+
+class RetrievalSessionSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    # Conversations whose parsed interviews are kept in memory
+    max_sessions: Optional[int] = Field(
+        default=64,
+        validation_alias=AliasChoices("RETRIEVAL_SESSION_MAX_SESSIONS", "max_sessions"),
+    )
+    # Seconds an idle session is kept
+    ttl: Optional[float] = Field(
+        default=1800.0,
+        validation_alias=AliasChoices("RETRIEVAL_SESSION_TTL", "ttl"),
+    )
+    # Study indexes kept loaded in each compute worker
+    max_indexes: Optional[int] = Field(
+        default=8,
+        validation_alias=AliasChoices("RETRIEVAL_SESSION_MAX_INDEXES", "max_indexes"),
+    )
+
+
+class CompletionCacheSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    # Generations use a fixed seed, so identical prompts can be answered from Redis
+    enabled: Optional[bool] = Field(
+        default=False,
+        validation_alias=AliasChoices("COMPLETION_CACHE_ENABLED", "enabled"),
+    )
+    # Agents whose chat completions are cached
+    agents: Optional[List[str]] = Field(
+        default=["basic"],
+        validation_alias=AliasChoices("COMPLETION_CACHE_AGENTS", "agents"),
+    )
+    cache_titles: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices("COMPLETION_CACHE_CACHE_TITLES", "cache_titles"),
+    )
+    # Seconds a completion is cached
+    ttl: Optional[int] = Field(
+        default=86400,
+        validation_alias=AliasChoices("COMPLETION_CACHE_TTL", "ttl"),
+    )
+    # Part of the cache key, change it when the served model changes
+    model: Optional[str] = Field(
+        default="tgi",
+        validation_alias=AliasChoices("COMPLETION_CACHE_MODEL", "model"),
+    )
+
+
+class StreamBufferSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    max_events: Optional[int] = Field(
+        default=4096,
+        validation_alias=AliasChoices("STREAM_BUFFER_MAX_EVENTS", "max_events"),
+    )
+    # Seconds a response keeps generating without a connected client, this is
+    # the only point where a disconnect cancels the generation, 0 cancels it
+    # as soon as the last client disconnects
+    resume_grace_period: Optional[float] = Field(
+        default=30.0,
+        validation_alias=AliasChoices(
+            "STREAM_BUFFER_RESUME_GRACE_PERIOD", "resume_grace_period"
+        ),
+    )
+    # Seconds a finished response can still be resumed
+    retention: Optional[float] = Field(
+        default=60.0,
+        validation_alias=AliasChoices("STREAM_BUFFER_RETENTION", "retention"),
+    )
+
+
+class SchedulerSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    max_in_flight: Optional[int] = Field(
+        default=4,
+        validation_alias=AliasChoices("SCHEDULER_MAX_IN_FLIGHT", "max_in_flight"),
+    )
+    # Token buckets count LLM calls, refilled at `rate` calls per second
+    user_rate: Optional[float] = Field(
+        default=1.0,
+        validation_alias=AliasChoices("SCHEDULER_USER_RATE", "user_rate"),
+    )
+    user_burst: Optional[int] = Field(
+        default=20,
+        validation_alias=AliasChoices("SCHEDULER_USER_BURST", "user_burst"),
+    )
+    agent_rates: Optional[dict[str, float]] = Field(
+        default={},
+        validation_alias=AliasChoices("SCHEDULER_AGENT_RATES", "agent_rates"),
+    )
+    agent_burst: Optional[int] = Field(
+        default=100,
+        validation_alias=AliasChoices("SCHEDULER_AGENT_BURST", "agent_burst"),
+    )
+
+
+class ComputeSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    max_workers: Optional[int] = Field(
+        default=2,
+        validation_alias=AliasChoices("COMPUTE_MAX_WORKERS", "max_workers"),
+    )
+    max_pending: Optional[int] = Field(
+        default=8,
+        validation_alias=AliasChoices("COMPUTE_MAX_PENDING", "max_pending"),
+    )
+
+
+class SearchSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    language: Optional[str] = Field(
+        default="german",
+        validation_alias=AliasChoices("SEARCH_LANGUAGE", "language"),
+    )
+    remove_stopwords: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices("SEARCH_REMOVE_STOPWORDS", "remove_stopwords"),
+    )
+    stemming: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices("SEARCH_STEMMING", "stemming"),
+    )
+    compound_splitting: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices(
+            "SEARCH_COMPOUND_SPLITTING", "compound_splitting"
+        ),
+    )
+    min_compound_part_length: Optional[int] = Field(
+        default=4,
+        validation_alias=AliasChoices(
+            "SEARCH_MIN_COMPOUND_PART_LENGTH", "min_compound_part_length"
+        ),
+    )
+    token_cache_size: Optional[int] = Field(
+        default=50_000,
+        validation_alias=AliasChoices("SEARCH_TOKEN_CACHE_SIZE", "token_cache_size"),
+    )
+    study_top_k: Optional[int] = Field(
+        default=40,
+        validation_alias=AliasChoices("SEARCH_STUDY_TOP_K", "study_top_k"),
+    )
+    passages_per_call: Optional[int] = Field(
+        default=10,
+        validation_alias=AliasChoices(
+            "SEARCH_PASSAGES_PER_CALL", "passages_per_call"
+        ),
+    )
+    max_new_tokens: Optional[int] = Field(
+        default=1024,
+        validation_alias=AliasChoices("SEARCH_MAX_NEW_TOKENS", "max_new_tokens"),
+    )
+    dense_retrieval: Optional[bool] = Field(
+        default=False,
+        validation_alias=AliasChoices("SEARCH_DENSE_RETRIEVAL", "dense_retrieval"),
+    )
+    embedding_model: Optional[str] = Field(
+        default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        validation_alias=AliasChoices("SEARCH_EMBEDDING_MODEL", "embedding_model"),
+    )
+    embedding_batch_size: Optional[int] = Field(
+        default=32,
+        validation_alias=AliasChoices(
+            "SEARCH_EMBEDDING_BATCH_SIZE", "embedding_batch_size"
+        ),
+    )
+    dense_weight: Optional[float] = Field(
+        default=0.5,
+        validation_alias=AliasChoices("SEARCH_DENSE_WEIGHT", "dense_weight"),
+    )
+    # Index and search only what respondents said, if a transcript has speaker labels
+    respondent_turns_only: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices(
+            "SEARCH_RESPONDENT_TURNS_ONLY", "respondent_turns_only"
+        ),
+    )
+    # Speaker labels of interviewers and moderators, case-insensitive
+    interviewer_labels: Optional[List[str]] = Field(
+        default=[
+            "I",
+            "Int",
+            "Interviewer",
+            "Interviewerin",
+            "M",
+            "Mod",
+            "Moderator",
+            "Moderatorin",
+            "Moderation",
+        ],
+        validation_alias=AliasChoices(
+            "SEARCH_INTERVIEWER_LABELS", "interviewer_labels"
+        ),
+    )
+    # Skip the LLM pass over interviews whose best BM25 chunk score is too low
+    relevance_gate: Optional[bool] = Field(
+        default=True,
+        validation_alias=AliasChoices("SEARCH_RELEVANCE_GATE", "relevance_gate"),
+    )
+    relevance_threshold: Optional[float] = Field(
+        default=0.0,
+        validation_alias=AliasChoices(
+            "SEARCH_RELEVANCE_THRESHOLD", "relevance_threshold"
+        ),
+    )
+    # Citations with at least top_k_min_score that end a top-K search
+    top_k: Optional[int] = Field(
+        default=10,
+        validation_alias=AliasChoices("SEARCH_TOP_K", "top_k"),
+    )
+    top_k_min_score: Optional[float] = Field(
+        default=0.8,
+        validation_alias=AliasChoices("SEARCH_TOP_K_MIN_SCORE", "top_k_min_score"),
+    )
+    # Seconds after which a top-K search makes no more LLM calls
+    top_k_time_budget: Optional[float] = Field(
+        default=60.0,
+        validation_alias=AliasChoices(
+            "SEARCH_TOP_K_TIME_BUDGET", "top_k_time_budget"
+        ),
+    )
+    # Most promising interviews searched with the LLM, 0 for no limit
+    max_searched_interviews: Optional[int] = Field(
+        default=0,
+        validation_alias=AliasChoices(
+            "SEARCH_MAX_SEARCHED_INTERVIEWS", "max_searched_interviews"
+        ),
+    )
+
+
+class TranscriptStorageSettings(BaseSettings):
+    model_config = SETTINGS_CONFIG
+    backend: Optional[str] = Field(
+        default="compressed",
+        validation_alias=AliasChoices("TRANSCRIPT_STORAGE_BACKEND", "backend"),
+    )
+    directory: Optional[str] = Field(
+        default="/data/transcript_store",
+        validation_alias=AliasChoices("TRANSCRIPT_STORAGE_DIRECTORY", "directory"),
+    )
+    compression_level: Optional[int] = Field(
+        default=6,
+        validation_alias=AliasChoices(
+            "TRANSCRIPT_STORAGE_COMPRESSION_LEVEL", "compression_level"
+        ),
+    )
 
 
 class Settings(BaseSettings):
@@ -166,6 +528,29 @@ class Settings(BaseSettings):
     redis: Optional[RedisSettings] = Field(default=RedisSettings())
     google_cloud: Optional[GoogleCloudSettings] = Field(default=GoogleCloudSettings())
     deployments: Optional[DeploymentSettings] = Field(default=DeploymentSettings())
+    ingestion: Optional[IngestionSettings] = Field(default=IngestionSettings())
+    transcript_storage: Optional[TranscriptStorageSettings] = Field(
+        default=TranscriptStorageSettings()
+    )
+    search: Optional[SearchSettings] = Field(default=SearchSettings())
+    compute: Optional[ComputeSettings] = Field(default=ComputeSettings())
+    scheduler: Optional[SchedulerSettings] = Field(default=SchedulerSettings())
+    stream_buffer: Optional[StreamBufferSettings] = Field(
+        default=StreamBufferSettings()
+    )
+    title_generation: Optional[TitleGenerationSettings] = Field(
+        default=TitleGenerationSettings()
+    )
+    persona_interview: Optional[PersonaInterviewSettings] = Field(
+        default=PersonaInterviewSettings()
+    )
+    user_cache: Optional[UserCacheSettings] = Field(default=UserCacheSettings())
+    retrieval_session: Optional[RetrievalSessionSettings] = Field(
+        default=RetrievalSessionSettings()
+    )
+    completion_cache: Optional[CompletionCacheSettings] = Field(
+        default=CompletionCacheSettings()
+    )
 
     @classmethod
     def settings_customise_sources(
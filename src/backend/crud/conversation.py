@@ -1,9 +1,10 @@
-from sqlalchemy import desc
+from sqlalchemy import bindparam, desc, update
 from sqlalchemy.orm import Session
 
 from backend.database_models.conversation import (
     Conversation,
 )
+from backend.database_models.message import Message
 from backend.schemas.conversation import (
     ToggleConversationPinRequest,
     UpdateConversationRequest,
@@ -110,6 +111,27 @@ def update_conversation(
     return conversation
 
 
+@validate_transaction
+def update_conversation_description(
+    db: Session, conversation_id: str, user_id: str, description: str
+) -> None:
+    """
+    Update the description of a conversation in one statement, without loading it.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        description (str): New description.
+    """
+    db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        .values(description=description)
+    )
+    db.commit()
+
+
 @validate_transaction
 def toggle_conversation_pin(
     db: Session,
@@ -153,3 +175,79 @@ def delete_conversation(db: Session, conversation_id: str, user_id: str) -> None
     )
     conversation.delete()
     db.commit()
+
+
+@validate_transaction
+def get_conversations_by_ids(
+    db: Session, conversation_ids: list[str]
+) -> list[Conversation]:
+    """
+    Get conversations of any user by their IDs.
+
+    Args:
+        db (Session): Database session.
+        conversation_ids (list[str]): Conversation IDs.
+
+    Returns:
+        list[Conversation]: Conversations with the given IDs.
+    """
+    return db.query(Conversation).filter(Conversation.id.in_(conversation_ids)).all()
+
+
+@validate_transaction
+def update_conversation_titles(db: Session, titles: list[dict[str, str]]) -> None:
+    """
+    Update the titles of several conversations in one statement. A title is only
+    updated if it wasn't changed since it was read, e.g. renamed by the user.
+
+    Args:
+        db (Session): Database session.
+        titles (list[dict[str, str]]): Dicts with the conversation `id`, `user_id`,
+            the `old_title` and the new `title`.
+    """
+    if not titles:
+        return
+
+    table = Conversation.__table__
+    statement = (
+        update(table)
+        .where(
+            table.c.id == bindparam("b_id"),
+            table.c.user_id == bindparam("b_user_id"),
+            table.c.title == bindparam("b_old_title"),
+        )
+        .values(title=bindparam("b_title"))
+    )
+    db.execute(
+        statement,
+        [
+            {
+                "b_id": title["id"],
+                "b_user_id": title["user_id"],
+                "b_old_title": title["old_title"],
+                "b_title": title["title"],
+            }
+            for title in titles
+        ],
+    )
+    db.commit()
+
+
+@validate_transaction
+def create_conversations_with_messages(
+    db: Session, conversations: list[Conversation], messages: list[Message]
+) -> None:
+    """
+    Create several conversations and their messages in one transaction. The rows
+    of each table are inserted in batches instead of one statement per row.
+
+    Args:
+        db (Session): Database session.
+        conversations (list[Conversation]): Conversations to be created.
+        messages (list[Message]): Messages of the conversations.
+    """
+    db.add_all(conversations)
+    # Messages reference their conversation
+    db.flush()
+    db.add_all(messages)
+    db.commit()
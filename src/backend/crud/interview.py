@@ -1,34 +1,79 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 
 from backend.database_models.interview import Interview
 from backend.services.transaction import validate_transaction
 
 
 @validate_transaction
-def get_interviews_by_ids(db: Session, interview_ids: list[str]) -> list[Interview]:
+def get_interviews_by_ids(
+    db: Session, interview_ids: list[str], with_text: bool = True
+) -> list[Interview]:
     """
     Get interviews by IDs.
 
     Args:
         db (Session): Database session.
         interview_ids (list[str]): File IDs.
+        with_text (bool): Whether to load the transcripts in the same query.
 
     Returns:
         list[Interview]: List of files with the given IDs.
     """
-    return db.query(Interview).filter(Interview.id.in_(interview_ids)).all()
+    query = db.query(Interview).filter(Interview.id.in_(interview_ids))
+    if with_text:
+        query = query.options(undefer_group("text"))
+    return query.all()
 
 
 @validate_transaction
-def get_interviews_by_study_id(db: Session, study_id: str) -> list[Interview]:
+def get_interviews_by_study_id(
+    db: Session, study_id: str, with_text: bool = True
+) -> list[Interview]:
     """
     Get all interviews for a study.
 
     Args:
         db (Session): Database session.
         study_id (str): Study ID.
+        with_text (bool): Whether to load the transcripts in the same query.
 
     Returns:
       list[Interview]: List of interviews.
     """
-    return db.query(Interview).filter(Interview.study_id == study_id).all()
+    query = db.query(Interview).filter(Interview.study_id == study_id)
+    if with_text:
+        query = query.options(undefer_group("text"))
+    return query.all()
+
+
+@validate_transaction
+def create_interviews(db: Session, interviews: list[Interview]) -> list[Interview]:
+    """
+    Create multiple interviews in one transaction.
+
+    Args:
+        db (Session): Database session.
+        interviews (list[Interview]): Interviews to be created.
+
+    Returns:
+        list[Interview]: Created interviews.
+    """
+    db.add_all(interviews)
+    db.commit()
+    return interviews
+
+
+@validate_transaction
+def get_interview_titles_by_study_id(db: Session, study_id: str) -> set[str]:
+    """
+    Get the titles of all interviews in a study.
+
+    Args:
+        db (Session): Database session.
+        study_id (str): Study ID.
+
+    Returns:
+        set[str]: Interview titles.
+    """
+    rows = db.query(Interview.title).filter(Interview.study_id == study_id).all()
+    return {row.title for row in rows}
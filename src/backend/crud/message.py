@@ -117,6 +117,31 @@ def get_messages_by_conversation_id(
     )
 
 
+@validate_transaction
+def get_messages_by_conversation_ids(
+    db: Session, conversation_ids: list[str], user_id: str
+) -> list[Message]:
+    """
+    List all messages from several conversations, ordered by conversation and position.
+
+    Args:
+        db (Session): Database session.
+        conversation_ids (list[str]): Conversation IDs.
+        user_id (str): User ID.
+
+    Returns:
+        list[Message]: List of messages from the conversations.
+    """
+    return (
+        db.query(Message)
+        .filter(
+            Message.conversation_id.in_(conversation_ids), Message.user_id == user_id
+        )
+        .order_by(Message.conversation_id, Message.position, Message.created_at)
+        .all()
+    )
+
+
 @validate_transaction
 def update_message(
     db: Session, message: Message, new_message: UpdateMessage
@@ -100,3 +100,19 @@ def delete_study(db: Session, study_id: str) -> bool:
     study_query.delete()
     db.commit()
     return True
+
+
+@validate_transaction
+def set_study_being_added(db: Session, study_id: str, is_being_added: bool) -> None:
+    """
+    Set whether files of a study are currently being ingested.
+
+    Args:
+        db (Session): Database session.
+        study_id (str): Study ID.
+        is_being_added (bool): Ingestion state of the study.
+    """
+    db.query(Study).filter(Study.id == study_id).update(
+        {Study.is_being_added: is_being_added}
+    )
+    db.commit()
@@ -1,9 +1,18 @@
+from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import JSON, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.database_models.base import Base
+from backend.services.transcript_storage import get_transcript_storage
 
 
 class Interview(Base):
@@ -12,13 +21,48 @@ class Interview(Base):
     id: Mapped[str] = mapped_column(
         String, default=lambda: str(uuid4()), unique=True, primary_key=True
     )
-    text: Mapped[str] = mapped_column(String, nullable=False)
     title: Mapped[str] = mapped_column(String, nullable=False)
     interview_type: Mapped[str] = mapped_column(String, nullable=False)
     fields: Mapped[dict] = mapped_column(JSON, nullable=True)
     study_id: Mapped[str] = mapped_column(ForeignKey("studies.id"), nullable=False)
     study = relationship("Study", back_populates="interviews")
 
+    # Transcript bodies are only loaded on access to `text`, see services/transcript_storage.py
+    storage_backend: Mapped[str] = mapped_column(
+        String, default="inline", server_default="inline", nullable=False
+    )
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    text_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    inline_text: Mapped[Optional[str]] = mapped_column(
+        "text", String, nullable=True, deferred=True, deferred_group="text"
+    )
+    compressed_text: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_group="text"
+    )
+    # Speaker turns of the transcript, see services/speaker_turns.py
+    speaker_turns: Mapped[Optional[list]] = mapped_column(
+        JSON, nullable=True, deferred=True, deferred_group="text"
+    )
+
+    @property
+    def text(self) -> str:
+        # Decoded once per instance, keyed by the stored content so a refreshed
+        # row is decoded again
+        key = (self.storage_backend, self.content_hash)
+        cached = getattr(self, "_decoded_text", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        text = get_transcript_storage(self.storage_backend).decode(self)
+        self._decoded_text = (key, text)
+        return text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._decoded_text = None
+        for column, column_value in get_transcript_storage().encode(value).items():
+            setattr(self, column, column_value)
+
     __table_args__ = (
         UniqueConstraint("title", "study_id", name="interview_title_study_id_uc"),
     )
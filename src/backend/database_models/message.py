@@ -32,6 +32,7 @@ class Message(Base):
     position: Mapped[int]
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     generation_id: Mapped[str] = mapped_column(String, nullable=True)
+    finish_reason: Mapped[str] = mapped_column(String, nullable=True)
 
     agent: Mapped[MessageAgent] = mapped_column(
         Enum(MessageAgent, native_enum=False),
@@ -3,21 +3,32 @@ from alembic.config import Config
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 
 from backend.config.auth import (
+    close_auth_strategies,
     get_auth_strategy_endpoints,
     is_authentication_enabled,
     verify_migrate_token,
 )
 from backend.config.routers import ROUTER_DEPENDENCIES
 from backend.config.settings import Settings
+from backend.model_deployments.registry import get_registry
 from backend.routers.auth import router as auth_router
 from backend.routers.chat import router as chat_router
 from backend.routers.conversation import router as conversation_router
+from backend.routers.persona_interview import router as persona_interview_router
 from backend.routers.study import router as study_router
 from backend.routers.user import router as user_router
+from backend.services.completion_cache import completion_cache
+from backend.services.compute import ComputeSaturatedError, compute_service
+from backend.services.ingestion import ingestion_queue
+from backend.services.metrics import render_metrics
+from backend.services.persona_interview import persona_interview_runner
+from backend.services.retrieval_session import retrieval_sessions
+from backend.services.title_generation import title_generation_queue
+from backend.services.user_cache import user_id_cache
 
 load_dotenv()
 
@@ -34,6 +45,7 @@ def create_app():
         user_router,
         conversation_router,
         study_router,
+        persona_interview_router,
     ]
 
     # Dynamically set router dependencies
@@ -68,6 +80,15 @@ def create_app():
 app = create_app()
 
 
+@app.exception_handler(ComputeSaturatedError)
+async def compute_saturated_exception_handler(
+    request: Request, exc: ComputeSaturatedError
+):
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"}
+    )
+
+
 @app.exception_handler(Exception)
 async def validation_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
@@ -84,11 +105,56 @@ async def validation_exception_handler(request: Request, exc: Exception):
 @app.on_event("startup")
 async def startup_event():
     """
-    Retrieves all the Auth provider endpoints if authentication is enabled.
+    Retrieves all the Auth provider endpoints if authentication is enabled
+    and starts the background workers.
     """
     if is_authentication_enabled():
         await get_auth_strategy_endpoints()
 
+    settings = Settings()
+    ingestion_queue.start(settings.ingestion.max_workers)
+    compute_service.start(
+        settings.compute.max_workers, settings.compute.max_pending
+    )
+    get_registry().start()
+    title_generation_queue.start(
+        settings.title_generation.batch_size,
+        settings.title_generation.max_wait,
+        settings.title_generation.max_new_tokens,
+    )
+    user_id_cache.start(
+        settings.user_cache.ttl,
+        settings.user_cache.negative_ttl,
+        settings.user_cache.max_size,
+        redis_url=settings.redis.url,
+    )
+    retrieval_sessions.start(
+        settings.retrieval_session.max_sessions, settings.retrieval_session.ttl
+    )
+    completion_cache.start(
+        settings.completion_cache.enabled,
+        settings.redis.url,
+        settings.completion_cache.agents,
+        settings.completion_cache.cache_titles,
+        settings.completion_cache.ttl,
+        settings.completion_cache.model,
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stops the background workers.
+    """
+    await ingestion_queue.stop()
+    compute_service.stop()
+    await get_registry().stop()
+    await title_generation_queue.stop()
+    await persona_interview_runner.stop()
+    await close_auth_strategies()
+    await user_id_cache.stop()
+    await completion_cache.stop()
+
 
 @app.get("/health")
 async def health():
@@ -98,6 +164,14 @@ async def health():
     return {"status": "OK"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics of this worker in the Prometheus text format
+    """
+    return render_metrics()
+
+
 @app.post("/migrate", dependencies=[Depends(verify_migrate_token)])
 async def apply_migrations():
     """
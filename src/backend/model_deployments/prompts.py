@@ -1,6 +1,6 @@
 from typing import List
 
-from backend.schemas.citation import CitationList
+from backend.schemas.citation import CitationList, PassageCitationList
 
 BASIC_SYSTEM_PROMPT = "Du hilfst Nutzern bei der Beantwortung von Fragen und Aufgaben. Halte dich dabei genau an die Anweisungen."
 
@@ -39,3 +39,25 @@ FRAGEN_VORHER:
 FRAGE: {query}
 """
     return prompt
+
+
+def get_study_search_prompt(
+    query: str, prev_queries: List[str], passages: List[str]
+) -> str:
+    prev_queries_concat = "\n".join(prev_queries)
+    passages_concat = "\n\n".join(
+        f"[{i}] {passage}" for i, passage in enumerate(passages)
+    )
+    prompt = f"""Deine Aufgabe ist es, direkte Zitate aus Abschnitten mehrerer langer Markforschungs-Interviews zu finden und in folgendem JSON-Format zurückzugeben:
+ {PassageCitationList.model_json_schema()}. Im folgenden erhältst du vom Nutzer nummerierte Abschnitte aus Interview-Transkripten (ABSCHNITTE) und eine Frage oder Aufgabe (FRAGE), zu der du passende Zitate finden sollst.
+ Gib zu jedem Zitat die Nummer des Abschnitts an, aus dem es stammt. Du kannst bis zu 10 Zitate zurückgeben. Jeglicher Text innerhalb der JSON-Struktur sollte Deutsch sein.
+
+ABSCHNITTE:
+{passages_concat}
+
+FRAGEN_VORHER:
+{prev_queries_concat}
+
+FRAGE: {query}
+"""
+    return prompt
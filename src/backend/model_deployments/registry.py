@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+import httpx
+import requests
+from huggingface_hub import InferenceClient, InferenceTimeoutError
+
+from backend.config.settings import Settings
+
+# Rough estimate used to weigh prompts against generated tokens
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(prompt_chars: int, max_new_tokens: int) -> int:
+    return prompt_chars // CHARS_PER_TOKEN + max_new_tokens
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed TGI call may succeed on another replica, i.e. the replica
+    is unreachable or failed, not the request itself.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(
+        error,
+        (requests.ConnectionError, requests.Timeout, InferenceTimeoutError),
+    )
+
+
+class Replica:
+    """
+    A TGI replica with a long-lived client.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.client = InferenceClient(self.base_url)
+        self.healthy = True
+        self.outstanding_tokens = 0
+
+
+class DeploymentRegistry:
+    """
+    Routes TGI calls across replicas.
+
+    Calls go to the healthy replica with the fewest outstanding tokens. Calls
+    with an affinity key, e.g. a conversation, stick to the same replica to reuse
+    its prefix cache, as long as it isn't overloaded compared to the others.
+    Replicas that fail their `/health` check or a call are ejected until they
+    pass a health check again.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        health_check_interval: float = 10.0,
+        affinity_slack_tokens: int = 4096,
+    ):
+        assert base_urls, "At least one TGI deployment must be enabled."
+        self.replicas = [Replica(base_url) for base_url in base_urls]
+        self.health_check_interval = health_check_interval
+        self.affinity_slack_tokens = affinity_slack_tokens
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _affinity_rank(self, replica: Replica, affinity_key: str) -> bytes:
+        # Rendezvous hashing, keys only move if their replica is ejected
+        return hashlib.sha256(f"{affinity_key}|{replica.base_url}".encode()).digest()
+
+    def pick(
+        self, affinity_key: Optional[str] = None, exclude: tuple[Replica, ...] = ()
+    ) -> Replica:
+        """
+        Pick the replica for a call.
+
+        Args:
+            affinity_key (Optional[str]): Key of calls that share a prompt prefix.
+            exclude (tuple[Replica, ...]): Replicas that already failed the call.
+
+        Returns:
+            Replica: The picked replica.
+        """
+        candidates = [
+            replica
+            for replica in self.replicas
+            if replica.healthy and replica not in exclude
+        ]
+        if not candidates:
+            # Better to try an ejected replica than to fail right away
+            candidates = [
+                replica for replica in self.replicas if replica not in exclude
+            ] or self.replicas
+
+        least_loaded = min(candidates, key=lambda replica: replica.outstanding_tokens)
+        if affinity_key is None:
+            return least_loaded
+
+        preferred = max(
+            candidates, key=lambda replica: self._affinity_rank(replica, affinity_key)
+        )
+        if (
+            preferred.outstanding_tokens
+            <= least_loaded.outstanding_tokens + self.affinity_slack_tokens
+        ):
+            return preferred
+        return least_loaded
+
+    @contextmanager
+    def track(self, replica: Replica, tokens: int) -> Iterator[Replica]:
+        """
+        Count the estimated tokens of a call as outstanding on the replica while it runs.
+        """
+        replica.outstanding_tokens += tokens
+        try:
+            yield replica
+        finally:
+            replica.outstanding_tokens -= tokens
+
+    def eject(self, replica: Replica) -> None:
+        if replica.healthy:
+            print(f"[Deployments] Ejecting TGI replica {replica.base_url}")
+        replica.healthy = False
+
+    async def check_health(self) -> None:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            for replica in self.replicas:
+                try:
+                    response = await client.get(f"{replica.base_url}/health")
+                    healthy = response.status_code == 200
+                except httpx.HTTPError:
+                    healthy = False
+
+                if healthy and not replica.healthy:
+                    print(f"[Deployments] TGI replica {replica.base_url} is healthy again")
+                    replica.healthy = True
+                elif not healthy:
+                    self.eject(replica)
+
+    async def _check_health_periodically(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._check_health_periodically())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> DeploymentRegistry:
+    """
+    Get the registry of the TGI replicas enabled in the deployment settings.
+
+    Returns:
+        DeploymentRegistry: Shared registry.
+    """
+    settings = Settings().deployments
+    return DeploymentRegistry(
+        settings.enabled_deployments,
+        health_check_interval=settings.health_check_interval,
+        affinity_slack_tokens=settings.affinity_slack_tokens,
+    )
@@ -0,0 +1,246 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from functools import lru_cache
+from typing import AsyncGenerator, Optional
+
+from backend.config.settings import Settings
+
+
+class Priority(IntEnum):
+    """Priority classes of LLM calls, lower values are admitted first."""
+
+    CHAT = 0
+    SEARCH = 1
+    TITLE = 2
+    BATCH = 3
+
+
+class TokenBucket:
+    """
+    Token bucket that refills at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def has_token(self) -> bool:
+        self._refill()
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def time_until_token(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class Ticket:
+    """
+    A single LLM call waiting for, or holding, a slot of the scheduler.
+    """
+
+    WAITING = "waiting"
+    ADMITTED = "admitted"
+    RELEASED = "released"
+
+    def __init__(self, user_id: str, agent_id: str, priority: Priority, sequence: int):
+        self.user_id = user_id
+        self.agent_id = agent_id
+        self.priority = priority
+        self.sequence = sequence
+        self.state = self.WAITING
+        self.wakeup = asyncio.Event()
+
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        return self.priority, self.sequence
+
+
+class TGIScheduler:
+    """
+    Admission control in front of TGI.
+
+    At most `max_in_flight` LLM calls run at once. Waiting calls are admitted by
+    priority class, then in arrival order, but only while the token buckets of
+    their user and agent have tokens left, so a single large search can't starve
+    the chats of other users.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        user_rate: float = 1.0,
+        user_burst: int = 20,
+        agent_rates: Optional[dict[str, float]] = None,
+        agent_burst: int = 100,
+    ):
+        self.max_in_flight = max_in_flight
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.agent_rates = agent_rates or {}
+        self.agent_burst = agent_burst
+        self.in_flight = 0
+        self.waiting: list[Ticket] = []
+        self.user_buckets: dict[str, TokenBucket] = {}
+        self.agent_buckets: dict[str, TokenBucket] = {}
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def ticket(self, user_id: str, agent_id: str, priority: Priority) -> Ticket:
+        return Ticket(user_id, agent_id, priority, next(self._sequence))
+
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        if user_id not in self.user_buckets:
+            self.user_buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return self.user_buckets[user_id]
+
+    def _buckets(self, ticket: Ticket) -> list[TokenBucket]:
+        buckets = [self._user_bucket(ticket.user_id)]
+
+        if ticket.agent_id in self.agent_rates:
+            if ticket.agent_id not in self.agent_buckets:
+                self.agent_buckets[ticket.agent_id] = TokenBucket(
+                    self.agent_rates[ticket.agent_id], self.agent_burst
+                )
+            buckets.append(self.agent_buckets[ticket.agent_id])
+        return buckets
+
+    def position(self, ticket: Ticket) -> int:
+        """
+        Get the 1-based position of a waiting ticket in the queue.
+        """
+        return 1 + sum(
+            1 for other in self.waiting if other.sort_key < ticket.sort_key
+        )
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        for ticket in sorted(self.waiting, key=lambda ticket: ticket.sort_key):
+            if self.in_flight >= self.max_in_flight:
+                break
+            buckets = self._buckets(ticket)
+            if not all(bucket.has_token() for bucket in buckets):
+                continue
+
+            for bucket in buckets:
+                bucket.take()
+            self.waiting.remove(ticket)
+            self.in_flight += 1
+            ticket.state = Ticket.ADMITTED
+            ticket.wakeup.set()
+
+        # Admitted tickets start, the others may have moved up in the queue
+        for ticket in self.waiting:
+            ticket.wakeup.set()
+
+        if self.waiting and self.in_flight < self.max_in_flight:
+            # Everyone left is out of quota, retry once the first bucket refilled
+            delay = min(
+                max(bucket.time_until_token() for bucket in self._buckets(ticket))
+                for ticket in self.waiting
+            )
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def wait_for_slot(self, ticket: Ticket) -> AsyncGenerator[int, None]:
+        """
+        Queue a ticket and wait until it is admitted, yielding its queue position
+        whenever it changes. The caller must `release` the ticket afterwards,
+        also if it stops waiting early.
+
+        Args:
+            ticket (Ticket): Ticket to queue.
+
+        Yields:
+            int: 1-based queue position.
+        """
+        self.waiting.append(ticket)
+        self._dispatch()
+
+        position = None
+        while True:
+            # Cleared before the state is checked, so a wakeup while the caller
+            # handles a position can't be lost
+            ticket.wakeup.clear()
+            if ticket.state != Ticket.WAITING:
+                return
+            if (new_position := self.position(ticket)) != position:
+                position = new_position
+                yield position
+                continue
+            await ticket.wakeup.wait()
+
+    async def wait_for_quota(self, user_id: str) -> None:
+        """
+        Take a token of the user's bucket without a slot, e.g. for a user who
+        attaches to a generation that another user's tickets already run.
+
+        Args:
+            user_id (str): User ID.
+        """
+        bucket = self._user_bucket(user_id)
+        while not bucket.has_token():
+            await asyncio.sleep(bucket.time_until_token())
+        bucket.take()
+
+    def release(self, ticket: Ticket) -> None:
+        """
+        Free the slot of an admitted ticket, or drop a ticket that is still waiting.
+
+        Args:
+            ticket (Ticket): Ticket to release.
+        """
+        if ticket.state == Ticket.ADMITTED:
+            self.in_flight -= 1
+        elif ticket.state == Ticket.WAITING and ticket in self.waiting:
+            self.waiting.remove(ticket)
+        ticket.state = Ticket.RELEASED
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, agent_id: str, priority: Priority):
+        """
+        Hold a slot for the duration of the block, for calls that don't report
+        their queue position.
+        """
+        ticket = self.ticket(user_id, agent_id, priority)
+        try:
+            async for _ in self.wait_for_slot(ticket):
+                pass
+            yield ticket
+        finally:
+            self.release(ticket)
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> TGIScheduler:
+    """
+    Get the scheduler configured in the scheduler settings.
+
+    Returns:
+        TGIScheduler: Shared scheduler.
+    """
+    settings = Settings().scheduler
+    return TGIScheduler(
+        max_in_flight=settings.max_in_flight,
+        user_rate=settings.user_rate,
+        user_burst=settings.user_burst,
+        agent_rates=settings.agent_rates,
+        agent_burst=settings.agent_burst,
+    )
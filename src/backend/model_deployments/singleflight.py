@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Optional
+
+
+def get_flight_key(request: dict[str, Any]) -> str:
+    """
+    Get the key under which identical requests are coalesced.
+
+    Args:
+        request (dict[str, Any]): Everything the generated events depend on.
+
+    Returns:
+        str: Key of the request.
+    """
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Flight:
+    """
+    One upstream event stream shared by all of its subscribers.
+
+    The upstream is consumed by a task of its own, so it keeps running when the
+    subscriber that started it disconnects. Events are buffered, so subscribers
+    that attach late still receive the whole stream.
+    """
+
+    def __init__(self, upstream: AsyncIterator[dict[str, Any]]):
+        self.events: list[dict[str, Any]] = []
+        self.error: Optional[BaseException] = None
+        self.is_done = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task = asyncio.create_task(self._consume(upstream))
+
+    async def _consume(self, upstream: AsyncIterator[dict[str, Any]]) -> None:
+        try:
+            async for event in upstream:
+                async with self.changed:
+                    self.events.append(event)
+                    self.changed.notify_all()
+        except asyncio.CancelledError:
+            self.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            close = getattr(upstream, "aclose", None)
+            if close is not None:
+                await close()
+            async with self.changed:
+                self.is_done = True
+                self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncGenerator[dict[str, Any], Any]:
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(
+                    lambda: position < len(self.events) or self.is_done
+                )
+                events = self.events[position:]
+                is_done = self.is_done
+
+            position += len(events)
+            for event in events:
+                # Subscribers may add fields to the events they receive
+                yield dict(event)
+
+            if is_done and position == len(self.events):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class Singleflight:
+    """
+    Coalesces identical concurrent requests onto one upstream generation.
+
+    The first request with a key starts the upstream, requests with the same key
+    that arrive while it runs subscribe to its events instead of generating them
+    again. When the last subscriber disconnects, the upstream is cancelled, which
+    releases its scheduler slot and closes its TGI stream.
+    """
+
+    def __init__(self):
+        self.flights: dict[str, Flight] = {}
+
+    async def stream(
+        self,
+        key: str,
+        start: Callable[[], AsyncIterator[dict[str, Any]]],
+        attach: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> AsyncGenerator[dict[str, Any], Any]:
+        """
+        Stream the events of the flight with the key, starting it if needed.
+
+        Args:
+            key (str): Key of the request, see `get_flight_key`.
+            start (Callable[[], AsyncIterator[dict[str, Any]]]): Starts the
+                upstream event stream.
+            attach (Optional[Callable[[], Awaitable[None]]]): Awaited before
+                the request subscribes to a flight that is already running,
+                e.g. to charge its user's quota.
+
+        Yields:
+            dict[str, Any]: Events of the upstream.
+        """
+        flight = self.flights.get(key)
+        if flight is not None and not flight.is_done and attach is not None:
+            await attach()
+            # The flight may have finished while waiting
+            flight = self.flights.get(key)
+
+        if flight is None or flight.is_done:
+            flight = Flight(start())
+            self.flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._remove(key, flight))
+        else:
+            print(f"[Singleflight] Attached to in-flight request {key[:12]}")
+
+        flight.subscribers += 1
+        events = flight.subscribe()
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._remove(key, flight)
+
+    def _remove(self, key: str, flight: Flight) -> None:
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+
+singleflight = Singleflight()
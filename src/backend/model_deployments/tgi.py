@@ -1,22 +1,202 @@
-from typing import Any, AsyncGenerator
+import asyncio
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, AsyncGenerator, Iterator, Optional, Type, TypeVar
 
-import bm25s
-from huggingface_hub import InferenceClient
+from pydantic import BaseModel
 
-from backend.model_deployments.prompts import get_search_prompt, get_system_prompt
+from backend.config.settings import Settings
+from backend.model_deployments.prompts import (
+    get_search_prompt,
+    get_study_search_prompt,
+    get_system_prompt,
+)
+from backend.model_deployments.registry import (
+    DeploymentRegistry,
+    estimate_tokens,
+    get_registry,
+    is_retryable,
+)
+from backend.model_deployments.scheduler import Priority, Ticket, get_scheduler
+from backend.model_deployments.singleflight import get_flight_key, singleflight
 from backend.schemas.chat import (
+    ChatRole,
+    FinishReason,
     SalonChatRequest,
+    SearchMode,
     StreamEvent,
 )
-from backend.schemas.citation import Citation, CitationList
+from backend.schemas.citation import Citation, CitationList, PassageCitationList
+from backend.schemas.interview import Interview
+from backend.services.completion_cache import CachedCompletion, completion_cache
+from backend.services.compute import compute_service
+from backend.services.metrics import Counter, register
+from backend.services.retrieval_session import retrieval_sessions
+from backend.services.search_index import rank_interviews, search_study
+from backend.services.speaker_turns import get_search_text
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+# Calls are retried once on another replica if they fail before the first token
+MAX_ATTEMPTS = 2
+CHAT_MAX_NEW_TOKENS = 1024
+
+ItemType = TypeVar("ItemType")
+
+citation_counter = itertools.count()
+
+interview_searches = register(
+    Counter(
+        "search_interview_llm_calls_total",
+        "Interviews of zitatki searches that were sent to the LLM, skipped by "
+        "the BM25 relevance gate or answered from the conversation's earlier results.",
+        ("result",),
+    )
+)
+
+
+async def iterate_in_thread(iterator: Iterator[ItemType]) -> AsyncGenerator[ItemType, Any]:
+    """
+    Consume a blocking iterator, e.g. a TGI token stream, in a worker thread
+    instead of on the event loop. If the consumer stops early, the iterator is
+    closed after its current item, which closes the HTTP stream to TGI.
+
+    Args:
+        iterator (Iterator[ItemType]): Blocking iterator.
+
+    Yields:
+        ItemType: Items of the iterator.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def pump() -> None:
+        error = None
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except Exception as e:
+            error = e
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, (done, error))
+
+    loop.run_in_executor(None, pump)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def get_previous_queries(search_request: SalonChatRequest) -> list[str]:
+    """
+    Get the earlier questions of a search conversation, for follow-up questions.
+    """
+    return [
+        message.message
+        for message in search_request.chat_history or []
+        if message.role == ChatRole.USER and message.message
+    ]
+
+
+def get_chat_flight_key(chat_request: SalonChatRequest) -> str:
+    """
+    Get the singleflight key of a chat request.
+
+    Interviews are keyed by their ID and content hash instead of their text, so
+    keys stay cheap for whole studies.
+
+    Args:
+        chat_request (SalonChatRequest): Chat request.
+
+    Returns:
+        str: Key of the request, see `get_flight_key`.
+    """
+    request = chat_request.model_dump(
+        mode="json", exclude={"conversation_id", "interviews"}
+    )
+    request["interviews"] = [
+        (
+            interview.id,
+            interview.content_hash
+            or hashlib.sha256(interview.text.encode()).hexdigest(),
+        )
+        for interview in chat_request.interviews or []
+    ]
+    return get_flight_key(request)
+
+
+def keep_best_citations(
+    best_citations: list[tuple[float, int, Citation]],
+    citations: list[Citation],
+    k: int,
+) -> None:
+    """
+    Add citations to a min-heap that keeps the `k` citations with the highest
+    `bewertung`.
+
+    Args:
+        best_citations (list[tuple[float, int, Citation]]): The heap.
+        citations (list[Citation]): New citations.
+        k (int): Number of citations kept.
+    """
+    for citation in citations:
+        # The counter breaks ties, citations themselves aren't comparable
+        entry = (citation.bewertung, next(citation_counter), citation)
+        if len(best_citations) < k:
+            heapq.heappush(best_citations, entry)
+        elif entry[0] > best_citations[0][0]:
+            heapq.heapreplace(best_citations, entry)
+
+
+def get_top_k_finish_reason(
+    best_citations: list[tuple[float, int, Citation]],
+    deadline: float,
+    k: int,
+    min_score: float,
+) -> Optional[FinishReason]:
+    """
+    Get why a top-K search stops before its next LLM call, if it does.
+
+    Args:
+        best_citations (list[tuple[float, int, Citation]]): Heap of the best
+            citations, see `keep_best_citations`.
+        deadline (float): `time.monotonic()` after which no more calls are made.
+        k (int): Number of citations the search looks for.
+        min_score (float): Minimum `bewertung` of the citations.
+
+    Returns:
+        Optional[FinishReason]: Why the search stops, None if it continues.
+    """
+    if len(best_citations) >= k and best_citations[0][0] >= min_score:
+        return FinishReason.TOP_K_REACHED
+    if time.monotonic() >= deadline:
+        return FinishReason.TIME_BUDGET_EXHAUSTED
+    return None
 
 
 class TGIDeployment:
-    def __init__(self, base_url="http://tgi:80"):
-        self.client = InferenceClient(base_url)
+    def __init__(self, registry: Optional[DeploymentRegistry] = None):
+        self.registry = registry or get_registry()
 
     async def invoke_chat_stream(
-        self, chat_request: SalonChatRequest
+        self, chat_request: SalonChatRequest, user_id: str = ""
     ) -> AsyncGenerator[Any, Any]:
         yield {
             "event_type": StreamEvent.STREAM_START,
@@ -27,13 +207,38 @@ class TGIDeployment:
             "kerlin": self.handle_chat,
             "basic": self.handle_chat,
         }
-        async for item in handlers[chat_request.agent_id](chat_request):
+        handler = handlers[chat_request.agent_id]
+        # Identical concurrent requests, e.g. researchers running the same search
+        # on a shared study, share one generation. It runs on the scheduler
+        # tickets of the user who started it, the users who attach to it are
+        # charged against their own quota instead
+        key = get_chat_flight_key(chat_request)
+        # Handlers that stop early end the stream themselves
+        finish_reason = FinishReason.COMPLETE
+        async for item in singleflight.stream(
+            key,
+            lambda: handler(chat_request, user_id),
+            attach=lambda: get_scheduler().wait_for_quota(user_id),
+        ):
+            if item["event_type"] == StreamEvent.STREAM_END:
+                finish_reason = item["finish_reason"]
+                continue
             yield item
 
-        yield {"event_type": StreamEvent.STREAM_END, "finish_reason": "COMPLETE"}
+        yield {
+            "event_type": StreamEvent.STREAM_END,
+            "finish_reason": finish_reason,
+        }
+
+    async def wait_for_slot(self, ticket: Ticket) -> AsyncGenerator[Any, Any]:
+        """
+        Wait until the scheduler admits the ticket, streaming its queue position.
+        """
+        async for position in get_scheduler().wait_for_slot(ticket):
+            yield {"event_type": StreamEvent.QUEUE_POSITION, "position": position}
 
     async def handle_chat(
-        self, chat_request: SalonChatRequest
+        self, chat_request: SalonChatRequest, user_id: str = ""
     ) -> AsyncGenerator[Any, Any]:
         description = (
             chat_request.description if chat_request.agent_id == "kerlin" else ""
@@ -56,40 +261,416 @@ class TGIDeployment:
 
         messages.append({"role": "user", "content": chat_request.message})
 
-        output = self.client.chat_completion(
-            messages=messages,
-            seed=42,
-            stream=True,
+        cache_key = None
+        if completion_cache.is_enabled_for_agent(chat_request.agent_id):
+            cache_key = completion_cache.get_key(
+                "chat",
+                {"messages": messages, "max_tokens": CHAT_MAX_NEW_TOKENS, "seed": 42},
+            )
+            cached = await completion_cache.get("chat", cache_key)
+            if cached is not None:
+                # Replay the completion as a token stream, without a scheduler slot
+                for text in cached.chunks:
+                    yield {
+                        "event_type": StreamEvent.TEXT_GENERATION,
+                        "text": text,
+                    }
+                    await asyncio.sleep(0)
+                yield {
+                    "event_type": StreamEvent.STREAM_END,
+                    "finish_reason": cached.finish_reason or FinishReason.COMPLETE,
+                }
+                return
+
+        chunks: list[str] = []
+        finish_reason = FinishReason.COMPLETE
+        scheduler = get_scheduler()
+        ticket = scheduler.ticket(user_id, chat_request.agent_id, Priority.CHAT)
+        try:
+            async for event in self.wait_for_slot(ticket):
+                yield event
+
+            async for choice in self.stream_chat_choices(
+                messages, affinity_key=chat_request.conversation_id
+            ):
+                text = choice.delta.content
+                if text:
+                    chunks.append(text)
+                if choice.finish_reason == "length":
+                    finish_reason = FinishReason.MAX_TOKENS
+                yield {
+                    "event_type": StreamEvent.TEXT_GENERATION,
+                    "text": text,
+                }
+        finally:
+            scheduler.release(ticket)
+
+        yield {"event_type": StreamEvent.STREAM_END, "finish_reason": finish_reason}
+
+        # Only completions that streamed to the end are cached
+        if cache_key is not None:
+            await completion_cache.put(
+                cache_key, CachedCompletion(chunks=chunks, finish_reason=finish_reason)
+            )
+
+    async def stream_chat_completion(
+        self, messages: list[dict[str, str]], affinity_key: Optional[str] = None
+    ) -> AsyncGenerator[str, Any]:
+        """
+        Stream a chat completion from a replica picked by the registry.
+
+        Args:
+            messages (list[dict[str, str]]): Chat messages.
+            affinity_key (Optional[str]): Key of calls that share a prompt prefix.
+
+        Yields:
+            str: Generated text deltas.
+        """
+        async for choice in self.stream_chat_choices(messages, affinity_key):
+            yield choice.delta.content
+
+    async def stream_chat_choices(
+        self, messages: list[dict[str, str]], affinity_key: Optional[str] = None
+    ) -> AsyncGenerator[Any, Any]:
+        """
+        Stream the choices of a chat completion from a replica picked by the
+        registry. If the replica fails before the first token, the call is
+        retried on another one.
+
+        Args:
+            messages (list[dict[str, str]]): Chat messages.
+            affinity_key (Optional[str]): Key of calls that share a prompt prefix.
+
+        Yields:
+            Any: Stream output choices, with the text delta and, on the last
+                one, the finish reason.
+        """
+        tokens = estimate_tokens(
+            sum(len(message["content"] or "") for message in messages),
+            CHAT_MAX_NEW_TOKENS,
         )
+        failed: tuple = ()
+        for attempt in range(MAX_ATTEMPTS):
+            replica = self.registry.pick(affinity_key, exclude=failed)
+            has_started = False
+            with self.registry.track(replica, tokens):
+                try:
+                    output = await asyncio.to_thread(
+                        replica.client.chat_completion,
+                        messages=messages,
+                        seed=42,
+                        max_tokens=CHAT_MAX_NEW_TOKENS,
+                        stream=True,
+                    )
+                    chunks = iterate_in_thread(output)
+                    try:
+                        async for chunk in chunks:
+                            has_started = True
+                            yield chunk.choices[0]
+                    finally:
+                        await chunks.aclose()
+                    return
+                except Exception as e:
+                    if has_started or attempt == MAX_ATTEMPTS - 1 or not is_retryable(e):
+                        raise
+                    print(f"[TGI] Retrying on another replica: {str(e)}")
+                    self.registry.eject(replica)
+                    failed += (replica,)
 
-        for chunk in output:
-            yield {
-                "event_type": StreamEvent.TEXT_GENERATION,
-                "text": chunk.choices[0].delta.content,
-            }
+    async def generate_text(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        affinity_key: Optional[str] = None,
+        cache_kind: Optional[str] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Generate a completion without streaming. Failed calls are retried once
+        on another replica.
+
+        Args:
+            prompt (str): Prompt to complete.
+            max_new_tokens (int): Maximum number of generated tokens.
+            affinity_key (Optional[str]): Key of calls that share a prompt prefix.
+            cache_kind (Optional[str]): Kind of the completion, e.g. title, to
+                answer it from the completion cache. Not cached if None.
+            **kwargs (Any): Additional parameters of the TGI call, e.g. a grammar.
+
+        Returns:
+            str: The completion.
+        """
+        cache_key = None
+        if cache_kind is not None and completion_cache.enabled:
+            cache_key = completion_cache.get_key(
+                cache_kind,
+                {
+                    "prompt": prompt,
+                    "max_new_tokens": max_new_tokens,
+                    "seed": 42,
+                    **kwargs,
+                },
+            )
+            cached = await completion_cache.get(cache_kind, cache_key)
+            if cached is not None:
+                return "".join(cached.chunks)
+
+        output = await self._generate_text(prompt, max_new_tokens, affinity_key, **kwargs)
+        if cache_key is not None:
+            await completion_cache.put(cache_key, CachedCompletion(chunks=[output]))
+        return output
+
+    async def _generate_text(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        affinity_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> str:
+        tokens = estimate_tokens(len(prompt), max_new_tokens)
+        failed: tuple = ()
+        for attempt in range(MAX_ATTEMPTS):
+            replica = self.registry.pick(affinity_key, exclude=failed)
+            with self.registry.track(replica, tokens):
+                try:
+                    return await asyncio.to_thread(
+                        replica.client.text_generation,
+                        prompt=prompt,
+                        seed=42,
+                        max_new_tokens=max_new_tokens,
+                        **kwargs,
+                    )
+                except Exception as e:
+                    if attempt == MAX_ATTEMPTS - 1 or not is_retryable(e):
+                        raise
+                    print(f"[TGI] Retrying on another replica: {str(e)}")
+                    self.registry.eject(replica)
+                    failed += (replica,)
+
+        raise AssertionError("unreachable")
+
+    async def generate_json(
+        self,
+        prompt: str,
+        response_model: Type[ResponseModel],
+        affinity_key: Optional[str] = None,
+    ) -> ResponseModel:
+        """
+        Generate a completion constrained to the JSON schema of `response_model`.
+
+        Args:
+            prompt (str): Prompt to complete.
+            response_model (Type[ResponseModel]): Pydantic model of the response.
+            affinity_key (Optional[str]): Key of calls that share a prompt prefix.
+
+        Returns:
+            ResponseModel: The parsed completion.
+        """
+        output = await self.generate_text(
+            prompt,
+            Settings().search.max_new_tokens,
+            affinity_key=affinity_key,
+            grammar={"type": "json", "value": response_model.model_json_schema()},
+        )
+        return response_model.model_validate_json(output)
 
     async def handle_search(
-        self, search_request: SalonChatRequest
+        self, search_request: SalonChatRequest, user_id: str = ""
     ) -> AsyncGenerator[Any, Any]:
         assert search_request.interviews is not None, (
             "Interviews must be provided for search task."
         )
 
-        for interview in search_request.interviews:
-            prompt: str = get_search_prompt(search_request.message, [], interview.text)
-            bm25s.tokenize(prompt)
-
-            # output = self.client.text_generation(
-            # prompt=prompt,
-            # seed=42,
-            # grammar={"type": "json", "value": CitationList.model_json_schema()},  # type: ignore
-            # )
-            output = CitationList(
-                zitate=[Citation(erklaerung="test", text="test", bewertung=0.5)]
+        if search_request.search_mode == SearchMode.STUDY and search_request.study_id:
+            async for item in self.handle_study_search(search_request, user_id):
+                yield item
+            return
+
+        settings = Settings().search
+        is_top_k = search_request.search_mode == SearchMode.TOP_K
+        interviews = search_request.interviews
+        if search_request.study_id and (settings.relevance_gate or is_top_k):
+            interviews, skipped = await self.prioritize_interviews(
+                search_request, is_gated=settings.relevance_gate
             )
+            for interview in skipped:
+                yield {
+                    "event_type": StreamEvent.SEARCH_RESULTS,
+                    "search_results": CitationList(zitate=[]),
+                    "interview_id": interview.id,
+                }
+
+        # Min-heap of the best citations so far, for the top-K mode
+        best_citations: list[tuple[float, int, Citation]] = []
+        deadline = time.monotonic() + settings.top_k_time_budget
+        previous_queries = get_previous_queries(search_request)
+        queries = (search_request.message, *previous_queries)
+        scheduler = get_scheduler()
+        for searched, interview in enumerate(interviews):
+            if is_top_k:
+                finish_reason = get_top_k_finish_reason(
+                    best_citations, deadline, settings.top_k, settings.top_k_min_score
+                )
+                if finish_reason is not None:
+                    interview_searches.inc(
+                        "stopped_early", value=len(interviews) - searched
+                    )
+                    print(
+                        f"[Search] Stopped top-K search ({finish_reason}) after "
+                        f"{searched} of {len(interviews)} interviews"
+                    )
+                    yield {
+                        "event_type": StreamEvent.STREAM_END,
+                        "finish_reason": finish_reason,
+                    }
+                    return
+
+            output = None
+            if search_request.conversation_id:
+                output = retrieval_sessions.get_search_results(
+                    search_request.conversation_id, interview, queries
+                )
+            if output is not None:
+                interview_searches.inc("reused")
+            else:
+                interview_searches.inc("searched")
+                prompt: str = get_search_prompt(
+                    search_request.message, previous_queries, get_search_text(interview)
+                )
+                ticket = scheduler.ticket(
+                    user_id, search_request.agent_id, Priority.SEARCH
+                )
+                try:
+                    async for event in self.wait_for_slot(ticket):
+                        yield event
+                    output = await self.generate_json(
+                        prompt, CitationList, affinity_key=interview.id
+                    )
+                finally:
+                    scheduler.release(ticket)
+                if search_request.conversation_id:
+                    retrieval_sessions.put_search_results(
+                        search_request.conversation_id, interview, queries, output
+                    )
 
+            if is_top_k:
+                keep_best_citations(best_citations, output.zitate, settings.top_k)
             yield {
                 "event_type": StreamEvent.SEARCH_RESULTS,
-                "search_results": output,  # CitationList.model_validate_json(output),
+                "search_results": output,
                 "interview_id": interview.id,
             }
+
+    async def prioritize_interviews(
+        self, search_request: SalonChatRequest, is_gated: bool = True
+    ) -> tuple[list[Interview], list[Interview]]:
+        """
+        Order the interviews of a search by the BM25 score of their best chunk
+        and, if gated, skip the ones not worth an LLM pass: interviews scoring at
+        most `relevance_threshold` are skipped, and only the
+        `max_searched_interviews` best ones are searched. The interviews are
+        searched in their original order while the compute pool is saturated.
+
+        Args:
+            search_request (SalonChatRequest): Search request with interviews.
+            is_gated (bool): Whether interviews are skipped or only ordered.
+
+        Returns:
+            tuple[list[Interview], list[Interview]]: Interviews to search, best
+                first, and skipped interviews.
+        """
+        settings = Settings().search
+        interviews = search_request.interviews
+        if compute_service.is_saturated():
+            return interviews, []
+
+        ranking = await compute_service.submit(
+            rank_interviews,
+            search_request.study_id,
+            [interview.id for interview in interviews],
+            search_request.message,
+            is_complete=not search_request.interview_ids,
+            texts=[interview.text for interview in interviews],
+        )
+        if ranking is None:
+            return interviews, []
+
+        selected_ids = [
+            interview_id
+            for interview_id, score in ranking
+            if not is_gated or score > settings.relevance_threshold
+        ]
+        if is_gated and settings.max_searched_interviews:
+            selected_ids = selected_ids[: settings.max_searched_interviews]
+
+        interviews_by_id = {interview.id: interview for interview in interviews}
+        selected = [interviews_by_id[interview_id] for interview_id in selected_ids]
+        selected_id_set = set(selected_ids)
+        skipped = [
+            interview for interview in interviews if interview.id not in selected_id_set
+        ]
+        if skipped:
+            interview_searches.inc("skipped", value=len(skipped))
+            print(
+                f"[Search] Relevance gate skipped {len(skipped)} of {len(interviews)} "
+                f"interviews of study {search_request.study_id}"
+            )
+        return selected, skipped
+
+    async def handle_study_search(
+        self, search_request: SalonChatRequest, user_id: str = ""
+    ) -> AsyncGenerator[Any, Any]:
+        """
+        Search the globally best passages of all interviews in the study with one
+        LLM call per batch of passages, instead of one call per interview.
+        """
+        settings = Settings().search
+        interviews = search_request.interviews
+        passages = await compute_service.submit(
+            search_study,
+            search_request.study_id,
+            [interview.id for interview in interviews],
+            search_request.message,
+            k=settings.study_top_k,
+            is_complete=not search_request.interview_ids,
+            dense_weight=settings.dense_weight,
+            texts=[interview.text for interview in interviews],
+        )
+
+        previous_queries = get_previous_queries(search_request)
+        scheduler = get_scheduler()
+        batch_size = settings.passages_per_call
+        for batch_start in range(0, len(passages), batch_size):
+            batch = [chunk for chunk, _ in passages[batch_start : batch_start + batch_size]]
+            prompt = get_study_search_prompt(
+                search_request.message,
+                previous_queries,
+                [chunk.original_text for chunk in batch],
+            )
+            ticket = scheduler.ticket(user_id, search_request.agent_id, Priority.SEARCH)
+            try:
+                async for event in self.wait_for_slot(ticket):
+                    yield event
+                output = await self.generate_json(
+                    prompt,
+                    PassageCitationList,
+                    affinity_key=search_request.conversation_id,
+                )
+            finally:
+                scheduler.release(ticket)
+
+            citations_by_interview: dict[str, list[Citation]] = {}
+            for citation in output.zitate:
+                if not 0 <= citation.abschnitt < len(batch):
+                    continue
+                interview_id = batch[citation.abschnitt].interview_id
+                citations_by_interview.setdefault(interview_id, []).append(
+                    Citation.model_validate(citation.model_dump(exclude={"abschnitt"}))
+                )
+
+            for interview_id, citations in citations_by_interview.items():
+                yield {
+                    "event_type": StreamEvent.SEARCH_RESULTS,
+                    "search_results": CitationList(zitate=citations),
+                    "interview_id": interview_id,
+                }
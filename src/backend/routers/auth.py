@@ -94,7 +94,7 @@ async def login(login: Login, session: DBSessionDep):
             detail=f"Missing the following keys in the payload: {missing_keys}.",
         )
 
-    user = strategy.login(session, payload)
+    user = await strategy.login(session, payload)
     if not user:
         raise HTTPException(
             status_code=401,
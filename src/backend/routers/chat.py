@@ -1,17 +1,25 @@
 from typing import Any, Generator
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sse_starlette.sse import EventSourceResponse
 
 from backend.config.routers import RouterName
 from backend.database_models.database import DBSessionDep
 from backend.model_deployments import TGIDeployment
-from backend.schemas.chat import ChatResponseEvent, SalonChatRequest
+from backend.schemas.chat import (
+    ChatResponseEvent,
+    SalonChatRequest,
+    SearchMode,
+    StreamEnd,
+)
 from backend.services.auth.utils import get_header_user_id
 from backend.services.chat import (
+    generate_chat_response,
     generate_chat_stream,
     process_chat,
 )
+from backend.services.compute import compute_service
+from backend.services.stream_buffer import stream_buffers
 
 router = APIRouter(
     prefix="/v1",
@@ -19,6 +27,24 @@ router = APIRouter(
 router.name = RouterName.CHAT  # type: ignore
 
 
+def validate_compute_capacity(chat_request: SalonChatRequest) -> None:
+    """
+    Reject study searches before anything is stored while the compute pool is full.
+
+    Raises:
+        HTTPException: If the compute pool is saturated.
+    """
+    if (
+        chat_request.search_mode == SearchMode.STUDY
+        and compute_service.is_saturated()
+    ):
+        raise HTTPException(
+            status_code=503,
+            detail="The server is busy, please try again in a few seconds.",
+            headers={"Retry-After": "5"},
+        )
+
+
 @router.post("/chat-stream")
 async def chat_stream(
     session: DBSessionDep,
@@ -40,6 +66,8 @@ async def chat_stream(
         EventSourceResponse: Server-sent event response with chatbot responses.
     """
     print(f"Description {chat_request.description}")
+    validate_compute_capacity(chat_request)
+
     (
         session,
         chat_request,
@@ -48,18 +76,67 @@ async def chat_stream(
         next_message_position,
     ) = process_chat(session, chat_request, request, user_id)
 
-    return EventSourceResponse(  # type: ignore
+    # Generate independently of the connection, so a dropped client can resume
+    # with GET /v1/conversations/{conversation_id}/messages/{message_id}/stream
+    buffer = stream_buffers.start(
+        response_message.id,
+        user_id,
+        chat_request.conversation_id,
         generate_chat_stream(
             session,
-            TGIDeployment().invoke_chat_stream(chat_request),
+            TGIDeployment().invoke_chat_stream(chat_request, user_id),
             response_message,
             should_store=should_store,
             next_message_position=next_message_position,
             conversation_id=chat_request.conversation_id,
             user_id=user_id,
         ),
+    )
+
+    return EventSourceResponse(  # type: ignore
+        buffer.subscribe(),
         media_type="text/event-stream",
         headers={"Connection": "keep-alive"},
         send_timeout=300,
         ping=5,
     )
+
+
+@router.post("/chat", response_model=StreamEnd)
+async def chat(
+    session: DBSessionDep,
+    chat_request: SalonChatRequest,
+    request: Request,
+    user_id: str = Depends(get_header_user_id),
+) -> StreamEnd:
+    """
+    Chat endpoint that returns the complete chatbot response at once, e.g. for
+    API integrations and batch jobs.
+
+    Args:
+        session (DBSessionDep): Database session.
+        chat_request (SalonChatRequest): Chat request data.
+        request (Request): Request object.
+
+    Returns:
+        StreamEnd: Chatbot response.
+    """
+    validate_compute_capacity(chat_request)
+
+    (
+        session,
+        chat_request,
+        response_message,
+        should_store,
+        next_message_position,
+    ) = process_chat(session, chat_request, request, user_id)
+
+    return await generate_chat_response(
+        session,
+        TGIDeployment().invoke_chat_stream(chat_request, user_id),
+        response_message,
+        should_store=should_store,
+        next_message_position=next_message_position,
+        conversation_id=chat_request.conversation_id,
+        user_id=user_id,
+    )
@@ -1,7 +1,8 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from pydantic import parse_obj_as
+from sse_starlette.sse import EventSourceResponse
 
 from backend.config.routers import RouterName
 from backend.crud import conversation as conversation_crud
@@ -17,11 +18,14 @@ from backend.schemas.conversation import (
 from backend.services.auth.utils import get_header_user_id
 from backend.services.conversation import (
     filter_conversations,
-    generate_conversation_title,
     get_documents_to_rerank,
     get_messages_with_files,
     validate_conversation,
 )
+from backend.services.request_loader import RequestLoaderDep
+from backend.services.retrieval_session import retrieval_sessions
+from backend.services.stream_buffer import stream_buffers
+from backend.services.title_generation import title_generation_queue
 
 router = APIRouter(
     prefix="/v1/conversations",
@@ -34,6 +38,7 @@ router.name = RouterName.CONVERSATION  # type: ignore
 async def get_conversation(
     conversation_id: str,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
     request: Request,
     user_id: str = Depends(get_header_user_id),
 ) -> Conversation:
@@ -43,6 +48,7 @@ async def get_conversation(
     Args:
         conversation_id (str): Conversation ID.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
         request (Request): Request object.
 
     Returns:
@@ -51,16 +57,9 @@ async def get_conversation(
     Raises:
         HTTPException: If the conversation with the given ID is not found.
     """
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
-
-    if not conversation:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation with ID: {conversation_id} not found.",
-        )
+    conversation = validate_conversation(loader, conversation_id, user_id)
 
     messages = get_messages_with_files(session, user_id, conversation.messages)
-    _ = validate_conversation(session, conversation_id, user_id)
 
     conversation = Conversation(
         id=conversation.id,
@@ -74,7 +73,6 @@ async def get_conversation(
         is_pinned=conversation.is_pinned,
     )
 
-    _ = validate_conversation(session, conversation_id, user_id)
     return conversation
 
 
@@ -136,6 +134,7 @@ async def update_conversation(
     conversation_id: str,
     new_conversation: UpdateConversationRequest,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
     request: Request,
     user_id: str = Depends(get_header_user_id),
 ) -> Conversation:
@@ -146,6 +145,7 @@ async def update_conversation(
         conversation_id (str): Conversation ID.
         new_conversation (UpdateConversationRequest): New conversation data.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
 
     Returns:
         Conversation: Updated conversation.
@@ -153,7 +153,7 @@ async def update_conversation(
     Raises:
         HTTPException: If the conversation with the given ID is not found.
     """
-    conversation = validate_conversation(session, conversation_id, user_id)
+    conversation = validate_conversation(loader, conversation_id, user_id)
     conversation = conversation_crud.update_conversation(
         session, conversation, new_conversation
     )
@@ -177,10 +177,11 @@ async def toggle_conversation_pin(
     conversation_id: str,
     new_conversation_pin: ToggleConversationPinRequest,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
     request: Request,
     user_id: str = Depends(get_header_user_id),
 ) -> ConversationWithoutMessages:
-    conversation = validate_conversation(session, conversation_id, user_id)
+    conversation = validate_conversation(loader, conversation_id, user_id)
     conversation = conversation_crud.toggle_conversation_pin(
         session, conversation, new_conversation_pin
     )
@@ -201,6 +202,7 @@ async def toggle_conversation_pin(
 async def delete_conversation(
     conversation_id: str,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
     request: Request,
     user_id: str = Depends(get_header_user_id),
 ) -> DeleteConversationResponse:
@@ -210,6 +212,7 @@ async def delete_conversation(
     Args:
         conversation_id (str): Conversation ID.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
 
     Returns:
         DeleteConversationResponse: Empty response.
@@ -217,9 +220,10 @@ async def delete_conversation(
     Raises:
         HTTPException: If the conversation with the given ID is not found.
     """
-    validate_conversation(session, conversation_id, user_id)
+    validate_conversation(loader, conversation_id, user_id)
 
     conversation_crud.delete_conversation(session, conversation_id, user_id)
+    retrieval_sessions.discard(conversation_id)
 
     return DeleteConversationResponse()
 
@@ -283,43 +287,87 @@ async def search_conversations(
     return results
 
 
+@router.get("/{conversation_id}/messages/{message_id}/stream")
+async def resume_chat_stream(
+    conversation_id: str,
+    message_id: str,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    user_id: str = Depends(get_header_user_id),
+):
+    """
+    Resume the stream of a response that is being generated, or finished less than
+    a minute ago, e.g. after the connection of the chat stream dropped.
+
+    Args:
+        conversation_id (str): Conversation ID.
+        message_id (str): ID of the response message, sent in the stream-start event.
+        last_event_id (Optional[str]): ID of the last event the client received.
+
+    Returns:
+        EventSourceResponse: The missed events, followed by the live events.
+
+    Raises:
+        HTTPException: If the stream is not found or the missed events are no longer buffered.
+    """
+    buffer = stream_buffers.get(message_id)
+    if (
+        buffer is None
+        or buffer.user_id != user_id
+        or buffer.conversation_id != conversation_id
+    ):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Stream of message with ID: {message_id} not found.",
+        )
+
+    try:
+        last_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Last-Event-ID must be an event ID."
+        )
+    if not buffer.can_resume(last_id):
+        raise HTTPException(
+            status_code=410,
+            detail="The missed events are no longer available, please retry the message.",
+        )
+
+    return EventSourceResponse(
+        buffer.subscribe(last_id),
+        media_type="text/event-stream",
+        headers={"Connection": "keep-alive"},
+        send_timeout=300,
+        ping=5,
+    )
+
+
 # MISC
 @router.post("/{conversation_id}/generate-title", response_model=GenerateTitleResponse)
 async def generate_title(
     conversation_id: str,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
     request: Request,
     user_id: str = Depends(get_header_user_id),
 ) -> GenerateTitleResponse:
     """
-    Generate a title for a conversation and update the conversation with the generated title.
+    Queue the generation of a title for a conversation. Titles are generated in
+    batches in the background, until then the conversation keeps its current title.
 
     Args:
         conversation_id (str): Conversation ID.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
         request (Request): Request object.
-          (Context): Context object.
 
     Returns:
-        str: Generated title for the conversation.
+        GenerateTitleResponse: Current title of the conversation.
 
     Raises:
         HTTPException: If the conversation with the given ID is not found.
     """
 
-    conversation = validate_conversation(session, conversation_id, user_id)
-
-    title, error = await generate_conversation_title(
-        session,
-        parse_obj_as(Conversation, conversation),
-        user_id,
-    )
-
-    conversation_crud.update_conversation(
-        session, conversation, UpdateConversationRequest(title=title)
-    )
+    conversation = validate_conversation(loader, conversation_id, user_id)
+    title_generation_queue.enqueue(conversation.id)
 
-    return GenerateTitleResponse(
-        title=title,
-        error=error,
-    )
+    return GenerateTitleResponse(title=conversation.title)
@@ -0,0 +1,113 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from backend.config.routers import RouterName
+from backend.schemas.persona_interview import (
+    CreatePersonaInterviewJobRequest,
+    ExportFormat,
+    PersonaInterviewJob,
+    PersonaInterviewStatus,
+)
+from backend.services.auth.utils import get_header_user_id
+from backend.services.persona_interview import (
+    export_persona_interview,
+    persona_interview_runner,
+)
+
+router = APIRouter(
+    prefix="/v1/persona-interviews",
+)
+router.name = RouterName.PERSONA_INTERVIEW  # type: ignore
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def get_job(job_id: str, user_id: str) -> PersonaInterviewJob:
+    job = persona_interview_runner.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Persona interview job with ID: {job_id} not found.",
+        )
+    return job
+
+
+@router.post("", response_model=PersonaInterviewJob)
+async def create_persona_interview_job(
+    job_request: CreatePersonaInterviewJobRequest,
+    user_id: str = Depends(get_header_user_id),
+) -> PersonaInterviewJob:
+    """
+    Start a job that asks every persona all questions with the kerlin agent.
+    Each persona's interview is stored as a conversation.
+
+    Args:
+        job_request (CreatePersonaInterviewJobRequest): Personas and questions.
+
+    Returns:
+        PersonaInterviewJob: The started job.
+
+    Raises:
+        HTTPException: If the job has too many personas or questions.
+    """
+    return persona_interview_runner.start(user_id, job_request)
+
+
+@router.get("/{job_id}", response_model=PersonaInterviewJob)
+async def get_persona_interview_job(
+    job_id: str,
+    user_id: str = Depends(get_header_user_id),
+) -> PersonaInterviewJob:
+    """
+    Get the progress of a job.
+
+    Args:
+        job_id (str): Job ID.
+
+    Returns:
+        PersonaInterviewJob: The job with its progress.
+
+    Raises:
+        HTTPException: If the job is not found.
+    """
+    return get_job(job_id, user_id)
+
+
+@router.get("/{job_id}/export")
+async def export_persona_interview_job(
+    job_id: str,
+    format: ExportFormat = ExportFormat.CSV,
+    user_id: str = Depends(get_header_user_id),
+) -> Response:
+    """
+    Export the answers of a finished job with one row per persona and question.
+
+    Args:
+        job_id (str): Job ID.
+        format (ExportFormat): CSV or Parquet.
+
+    Returns:
+        Response: The exported file.
+
+    Raises:
+        HTTPException: If the job is not found or still running.
+    """
+    job = get_job(job_id, user_id)
+    if job.status in (PersonaInterviewStatus.QUEUED, PersonaInterviewStatus.RUNNING):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Persona interview job with ID: {job_id} is still running.",
+        )
+
+    content = await asyncio.to_thread(export_persona_interview, job, format)
+    return Response(
+        content=content,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{job_id}.{format.value}"'
+        },
+    )
@@ -1,21 +1,28 @@
-import pathlib
-import shutil
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException
 
 from backend.config.routers import RouterName
 from backend.crud import interview as interview_crud
 from backend.crud import study as study_crud
 from backend.database_models.database import DBSessionDep
 from backend.database_models.study import Study as StudyModel
-from backend.schemas.interview import Interview
+from backend.schemas.interview import InterviewSummary
 from backend.schemas.study import (
     CreateStudyRequest,
     DeleteStudy,
     Study,
+    StudyIngestionFile,
+    StudyIngestionJob,
     UpdateStudyRequest,
 )
+from backend.services.ingestion import (
+    delete_uploads,
+    get_upload_path,
+    ingestion_queue,
+    save_upload,
+)
+from backend.services.request_loader import RequestLoaderDep
 from backend.services.request_validators import (
     validate_create_study_request,
     validate_update_study_request,
@@ -61,22 +68,45 @@ async def create_study(
         is_being_added=True,
     )
 
-    saved_files = []
-    for file in [study.meta_file] + study.ti_files + study.gd_files + study.memo_files:
-        file_path = pathlib.Path(f"../data/videos/{study.name}/{file.filename}")
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_files.append(file_path)
-
-    # process files asynchronously
-    # background_tasks.add_task(process_files, saved_files)
-
     try:
         created_study = study_crud.create_study(session, study_data)
-        return created_study
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    job = StudyIngestionJob(study_id=created_study.id)
+    try:
+        job.meta_file = str(
+            await save_upload(
+                study.meta_file,
+                get_upload_path(created_study.id, "meta", study.meta_file.filename),
+            )
+        )
+        for interview_type, files in (
+            ("TI", study.ti_files),
+            ("GD", study.gd_files),
+            ("Memo", study.memo_files),
+        ):
+            for file in files:
+                path = await save_upload(
+                    file,
+                    get_upload_path(created_study.id, interview_type, file.filename),
+                )
+                job.files.append(
+                    StudyIngestionFile(path=str(path), interview_type=interview_type)
+                )
+    except Exception as e:
+        # Nothing was ingested yet, so the study is removed and can be uploaded
+        # again under the same name instead of staying is_being_added forever
+        study_crud.delete_study(session, created_study.id)
+        delete_uploads(created_study.id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Interviews are parsed, chunked and indexed in the background,
+    # the study reports is_being_added until the job is done
+    ingestion_queue.enqueue(job)
+
+    return created_study
+
 
 @router.get("", response_model=list[Study])
 async def list_studies(
@@ -154,6 +184,7 @@ async def update_study(
     study_id: str,
     new_study: UpdateStudyRequest,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
 ) -> Study:
     """
     Update a study by ID.
@@ -162,6 +193,7 @@ async def update_study(
         study_id (str): Study ID.
         new_study (UpdateStudyRequest): New study data.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
           (Context): Context object.
 
     Returns:
@@ -170,7 +202,7 @@ async def update_study(
     Raises:
         HTTPException: If the study is not found.
     """
-    study = validate_study_exists(session, study_id)
+    study = validate_study_exists(loader, study_id)
 
     try:
         study = study_crud.update_study(session, study, new_study)
@@ -184,6 +216,7 @@ async def update_study(
 async def delete_study(
     study_id: str,
     session: DBSessionDep,
+    loader: RequestLoaderDep,
 ) -> DeleteStudy:
     """
     Delete a study by ID.
@@ -191,6 +224,7 @@ async def delete_study(
     Args:
         study_id (str): Study ID.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
           (Context): Context object.
 
     Returns:
@@ -199,7 +233,7 @@ async def delete_study(
     Raises:
         HTTPException: If the study is not found.
     """
-    _ = validate_study_exists(session, study_id)
+    _ = validate_study_exists(loader, study_id)
     deleted = study_crud.delete_study(session, study_id)
     if not deleted:
         raise HTTPException(status_code=401, detail="Could not delete Study.")
@@ -207,22 +241,27 @@ async def delete_study(
     return DeleteStudy()
 
 
-@router.get("/{study_id}/interviews", response_model=list[Interview])
-async def list_files(study_id: str, session: DBSessionDep) -> list[Interview]:
+@router.get("/{study_id}/interviews", response_model=list[InterviewSummary])
+async def list_files(
+    study_id: str, session: DBSessionDep, loader: RequestLoaderDep
+) -> list[InterviewSummary]:
     """
     List all interviews from a study. Important - no pagination support yet.
 
     Args:
         study_id (str): Study ID.
         session (DBSessionDep): Database session.
+        loader (RequestLoaderDep): Loader of the request.
           (Context): Context object.
 
     Returns:
-        list[Interview]: List of interviews from the study.
+        list[InterviewSummary]: List of interviews from the study, without their transcripts.
 
     Raises:
         HTTPException: If the study with the given ID is not found.
     """
-    _ = validate_study_exists(session, study_id)
+    _ = validate_study_exists(loader, study_id)
 
-    return interview_crud.get_interviews_by_study_id(session, study_id)
+    return interview_crud.get_interviews_by_study_id(
+        session, study_id, with_text=False
+    )
@@ -6,6 +6,7 @@ from backend.database_models import User as UserModel
 from backend.database_models.database import DBSessionDep
 from backend.schemas.user import CreateUser, DeleteUser, UpdateUser, User
 from backend.schemas.user import User as UserSchema
+from backend.services.user_cache import user_id_cache
 
 router = APIRouter(prefix="/v1/users")
 router.name = RouterName.USER  # type: ignore
@@ -28,6 +29,8 @@ async def create_user(
     """
     db_user = UserModel(**user.model_dump(exclude_none=True))
     db_user = user_crud.create_user(session, db_user)
+    # The ID may have been cached as unknown
+    await user_id_cache.invalidate(db_user.id)
 
     return db_user
 
@@ -115,6 +118,7 @@ async def update_user(
         )
 
     user = user_crud.update_user(session, user, new_user)
+    await user_id_cache.invalidate(user_id)
     UserSchema.model_validate(user)
 
     return user
@@ -148,5 +152,6 @@ async def delete_user(
 
     UserSchema.model_validate(user)
     user_crud.delete_user(session, user_id)
+    await user_id_cache.invalidate(user_id)
 
     return DeleteUser()
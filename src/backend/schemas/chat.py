@@ -14,11 +14,39 @@ class StreamEvent(str, Enum):
     """
 
     STREAM_START = "stream-start"
+    QUEUE_POSITION = "queue-position"
     SEARCH_RESULTS = "search-results"
     TEXT_GENERATION = "text-generation"
     STREAM_END = "stream-end"
 
 
+class FinishReason(StrEnum):
+    """Why the model stopped generating a response."""
+
+    COMPLETE = "COMPLETE"
+    # The response reached the maximum number of new tokens
+    MAX_TOKENS = "MAX_TOKENS"
+    # The client disconnected before the response was complete
+    CANCELLED = "CANCELLED"
+    # A top-K search found enough citations above the minimum score
+    TOP_K_REACHED = "TOP_K_REACHED"
+    # A top-K search ran out of time before searching every interview
+    TIME_BUDGET_EXHAUSTED = "TIME_BUDGET_EXHAUSTED"
+    # The generation failed, e.g. because the compute pool was saturated
+    ERROR = "ERROR"
+
+
+class SearchMode(StrEnum):
+    """How the interviews of a search request are searched."""
+
+    # One LLM call per interview over its full transcript
+    INTERVIEW = "interview"
+    # One LLM call per batch of the best passages of all interviews in the study
+    STUDY = "study"
+    # One LLM call per interview in BM25 order, until enough strong citations are found
+    TOP_K = "top_k"
+
+
 class ChatRole(StrEnum):
     """One of model|user|system to identify who the message is coming from."""
 
@@ -55,6 +83,17 @@ class StreamStart(ChatResponse):
     event_type: ClassVar[StreamEvent] = StreamEvent.STREAM_START
     generation_id: str | None = Field(default=None)
     conversation_id: str | None = Field(default=None)
+    message_id: str | None = Field(default=None)
+
+
+class StreamQueuePosition(ChatResponse):
+    """Sent while the request waits for the model, whenever its position changes."""
+
+    event_type: ClassVar[StreamEvent] = StreamEvent.QUEUE_POSITION
+
+    position: int = Field(
+        title="1-based position of the request in the queue.",
+    )
 
 
 class StreamTextGeneration(ChatResponse):
@@ -103,6 +142,7 @@ class StreamEnd(ChatResponse):
 
 StreamEventType = Union[
     StreamStart,
+    StreamQueuePosition,
     StreamTextGeneration,
     StreamSearchResults,
     StreamEnd,
@@ -146,6 +186,10 @@ class SalonChatRequest(BaseModel):
     interviews: list[Interview] | None = Field(
         title="The interviews that should be searched.", default=None
     )
+    search_mode: SearchMode = Field(
+        title="Whether to search every interview separately or the best passages of the whole study.",
+        default=SearchMode.INTERVIEW,
+    )
 
     # this option is only used for the syntehtic user task
     description: str | None = Field(
@@ -19,3 +19,16 @@ class CitationList(BaseModel):
     zitate: list[Citation] = Field(
         ..., description="Eine Liste von Zitaten, die in einem Text gefunden wurden."
     )
+
+
+class PassageCitation(Citation):
+    abschnitt: int = Field(
+        ..., description="Die Nummer des Abschnitts, aus dem das Zitat stammt."
+    )
+
+
+class PassageCitationList(BaseModel):
+    zitate: list[PassageCitation] = Field(
+        ...,
+        description="Eine Liste von Zitaten, die in den Abschnitten gefunden wurden.",
+    )
@@ -3,19 +3,33 @@ from typing import Optional
 from pydantic import BaseModel
 
 
-class Interview(BaseModel):
-    text: str
+class InterviewSummary(BaseModel):
     id: str
 
     title: str
     interview_type: str
     fields: Optional[dict] = None
     study_id: str
+    content_hash: Optional[str] = None
+    text_size: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class SpeakerTurn(BaseModel):
+    speaker: str
+    is_interviewer: bool
+    # Offsets of what was said in `Interview.text`, without the speaker label
+    start_pos: int
+    end_pos: int
+
+
+class Interview(InterviewSummary):
+    text: str
+    speaker_turns: Optional[list[SpeakerTurn]] = None
+
+
 class InterviewChunk(BaseModel):
     interview_id: str
     original_text: str
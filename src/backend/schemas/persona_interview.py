@@ -0,0 +1,52 @@
+import datetime
+from enum import StrEnum
+from typing import Optional
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class PersonaInterviewStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class CreatePersonaInterviewJobRequest(BaseModel):
+    name: Optional[str] = None
+    personas: list[str] = Field(
+        ...,
+        min_length=1,
+        title="Descriptions of the simulated personas, as used by the kerlin agent.",
+    )
+    questions: list[str] = Field(
+        ...,
+        min_length=1,
+        title="Questionnaire, every persona answers all questions in order.",
+    )
+
+
+class PersonaInterviewJob(BaseModel):
+    id: str
+    user_id: str = Field(exclude=True)
+    name: str
+    created_at: datetime.datetime
+    status: PersonaInterviewStatus = PersonaInterviewStatus.QUEUED
+    total_answers: int
+    completed_answers: int = 0
+    failed_personas: int = 0
+    conversation_ids: list[Optional[str]] = Field(
+        default=[],
+        title="Conversation of every persona, None until the persona is stored.",
+    )
+    error: Optional[str] = None
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def progress(self) -> float:
+        return self.completed_answers / self.total_answers if self.total_answers else 1.0
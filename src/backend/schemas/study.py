@@ -12,6 +12,7 @@ class Study(BaseModel):
 
     name: str
     is_transcribed: bool = False
+    is_being_added: bool = False
     description: Optional[str] = None
 
     class Config:
@@ -48,3 +49,14 @@ class DeleteStudy(BaseModel):
 
 class ListStudiesResponse(BaseModel):
     studies: list[Study]
+
+
+class StudyIngestionFile(BaseModel):
+    path: str
+    interview_type: str
+
+
+class StudyIngestionJob(BaseModel):
+    study_id: str
+    meta_file: Optional[str] = None
+    files: list[StudyIngestionFile] = []
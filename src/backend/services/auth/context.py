@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import Request
+from pydantic import BaseModel
+
+
+class AuthContext(BaseModel):
+    """
+    Principal of a request, resolved once and kept on `request.state`.
+    """
+
+    user_id: str
+    # Decoded JWT payload, None if authentication is disabled
+    token: Optional[dict] = None
+    # Whether the token was checked against the blacklist
+    is_verified: bool = False
+
+
+def get_auth_context(request: Request) -> Optional[AuthContext]:
+    """
+    Get the principal of the request, if it was already resolved.
+
+    Args:
+        request (Request): current Request
+
+    Returns:
+        Optional[AuthContext]: Principal of the request.
+    """
+    return getattr(request.state, "auth", None)
+
+
+def set_auth_context(request: Request, context: AuthContext) -> AuthContext:
+    request.state.auth = context
+    return context
@@ -1,5 +1,6 @@
 import datetime
 import uuid
+from functools import lru_cache
 from typing import Optional
 
 import jwt
@@ -66,3 +67,14 @@ class JWTService:
         except jwt.InvalidTokenError:
             print("[Auth] JWT token is expired.")
             return None
+
+
+@lru_cache(maxsize=1)
+def get_jwt_service() -> JWTService:
+    """
+    Get a JWT service, reading the secret key from the settings only once.
+
+    Returns:
+        JWTService: Shared JWT service.
+    """
+    return JWTService()
@@ -7,26 +7,27 @@ from sqlalchemy.orm import Session
 from starlette import status
 
 from backend.database_models import Blacklist, get_session
-from backend.services.auth.jwt import JWTService
+from backend.services.auth.context import (
+    AuthContext,
+    get_auth_context,
+    set_auth_context,
+)
+from backend.services.auth.jwt import get_jwt_service
 
 
-def validate_authorization(
-    request: Request, session: Session = Depends(get_session)
-) -> dict:
+def decode_authorization_header(request: Request) -> dict:
     """
-    Validate that the request has the `Authorization` header, used for requests
-    that require authentication.
+    Decode the bearer token of the `Authorization` header.
 
     Args:
         request (Request): The request to validate
 
     Raises:
-        HTTPException: If no `Authorization` header.
+        HTTPException: If the header is missing, or the token is invalid or expired.
 
     Returns:
         dict: Decoded payload.
     """
-
     authorization = request.headers.get("Authorization")
     if not authorization:
         raise HTTPException(
@@ -48,13 +49,44 @@ def validate_authorization(
             detail="Authorization: Bearer <token> required in request headers.",
         )
 
-    decoded = JWTService().decode_jwt(token)
+    decoded = get_jwt_service().decode_jwt(token)
 
     if not decoded or "context" not in decoded:
         raise HTTPException(
             status_code=401, detail="Bearer token is invalid or expired."
         )
 
+    return decoded
+
+
+def validate_authorization(
+    request: Request, session: Session = Depends(get_session)
+) -> dict:
+    """
+    Validate that the request has the `Authorization` header, used for requests
+    that require authentication. The token is verified once per request, the
+    principal is stored on `request.state` for `get_header_user_id`.
+
+    Args:
+        request (Request): The request to validate
+
+    Raises:
+        HTTPException: If no `Authorization` header.
+
+    Returns:
+        dict: Decoded payload.
+    """
+
+    context = get_auth_context(request)
+    if context is not None and context.is_verified:
+        return context.token
+
+    if context is not None and context.token is not None:
+        # Decoded by `get_header_user_id`, only the blacklist is left to check
+        decoded = context.token
+    else:
+        decoded = decode_authorization_header(request)
+
     blacklist = (
         session.query(Blacklist).filter(Blacklist.token_id == decoded["jti"]).first()
     )
@@ -63,6 +95,10 @@ def validate_authorization(
     if blacklist is not None:
         raise HTTPException(status_code=401, detail="Bearer token is blacklisted.")
 
+    set_auth_context(
+        request,
+        AuthContext(user_id=decoded["context"]["id"], token=decoded, is_verified=True),
+    )
     return decoded
 
 
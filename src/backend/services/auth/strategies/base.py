@@ -20,7 +20,7 @@ class BaseAuthenticationStrategy:
         ...
 
     @abstractmethod
-    def login(self, **kwargs: Any):
+    async def login(self, **kwargs: Any):
         """
         Check email/password credentials and return JWT token.
         """
@@ -80,6 +80,12 @@ class BaseOAuthStrategy:
         """
         ...
 
+    async def close(self):
+        """
+        Closes the connections to the OAuth provider.
+        """
+        ...
+
     @abstractmethod
     async def authorize(self, **kwargs: Any):
         """
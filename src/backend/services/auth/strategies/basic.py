@@ -1,12 +1,31 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List
 
 import bcrypt
 from sqlalchemy.orm import Session
 
+from backend.config.settings import Settings
 from backend.database_models.user import User
 from backend.services.auth.strategies.base import BaseAuthenticationStrategy
 
 
+@lru_cache(maxsize=1)
+def get_password_executor() -> ThreadPoolExecutor:
+    """
+    Get the bounded thread pool that checks passwords. bcrypt releases the GIL,
+    so a burst of logins is spread over the pool instead of freezing the event loop.
+
+    Returns:
+        ThreadPoolExecutor: Shared password pool.
+    """
+    return ThreadPoolExecutor(
+        max_workers=Settings().auth.password_hash_workers,
+        thread_name_prefix="password",
+    )
+
+
 class BasicAuthentication(BaseAuthenticationStrategy):
     """
     Basic email/password strategy.
@@ -51,7 +70,27 @@ class BasicAuthentication(BaseAuthenticationStrategy):
         """
         return bcrypt.checkpw(plain_text_password.encode("utf-8"), hashed_password)
 
-    def login(self, session: Session, payload: dict[str, str]) -> dict | None:
+    async def check_password_async(
+        self, plain_text_password: str, hashed_password: str
+    ) -> bool:
+        """
+        Checks a password in the password pool, off the event loop.
+
+        Args:
+            plain_text_password (str): Password to check.
+            hashed_password (str): Password to check against.
+
+        Returns:
+            bool: Whether the plain-text password matches the given hashed password.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            get_password_executor(),
+            self.check_password,
+            plain_text_password,
+            hashed_password,
+        )
+
+    async def login(self, session: Session, payload: dict[str, str]) -> dict | None:
         """
         Logs user in, checking the if the hashed input password corresponds to the
         one stored in the DB.
@@ -71,7 +110,7 @@ class BasicAuthentication(BaseAuthenticationStrategy):
         if not user:
             return None
 
-        if self.check_password(payload_password, user.hashed_password):
+        if await self.check_password_async(payload_password, user.hashed_password):
             return {
                 "id": user.id,
                 "fullname": user.fullname,
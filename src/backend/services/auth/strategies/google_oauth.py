@@ -1,9 +1,9 @@
-import requests
-from authlib.integrations.requests_client import OAuth2Session
+from authlib.integrations.httpx_client import AsyncOAuth2Client
 from starlette.requests import Request
 
 from backend.config.settings import Settings
 from backend.services.auth.strategies.base import BaseOAuthStrategy
+from backend.services.auth.well_known import well_known_cache
 
 
 class GoogleOAuth(BaseOAuthStrategy):
@@ -20,7 +20,8 @@ class GoogleOAuth(BaseOAuthStrategy):
             self.REDIRECT_URI = (
                 f"{Settings().auth.frontend_hostname}/auth/{self.NAME.lower()}"
             )
-            self.client = OAuth2Session(
+            # Shared by all logins, so connections to the provider are pooled
+            self.client = AsyncOAuth2Client(
                 client_id=self.settings.client_id,
                 client_secret=self.settings.client_secret,
             )
@@ -44,8 +45,7 @@ class GoogleOAuth(BaseOAuthStrategy):
         return False
 
     async def get_endpoints(self):
-        response = requests.get(self.WELL_KNOWN_ENDPOINT)
-        endpoints = response.json()
+        endpoints = await well_known_cache.get(self.WELL_KNOWN_ENDPOINT)
         try:
             self.TOKEN_ENDPOINT = endpoints["token_endpoint"]
             self.USERINFO_ENDPOINT = endpoints["userinfo_endpoint"]
@@ -56,6 +56,9 @@ class GoogleOAuth(BaseOAuthStrategy):
             )
             raise
 
+    async def close(self):
+        await self.client.aclose()
+
     async def authorize(self, request: Request) -> dict | None:
         """
         Authenticates the current user using their Google account.
@@ -66,11 +69,19 @@ class GoogleOAuth(BaseOAuthStrategy):
         Returns:
             Access token.
         """
-        _ = self.client.fetch_token(
+        # Refreshes the endpoints once the discovery document expired
+        await self.get_endpoints()
+        token = await self.client.fetch_token(
             url=self.TOKEN_ENDPOINT,
             authorization_response=str(request.url),
             redirect_uri=self.REDIRECT_URI,
         )
-        user_info = self.client.get(self.USERINFO_ENDPOINT)
+        # The client is shared, so the token of this login is passed explicitly
+        user_info = await self.client.request(
+            "GET",
+            self.USERINFO_ENDPOINT,
+            withhold_token=True,
+            headers={"Authorization": f"Bearer {token['access_token']}"},
+        )
 
         return user_info.json()
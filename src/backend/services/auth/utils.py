@@ -4,6 +4,11 @@ from sqlalchemy.orm import Session
 from backend.config.auth import ENABLED_AUTH_STRATEGY_MAPPING, is_authentication_enabled
 from backend.crud import user as user_crud
 from backend.database_models import User
+from backend.services.auth.context import (
+    AuthContext,
+    get_auth_context,
+    set_auth_context,
+)
 
 
 def is_enabled_authentication_strategy(strategy_name: str) -> bool:
@@ -58,33 +63,44 @@ def get_or_create_user(session: Session, token_user: dict[str, str]) -> dict:
 
 def get_header_user_id(request: Request) -> str:
     """
-    Retrieves the user_id from request headers, will work whether authentication is enabled or not.
+    Retrieves the user_id of the request, will work whether authentication is enabled or not.
 
     (Auth disabled): retrieves the User-Id header value
-    (Auth enabled): retrieves the Authorization header, and decodes the value
+    (Auth enabled): retrieves the principal stored by `validate_authorization`,
+        or decodes the Authorization header if the route isn't validated
+
+    The result is kept on `request.state`, so the token is decoded at most once per request.
 
     Args:
         request (Request): current Request
 
 
     Returns:
-        str: User ID
+        str: User ID, empty if the request has none
     """
-    # Import here to avoid circular imports
-    from backend.services.auth.jwt import JWTService
+    context = get_auth_context(request)
+    if context is not None:
+        return context.user_id
 
     # Check if Auth enabled
     if is_authentication_enabled():
-        # Validation already performed, so just retrieve value
-        authorization = request.headers.get("Authorization")
-        _, token = authorization.split(" ")
-        decoded = JWTService().decode_jwt(token)
-
-        return decoded["context"]["id"]
+        # Import here to avoid circular imports
+        from backend.services.auth.jwt import get_jwt_service
+
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        decoded = (
+            get_jwt_service().decode_jwt(token) if scheme.lower() == "bearer" else None
+        )
+        if not decoded or "context" not in decoded:
+            return ""
+
+        context = AuthContext(user_id=decoded["context"]["id"], token=decoded)
     # Auth disabled
     else:
-        user_id = request.headers.get("User-Id", "")
-        return user_id
+        context = AuthContext(user_id=request.headers.get("User-Id", ""))
+
+    return set_auth_context(request, context).user_id
 
 
 def has_header_user_id(request: Request) -> bool:
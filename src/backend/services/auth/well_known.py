@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from backend.config.settings import Settings
+
+
+class WellKnownCache:
+    """
+    Caches the OAuth discovery documents (`.well-known/openid-configuration`)
+    for `ttl` seconds. If a refresh fails, the stale document is used until the
+    provider answers again.
+    """
+
+    def __init__(self):
+        self.documents: dict[str, tuple[float, dict]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _is_fresh(self, url: str) -> bool:
+        return url in self.documents and self.documents[url][0] > time.monotonic()
+
+    async def get(self, url: str) -> dict:
+        """
+        Get a discovery document, fetching it if it isn't cached or expired.
+
+        Args:
+            url (str): URL of the document.
+
+        Returns:
+            dict: The discovery document.
+        """
+        if self._is_fresh(url):
+            return self.documents[url][1]
+
+        # Concurrent logins wait for a single fetch
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            if self._is_fresh(url):
+                return self.documents[url][1]
+
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=10.0)
+            try:
+                response = await self._client.get(url)
+                response.raise_for_status()
+                document = response.json()
+            except httpx.HTTPError as e:
+                if url not in self.documents:
+                    raise
+                print(f"[Auth] Could not refresh {url}, using cached document: {str(e)}")
+                return self.documents[url][1]
+
+            ttl = Settings().auth.well_known_ttl
+            self.documents[url] = (time.monotonic() + ttl, document)
+            return document
+
+
+well_known_cache = WellKnownCache()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import Any, AsyncGenerator, Optional
 from uuid import uuid4
@@ -20,15 +21,20 @@ from backend.schemas.chat import (
     ChatMessage,
     ChatResponseEvent,
     ChatRole,
+    FinishReason,
     StreamEnd,
     StreamEvent,
     StreamEventType,
+    StreamQueuePosition,
     StreamSearchResults,
     StreamStart,
     StreamTextGeneration,
 )
-from backend.schemas.conversation import UpdateConversationRequest
+from backend.schemas.citation import CitationList
 from backend.schemas.interview import Interview
+from backend.services.request_loader import RequestLoader, get_request_loader
+from backend.services.retrieval_session import retrieval_sessions
+from backend.services.title_generation import title_generation_queue
 
 
 def process_chat(
@@ -53,6 +59,7 @@ def process_chat(
     should_store = chat_request.chat_history is None
     conversation = get_or_create_conversation(
         session,
+        get_request_loader(request, session),
         chat_request,
         user_id,
         should_store,
@@ -62,12 +69,18 @@ def process_chat(
 
     # Get position to put next message in
     next_message_position = get_next_message_position(conversation)
+    # Read before the messages are stored, committing them expires the
+    # conversation, which would load it and its messages again
+    conversation_id = conversation.id
+    chat_history = create_chat_history(
+        conversation, next_message_position, chat_request
+    )
 
     # store user message
     create_message(
         session,
         chat_request,
-        conversation.id,
+        conversation_id,
         user_id,
         next_message_position,
         chat_request.message,
@@ -80,7 +93,7 @@ def process_chat(
     chatbot_message = create_message(
         session,
         chat_request,
-        conversation.id,
+        conversation_id,
         user_id,
         next_message_position,
         "",
@@ -90,25 +103,20 @@ def process_chat(
     )
 
     print(f"Study ID: {chat_request.study_id}")
-    chat_interviews = None
-    if chat_request.interview_ids:
-        chat_interviews = interview_crud.get_interviews_by_ids(
-            session, chat_request.interview_ids
-        )
-    elif chat_request.study_id:
-        chat_interviews = interview_crud.get_interviews_by_study_id(
-            session, chat_request.study_id
+    if should_store and chat_request.agent_id == "zitatki":
+        # Follow-up questions reuse the interviews parsed in earlier turns
+        chat_interviews = retrieval_sessions.get_interviews(
+            session,
+            conversation_id,
+            chat_request.study_id,
+            chat_request.interview_ids,
         )
-
-    chat_history = create_chat_history(
-        conversation, next_message_position, chat_request
-    )
+    else:
+        chat_interviews = get_chat_interviews(session, chat_request)
 
     chat_request.chat_history = chat_history
-    chat_request.conversation_id = conversation.id
-    chat_request.interviews = (
-        parse_obj_as(list[Interview], chat_interviews) if chat_interviews else None
-    )
+    chat_request.conversation_id = conversation_id
+    chat_request.interviews = chat_interviews or None
 
     return (
         session,
@@ -119,6 +127,31 @@ def process_chat(
     )
 
 
+def get_chat_interviews(
+    session: DBSessionDep, chat_request: SalonChatRequest
+) -> list[Interview]:
+    """
+    Load the interviews selected by a chat request.
+
+    Args:
+        session (DBSessionDep): Database session.
+        chat_request (SalonChatRequest): Chat request data.
+
+    Returns:
+        list[Interview]: Selected interviews, by ID or else of the study.
+    """
+    chat_interviews = []
+    if chat_request.interview_ids:
+        chat_interviews = interview_crud.get_interviews_by_ids(
+            session, chat_request.interview_ids
+        )
+    elif chat_request.study_id:
+        chat_interviews = interview_crud.get_interviews_by_study_id(
+            session, chat_request.study_id
+        )
+    return parse_obj_as(list[Interview], chat_interviews)
+
+
 def get_last_message(
     conversation: Conversation, user_id: str, agent: MessageAgent
 ) -> Message:
@@ -153,6 +186,7 @@ def get_last_message(
 
 def get_or_create_conversation(
     session: DBSessionDep,
+    loader: RequestLoader,
     chat_request: SalonChatRequest,
     user_id: str,
     should_store: bool,
@@ -164,6 +198,7 @@ def get_or_create_conversation(
 
     Args:
         session (DBSessionDep): Database session.
+        loader (RequestLoader): Loader of the request.
         chat_request (SalonChatRequest): Chat request data.
         user_id (str): User ID.
         should_store (bool): Whether to store the conversation in the database.
@@ -172,7 +207,7 @@ def get_or_create_conversation(
         Conversation: Conversation object.
     """
     conversation_id = chat_request.conversation_id or ""
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
+    conversation = loader.get_conversation(conversation_id, user_id)
     if conversation is None:
         # Get the first 5 words of the user message as the title
         title = " ".join(user_message.split()[:5])
@@ -186,6 +221,7 @@ def get_or_create_conversation(
 
         if should_store:
             conversation_crud.create_conversation(session, conversation)
+            loader.set_conversation(conversation)
 
     return conversation
 
@@ -320,65 +356,131 @@ def update_conversation_after_turn(
 
     message_crud.create_message(session, response_message)
 
-    # Update conversation description with final message
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
-    assert conversation is not None, (
-        f"Conversation with id {conversation_id} and user id {user_id} not found "
-    )  # this is mostly for type checking
-    new_conversation = UpdateConversationRequest(
-        description=final_message_text,
-        user_id=conversation.user_id,
+    # Update conversation description with final message, without loading it again
+    conversation_crud.update_conversation_description(
+        session, conversation_id, user_id, final_message_text
     )
-    conversation_crud.update_conversation(session, conversation, new_conversation)
+
+    # Replace the provisional title once the first turn is complete
+    if response_message.position == 0:
+        title_generation_queue.enqueue(conversation_id)
+
+
+class StreamAccumulator:
+    """
+    Final state of a chat response, accumulated from the deployment events.
+
+    Text deltas are collected in a list and joined once, and search results are
+    kept as `CitationList` objects, so nothing is serialized before the final
+    response is sent.
+    """
+
+    def __init__(self, message_id: str, conversation_id: str):
+        self.message_id = message_id
+        self.conversation_id = conversation_id
+        self.generation_id: Optional[str] = None
+        self.text_chunks: list[str] = []
+        self.search_results: dict[str, CitationList] = {}
+        self.finish_reason: Optional[str] = None
+        self.chat_history: list[ChatMessage] = []
+
+    @property
+    def text(self) -> str:
+        if len(self.text_chunks) > 1:
+            self.text_chunks = ["".join(self.text_chunks)]
+        return self.text_chunks[0] if self.text_chunks else ""
+
+    def add(self, event: dict[str, Any]) -> None:
+        """
+        Add a deployment event to the response.
+
+        Args:
+            event (dict[str, Any]): Deployment event.
+        """
+        event_type = event["event_type"]
+        if event_type == StreamEvent.TEXT_GENERATION:
+            self.text_chunks.append(event["text"])
+        elif event_type == StreamEvent.SEARCH_RESULTS:
+            merge_search_results(
+                self.search_results, event["interview_id"], event["search_results"]
+            )
+        elif event_type == StreamEvent.STREAM_START:
+            self.generation_id = event["generation_id"]
+        elif event_type == StreamEvent.STREAM_END:
+            self.finish_reason = event.get("finish_reason")
+            self.chat_history = get_chat_history(event.get("response"))
+
+    def to_stream_end(self) -> StreamEnd:
+        return StreamEnd(
+            message_id=self.message_id,
+            conversation_id=self.conversation_id,
+            generation_id=self.generation_id,
+            text=self.text,
+            search_results=self.search_results,
+            finish_reason=self.finish_reason,
+            chat_history=self.chat_history,
+        )
+
+
+def get_chat_history(response: Any) -> list[ChatMessage]:
+    """
+    Get the chat history of a deployment response, which may be a dict or an object.
+    """
+    if response is None:
+        return []
+    if isinstance(response, dict):
+        chat_history = response.get("chat_history")
+    else:
+        chat_history = getattr(response, "chat_history", None)
+    return chat_history or []
 
 
 async def generate_chat_response(
     session: DBSessionDep,
     model_deployment_stream: AsyncGenerator[Any, Any],
     response_message: Message,
+    user_id: str,
+    conversation_id: str,
     should_store: bool = True,
     **kwargs: Any,
-) -> Optional[StreamEnd]:
+) -> StreamEnd:
     """
-    Generate chat response from model deployment non streaming response.
-    Use the stream to generate the response and all the intermediate steps, then
-    return only the final step as a non-streamed response.
+    Generate a non-streamed chat response from the model deployment stream.
+    Consumes the deployment events directly, without serializing them as
+    server-sent events, and builds the final response once.
 
     Args:
         session (DBSessionDep): Database session.
         model_deployment_stream (AsyncGenerator[Any, Any]): Model deployment stream.
         response_message (Message): Response message object.
+        user_id (str): User ID.
+        conversation_id (str): Conversation ID.
         should_store (bool): Whether to store the conversation in the database.
-          (Context): Context object.
         **kwargs (Any): Additional keyword arguments.
 
-    Yields:
-        bytes: Byte representation of chat response event.
+    Returns:
+        StreamEnd: The complete chat response.
     """
-    stream = generate_chat_stream(
-        session=session,
-        model_deployment_stream=model_deployment_stream,
-        response_message=response_message,
-        should_store=should_store,
-        **kwargs,
-    )
+    accumulator = StreamAccumulator(response_message.id, conversation_id)
+    async for event in model_deployment_stream:
+        accumulator.add(event)
 
-    non_streamed_chat_response = None
-    async for event in stream:
-        event = json.loads(event)
-        if event["event"] == StreamEvent.STREAM_END:
-            data = event["data"]
-            generation_id = response_message.generation_id if response_message else None
-
-            non_streamed_chat_response = StreamEnd(
-                text=data.get("text", ""),
-                generation_id=generation_id,
-                chat_history=data.get("chat_history", []),
-                finish_reason=data.get("finish_reason", ""),
-                error=data.get("error", None),
-            )
+    stream_end = accumulator.to_stream_end()
+    response_message.text = stream_end.text
+    response_message.generation_id = accumulator.generation_id
+    response_message.finish_reason = accumulator.finish_reason
+
+    if should_store:
+        update_conversation_after_turn(
+            session,
+            response_message,
+            conversation_id,
+            stream_end.text,
+            user_id,
+            kwargs.get("previous_response_message_ids"),
+        )
 
-    return non_streamed_chat_response
+    return stream_end
 
 
 async def generate_chat_stream(
@@ -393,6 +495,13 @@ async def generate_chat_stream(
     """
     Generate chat stream from model deployment stream.
 
+    The stream is consumed by a `StreamBuffer`, not by the client connection.
+    If no client is subscribed for the buffer's resume grace period, the buffer
+    cancels this stream, which closes the deployment stream and stops the
+    generation upstream, and the partial response is stored as cancelled. If the
+    deployment fails, the stream ends with an error and the partial response is
+    stored as failed.
+
     Args:
         session (DBSessionDep): Database session.
         model_deployment_stream (AsyncGenerator[Any, Any]): Model deployment stream.
@@ -406,62 +515,83 @@ async def generate_chat_stream(
         bytes: Byte representation of chat response event.
     """
 
-    stream_end_data = {
-        "message_id": response_message.id,
-        "conversation_id": conversation_id,
-        "text": "",
-        "search_results": {},
-    }
+    accumulator = StreamAccumulator(response_message.id, conversation_id)
 
     stream_event = None
-    async for event in model_deployment_stream:
-        (
-            stream_event,
-            stream_end_data,
-            response_message,
-        ) = handle_stream_event(
-            event,
-            conversation_id,
-            stream_end_data,
-            response_message,
-            session=session,
-            should_store=should_store,
-            user_id=user_id,
-            next_message_position=kwargs.get("next_message_position", 0),
-        )
+    is_finished = False
+    is_cancelled = False
+    try:
+        async for event in model_deployment_stream:
+            stream_event, response_message = handle_stream_event(
+                event,
+                conversation_id,
+                accumulator,
+                response_message,
+                session=session,
+                should_store=should_store,
+                user_id=user_id,
+                next_message_position=kwargs.get("next_message_position", 0),
+            )
 
+            yield json.dumps(
+                jsonable_encoder(
+                    ChatResponseEvent(
+                        event=StreamEvent(stream_event.event_type.value),
+                        data=stream_event,
+                    )
+                )
+            )
+        else:
+            is_finished = True
+    except (asyncio.CancelledError, GeneratorExit):
+        # The stream buffer cancels the stream when no client resumed in time
+        is_cancelled = True
+        raise
+    except Exception as e:
+        # Ends the stream with the error, e.g. if the compute pool was saturated
+        # after the request was accepted, and stores the partial response
+        print(f"[Chat] Message {response_message.id} failed: {str(e)}")
+        is_finished = True
+        accumulator.finish_reason = FinishReason.ERROR
+        response_message.text = accumulator.text
+        response_message.finish_reason = FinishReason.ERROR
+        stream_end = accumulator.to_stream_end()
+        stream_end.error = str(e)
         yield json.dumps(
             jsonable_encoder(
-                ChatResponseEvent(
-                    event=StreamEvent(stream_event.event_type.value),
-                    data=stream_event,
-                )
+                ChatResponseEvent(event=StreamEvent.STREAM_END, data=stream_end)
             )
         )
-
-    if should_store:
-        update_conversation_after_turn(
-            session,
-            response_message,
-            conversation_id,
-            stream_end_data["text"],
-            user_id,
-            kwargs.get("previous_response_message_ids"),
-        )
+    finally:
+        if is_cancelled:
+            await model_deployment_stream.aclose()
+            response_message.text = accumulator.text
+            response_message.finish_reason = FinishReason.CANCELLED
+
+        if should_store and (is_finished or is_cancelled):
+            update_conversation_after_turn(
+                session,
+                response_message,
+                conversation_id,
+                accumulator.text,
+                user_id,
+                kwargs.get("previous_response_message_ids"),
+            )
 
 
 def handle_stream_event(
     event: dict[str, Any],
     conversation_id: str,
-    stream_end_data: dict[str, Any],
+    accumulator: StreamAccumulator,
     response_message: Message,
     session: DBSessionDep,
     should_store: bool = True,
     user_id: str = "",
     next_message_position: int = 0,
-) -> tuple[StreamEventType, dict[str, Any], Message]:
+) -> tuple[StreamEventType, Message]:
     handlers = {
         StreamEvent.STREAM_START: handle_stream_start,
+        StreamEvent.QUEUE_POSITION: handle_stream_queue_position,
         StreamEvent.TEXT_GENERATION: handle_stream_text_generation,
         StreamEvent.SEARCH_RESULTS: handle_stream_search_results,
         StreamEvent.STREAM_END: handle_stream_end,
@@ -471,7 +601,7 @@ def handle_stream_event(
     return handlers[event_type](
         event,
         conversation_id,
-        stream_end_data,
+        accumulator,
         response_message,
         session=session,
         should_store=should_store,
@@ -483,63 +613,81 @@ def handle_stream_event(
 def handle_stream_start(
     event: dict[str, Any],
     conversation_id: str,
-    stream_end_data: dict[str, Any],
+    accumulator: StreamAccumulator,
     response_message: Message,
     **kwargs: Any,
-) -> tuple[StreamStart, dict[str, Any], Message]:
+) -> tuple[StreamStart, Message]:
     event["conversation_id"] = conversation_id
+    event["message_id"] = accumulator.message_id
     stream_event = StreamStart.model_validate(event)
     if response_message:
         response_message.generation_id = event["generation_id"]
-    stream_end_data["generation_id"] = event["generation_id"]
-    return stream_event, stream_end_data, response_message
+    accumulator.add(event)
+    return stream_event, response_message
+
+
+def handle_stream_queue_position(
+    event: dict[str, Any],
+    _: str,
+    accumulator: StreamAccumulator,
+    response_message: Message,
+    **kwargs: Any,
+) -> tuple[StreamQueuePosition, Message]:
+    stream_event = StreamQueuePosition.model_validate(event)
+    return stream_event, response_message
 
 
 def handle_stream_text_generation(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    accumulator: StreamAccumulator,
     response_message: Message,
     **kwargs: Any,
-) -> tuple[StreamTextGeneration, dict[str, Any], Message]:
-    stream_end_data["text"] += event["text"]
+) -> tuple[StreamTextGeneration, Message]:
+    accumulator.add(event)
     stream_event = StreamTextGeneration.model_validate(event)
-    return stream_event, stream_end_data, response_message
+    return stream_event, response_message
+
+
+def merge_search_results(
+    search_results: dict[str, CitationList],
+    interview_id: str,
+    citations: CitationList,
+) -> None:
+    """
+    Add the citations of an interview to the search results of a response.
+    Study searches can return citations of the same interview in several events.
+    """
+    if interview_id in search_results:
+        search_results[interview_id] = CitationList(
+            zitate=search_results[interview_id].zitate + citations.zitate
+        )
+    else:
+        search_results[interview_id] = citations
 
 
 def handle_stream_search_results(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    accumulator: StreamAccumulator,
     response_message: Message,
     **kwargs: Any,
-) -> tuple[StreamSearchResults, dict[str, Any], Message]:
-    stream_end_data["search_results"][event["interview_id"]] = event["search_results"]
+) -> tuple[StreamSearchResults, Message]:
+    accumulator.add(event)
     stream_event = StreamSearchResults.model_validate(event)
-    return stream_event, stream_end_data, response_message
-
-
-def to_dict(obj):
-    return json.loads(
-        json.dumps(
-            obj, default=lambda o: o.__dict__ if hasattr(o, "__dict__") else str(o)
-        )
-    )
+    return stream_event, response_message
 
 
 def handle_stream_end(
     event: dict[str, Any],
     _: str,
-    stream_end_data: dict[str, Any],
+    accumulator: StreamAccumulator,
     response_message: Message,
     **kwargs: Any,
-) -> tuple[StreamEnd, dict[str, Any], Message]:
+) -> tuple[StreamEnd, Message]:
+    accumulator.add(event)
+    stream_event = accumulator.to_stream_end()
     if response_message:
-        response_message.text = stream_end_data["text"]
-
-    stream_end_data["chat_history"] = (
-        to_dict(event).get("response", {}).get("chat_history", [])
-    )
-    stream_end = StreamEnd.model_validate(event | stream_end_data)
-    stream_event = stream_end
-    return stream_event, stream_end_data, response_message
+        response_message.text = stream_event.text
+        response_message.finish_reason = accumulator.finish_reason
+    return stream_event, response_message
@@ -0,0 +1,169 @@
+import re
+
+from backend.schemas.interview import InterviewChunk
+from backend.services.speaker_turns import get_respondent_turns
+from backend.services.text_analysis import get_text_analyzer
+
+DEFAULT_CHUNK_SIZE = 1500
+DEFAULT_CHUNK_OVERLAP = 200
+
+PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+
+
+def split_paragraphs(text: str) -> list[tuple[int, int]]:
+    """
+    Split a text into paragraphs, keeping track of their character offsets.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list[tuple[int, int]]: Start and end offsets of every non-empty paragraph.
+    """
+    spans = []
+    start = 0
+    for separator in PARAGRAPH_SEPARATOR.finditer(text):
+        if text[start : separator.start()].strip():
+            spans.append((start, separator.start()))
+        start = separator.end()
+
+    if text[start:].strip():
+        spans.append((start, len(text)))
+
+    return spans
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> list[tuple[int, int]]:
+    """
+    Group paragraphs into chunks of roughly `chunk_size` characters.
+    Paragraphs longer than `chunk_size` are split with a sliding window.
+
+    Args:
+        text (str): Text to chunk.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Overlap between windows of oversized paragraphs.
+
+    Returns:
+        list[tuple[int, int]]: Start and end offsets of every chunk.
+    """
+    chunks = []
+    current_start, current_end = None, None
+
+    for start, end in split_paragraphs(text):
+        if current_start is not None and end - current_start > chunk_size:
+            chunks.append((current_start, current_end))
+            current_start, current_end = None, None
+
+        if end - start > chunk_size:
+            step = chunk_size - chunk_overlap
+            for window_start in range(start, end, step):
+                chunks.append((window_start, min(window_start + chunk_size, end)))
+                if window_start + chunk_size >= end:
+                    break
+            continue
+
+        if current_start is None:
+            current_start = start
+        current_end = end
+
+    if current_start is not None:
+        chunks.append((current_start, current_end))
+
+    return chunks
+
+
+def chunk_transcript(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> list[tuple[int, int]]:
+    """
+    Chunk the searched parts of a transcript: every respondent turn on its own,
+    so chunks never contain interviewer speech, or the whole text if the
+    transcript has no speaker labels.
+
+    Args:
+        text (str): Interview transcript.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Overlap between windows of oversized paragraphs.
+
+    Returns:
+        list[tuple[int, int]]: Start and end offsets of every chunk.
+    """
+    turns = get_respondent_turns(text)
+    if not turns:
+        return chunk_text(text, chunk_size, chunk_overlap)
+
+    return [
+        (turn.start_pos + start, turn.start_pos + end)
+        for turn in turns
+        for start, end in chunk_text(
+            text[turn.start_pos : turn.end_pos], chunk_size, chunk_overlap
+        )
+    ]
+
+
+def chunk_interview(
+    interview_id: str,
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> list[InterviewChunk]:
+    """
+    Chunk an interview transcript and tokenize every chunk for BM25.
+
+    Args:
+        interview_id (str): Interview ID.
+        text (str): Interview transcript.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Overlap between windows of oversized paragraphs.
+
+    Returns:
+        list[InterviewChunk]: Chunks of the interview.
+    """
+    return chunk_interviews([(interview_id, text)], chunk_size, chunk_overlap)
+
+
+def chunk_interviews(
+    interviews: list[tuple[str, str]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> list[InterviewChunk]:
+    """
+    Chunk several interview transcripts, e.g. all interviews of a study, and
+    tokenize all chunks in one pass of the text analyzer.
+
+    Args:
+        interviews (list[tuple[str, str]]): Interview IDs and transcripts.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Overlap between windows of oversized paragraphs.
+
+    Returns:
+        list[InterviewChunk]: Chunks of all interviews.
+    """
+    spans = [
+        (interview_id, text, start, end)
+        for interview_id, text in interviews
+        for start, end in chunk_transcript(text, chunk_size, chunk_overlap)
+    ]
+    if not spans:
+        return []
+
+    tokens = get_text_analyzer().analyze_corpus(
+        [text[start:end] for _, text, start, end in spans]
+    )
+
+    return [
+        InterviewChunk(
+            interview_id=interview_id,
+            original_text=text[start:end],
+            start_pos=start,
+            end_pos=end,
+            bm25_tokens=chunk_tokens,
+        )
+        for (interview_id, text, start, end), chunk_tokens in zip(spans, tokens)
+    ]
@@ -0,0 +1,155 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from backend.services.metrics import Counter, Gauge, register
+
+# Bumped when the stored value changes, entries of older versions are never read
+KEY_PREFIX = "completion:v2:"
+
+cache_lookups = register(
+    Counter(
+        "completion_cache_lookups_total",
+        "Lookups of the completion cache by kind and result (hit, miss or error).",
+        ("kind", "result"),
+    )
+)
+
+
+def get_hit_ratio() -> float:
+    # Failed lookups say nothing about the cache contents, they are counted by
+    # completion_cache_lookups_total{result="error"} instead
+    counts = {"hit": 0, "miss": 0}
+    for (_, result), value in cache_lookups.values.items():
+        if result in counts:
+            counts[result] += value
+    total = counts["hit"] + counts["miss"]
+    return counts["hit"] / total if total else 0.0
+
+
+register(
+    Gauge(
+        "completion_cache_hit_ratio",
+        "Share of successful completion cache lookups that were hits, since the "
+        "worker started.",
+        get_hit_ratio,
+    )
+)
+
+
+class CachedCompletion(BaseModel):
+    # Text chunks, in the order they were streamed
+    chunks: list[str]
+    finish_reason: Optional[str] = None
+
+
+class CompletionCache:
+    """
+    Exact-match cache of LLM completions in Redis.
+
+    All generations use a fixed seed, so the same rendered prompt and generation
+    parameters always produce the same completion. Completions are stored with
+    a TTL under a hash of the prompt, the model and the parameters, and the
+    least recently used ones are dropped by Redis under memory pressure
+    (`maxmemory-policy allkeys-lru`). The cache is opt-in and a no-op without
+    Redis; Redis errors count as misses.
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.agents: list[str] = []
+        self.cache_titles = False
+        self.ttl = 86400
+        self.model = "tgi"
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    def start(
+        self,
+        enabled: bool,
+        redis_url: Optional[str],
+        agents: list[str],
+        cache_titles: bool,
+        ttl: int,
+        model: str,
+    ) -> None:
+        if not enabled:
+            return
+        if not redis_url:
+            print("[Completion cache] Disabled, redis.url is not set.")
+            return
+
+        self.redis = Redis.from_url(redis_url, decode_responses=True)
+        self.agents = agents
+        self.cache_titles = cache_titles
+        self.ttl = ttl
+        self.model = model
+
+    async def stop(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    def is_enabled_for_agent(self, agent_id: str) -> bool:
+        return self.enabled and agent_id in self.agents
+
+    def get_key(self, kind: str, request: dict[str, Any]) -> str:
+        """
+        Get the cache key of a completion request.
+
+        Args:
+            kind (str): Kind of completion, e.g. chat or title.
+            request (dict[str, Any]): Rendered prompt or messages and the
+                generation parameters.
+
+        Returns:
+            str: Cache key.
+        """
+        payload = json.dumps(
+            {"kind": kind, "model": self.model, "request": request},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, kind: str, key: str) -> Optional[CachedCompletion]:
+        """
+        Get a cached completion.
+
+        Args:
+            kind (str): Kind of completion, for the metrics.
+            key (str): Cache key.
+
+        Returns:
+            Optional[CachedCompletion]: The completion, None on a miss.
+        """
+        try:
+            value = await self.redis.get(key)
+        except Exception as e:
+            print(f"[Completion cache] Lookup failed: {str(e)}")
+            cache_lookups.inc(kind, "error")
+            return None
+
+        cache_lookups.inc(kind, "miss" if value is None else "hit")
+        return None if value is None else CachedCompletion.model_validate_json(value)
+
+    async def put(self, key: str, completion: CachedCompletion) -> None:
+        """
+        Store a finished completion as the chunks it was streamed in.
+
+        Args:
+            key (str): Cache key.
+            completion (CachedCompletion): The completion and why it finished.
+        """
+        try:
+            await self.redis.set(key, completion.model_dump_json(), ex=self.ttl)
+        except Exception as e:
+            print(f"[Completion cache] Store failed: {str(e)}")
+
+
+completion_cache = CompletionCache()
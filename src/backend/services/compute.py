@@ -0,0 +1,183 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import accumulate, pairwise
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, NamedTuple, Optional
+
+
+class ComputeSaturatedError(Exception):
+    """Raised when the process pool already has `max_pending` tasks."""
+
+    def __init__(self):
+        super().__init__("The server is busy, please try again in a few seconds.")
+
+
+class SharedTextsHandle(NamedTuple):
+    """Picklable reference to texts in shared memory."""
+
+    name: str
+    offsets: list[int]
+
+
+class SharedTexts:
+    """
+    Texts packed into one shared memory block, so worker processes can read
+    transcripts without pickling a copy of every text into the task.
+    """
+
+    def __init__(self, texts: list[str]):
+        encoded = [text.encode() for text in texts]
+        self.offsets = list(accumulate((len(data) for data in encoded), initial=0))
+        # Shared memory blocks can't be empty
+        self.memory = SharedMemory(create=True, size=max(self.offsets[-1], 1))
+        for data, start in zip(encoded, self.offsets):
+            self.memory.buf[start : start + len(data)] = data
+
+    @property
+    def handle(self) -> SharedTextsHandle:
+        return SharedTextsHandle(self.memory.name, self.offsets)
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+def read_shared_texts(handle: SharedTextsHandle) -> list[str]:
+    """
+    Read texts written by `SharedTexts`, e.g. in a worker process.
+
+    Args:
+        handle (SharedTextsHandle): Reference to the shared memory block.
+
+    Returns:
+        list[str]: The texts.
+    """
+    memory = SharedMemory(name=handle.name)
+    try:
+        return [
+            bytes(memory.buf[start:end]).decode()
+            for start, end in pairwise(handle.offsets)
+        ]
+    finally:
+        memory.close()
+
+
+def _call_with_texts(
+    fn: Callable, handle: SharedTextsHandle, args: tuple, kwargs: dict
+) -> Any:
+    return fn(read_shared_texts(handle), *args, **kwargs)
+
+
+class ComputeService:
+    """
+    Process pool for CPU-bound work like tokenization, chunking and index builds,
+    which would otherwise block the event loop.
+
+    Requests are bounded: once `max_pending` tasks are queued or running,
+    `submit` rejects new tasks with `ComputeSaturatedError` instead of queueing
+    them indefinitely.
+    """
+
+    def __init__(self):
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.max_pending = 0
+        self.pending = 0
+
+    def start(self, max_workers: int, max_pending: int) -> None:
+        # Forking a process with a running event loop and threads is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.max_pending = max_pending
+
+    def stop(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def is_saturated(self) -> bool:
+        return self.executor is not None and self.pending >= self.max_pending
+
+    def _submit(
+        self, fn: Callable, args: tuple, kwargs: dict, shared: Optional[SharedTexts]
+    ) -> Future:
+        assert self.executor is not None
+        if shared is None:
+            return self.executor.submit(fn, *args, **kwargs)
+        return self.executor.submit(_call_with_texts, fn, shared.handle, args, kwargs)
+
+    async def submit(
+        self, fn: Callable, *args: Any, texts: Optional[list[str]] = None, **kwargs: Any
+    ) -> Any:
+        """
+        Run a function in the process pool without blocking the event loop.
+
+        Args:
+            fn (Callable): Picklable, module-level function.
+            *args (Any): Arguments of the function.
+            texts (Optional[list[str]]): Texts passed through shared memory,
+                as the first argument of the function.
+            **kwargs (Any): Keyword arguments of the function.
+
+        Returns:
+            Any: Result of the function.
+
+        Raises:
+            ComputeSaturatedError: If too many tasks are already pending.
+        """
+        if self.executor is None:
+            call_args = (texts, *args) if texts is not None else args
+            return await asyncio.to_thread(fn, *call_args, **kwargs)
+
+        if self.is_saturated():
+            raise ComputeSaturatedError()
+
+        self.pending += 1
+        try:
+            shared = SharedTexts(texts) if texts is not None else None
+            try:
+                future = self._submit(fn, args, kwargs, shared)
+            except BaseException:
+                if shared is not None:
+                    shared.close()
+                raise
+
+            if shared is not None:
+                # Not when the caller is cancelled, the worker may still be
+                # attaching to the shared memory
+                future.add_done_callback(lambda _: shared.close())
+            return await asyncio.wrap_future(future)
+        finally:
+            self.pending -= 1
+
+    def run(
+        self, fn: Callable, *args: Any, texts: Optional[list[str]] = None, **kwargs: Any
+    ) -> Any:
+        """
+        Run a function in the process pool and wait for the result. For background
+        threads like the ingestion workers, which wait instead of being rejected.
+
+        Args:
+            fn (Callable): Picklable, module-level function.
+            *args (Any): Arguments of the function.
+            texts (Optional[list[str]]): Texts passed through shared memory,
+                as the first argument of the function.
+            **kwargs (Any): Keyword arguments of the function.
+
+        Returns:
+            Any: Result of the function.
+        """
+        if self.executor is None:
+            call_args = (texts, *args) if texts is not None else args
+            return fn(*call_args, **kwargs)
+
+        shared = SharedTexts(texts) if texts is not None else None
+        try:
+            return self._submit(fn, args, kwargs, shared).result()
+        finally:
+            if shared is not None:
+                shared.close()
+
+
+compute_service = ComputeService()
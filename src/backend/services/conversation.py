@@ -2,15 +2,16 @@ from typing import List, Optional
 
 from fastapi import HTTPException
 
-from backend.crud import conversation as conversation_crud
 from backend.database_models import Message as MessageModel
 from backend.database_models.conversation import Conversation as ConversationModel
 from backend.database_models.database import DBSessionDep
 from backend.model_deployments import TGIDeployment
-from backend.schemas.chat import SalonChatRequest, ChatRole
+from backend.model_deployments.scheduler import Priority, get_scheduler
+from backend.schemas.chat import ChatRole
 from backend.schemas.conversation import Conversation
 from backend.schemas.message import Message
-from backend.services.chat import generate_chat_response
+from backend.services.completion_cache import completion_cache
+from backend.services.request_loader import RequestLoader
 
 DEFAULT_TITLE = "New Conversation"
 GENERATE_TITLE_PROMPT = """# TASK
@@ -26,12 +27,12 @@ SEARCH_RELEVANCE_THRESHOLD = 0.3
 
 
 def validate_conversation(
-    session: DBSessionDep, conversation_id: str, user_id: str
+    loader: RequestLoader, conversation_id: str, user_id: str
 ) -> ConversationModel:
     """Validates if a conversation exists and belongs to the user
 
     Args:
-        session (DBSessionDep): Database session
+        loader (RequestLoader): Loader of the request
         conversation_id (str): Conversation ID
         user_id (str): User ID
 
@@ -41,7 +42,7 @@ def validate_conversation(
     Raises:
         HTTPException: If the conversation is not found
     """
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
+    conversation = loader.get_conversation(conversation_id, user_id)
     if not conversation:
         raise HTTPException(
             status_code=404,
@@ -169,52 +170,28 @@ async def filter_conversations(
 
 
 async def generate_conversation_title(
-    session: DBSessionDep,
     conversation: Conversation,
-    user_id: str,
-) -> tuple[str, str]:
-    """Generate a title for a conversation
+    max_new_tokens: int = 24,
+) -> str:
+    """Generate a title for a conversation with a short generation budget
 
     Args:
-        request: Request object
-        session: Database session
-        conversation: Conversation object
-        model_config: Model configuration
-        agent_id: Agent ID
-         : Context object
-        model: Model name
+        conversation (Conversation): Conversation object
+        max_new_tokens (int): Maximum number of generated tokens
 
     Returns:
-        str: Generated title
-        str: Error message
+        str: Generated title, empty if the model didn't return one
     """
-    title = ""
-    error = None
-
-    try:
-        chatlog = extract_details_from_conversation(conversation)
-        prompt = GENERATE_TITLE_PROMPT % chatlog
-        chat_request = SalonChatRequest(
-            message=prompt,
-            user_id=user_id,
-            agent_id="basic",
+    chatlog = extract_details_from_conversation(conversation)
+    prompt = GENERATE_TITLE_PROMPT % chatlog
+
+    async with get_scheduler().slot(conversation.user_id, "basic", Priority.TITLE):
+        output = await TGIDeployment().generate_text(
+            prompt,
+            max_new_tokens,
+            affinity_key=conversation.id,
+            cache_kind="title" if completion_cache.cache_titles else None,
         )
 
-        response = await generate_chat_response(
-            session,
-            TGIDeployment().invoke_chat(
-                chat_request,
-            ),
-            response_message=None,
-            conversation_id=None,
-            user_id=user_id,
-            should_store=False,
-        )
-
-        title = response.text
-        error = response.error
-    except Exception as e:
-        title = DEFAULT_TITLE
-        error = str(e)
-
-    return title, error
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return lines[0].strip("#\"' ") if lines else ""
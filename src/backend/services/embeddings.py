@@ -0,0 +1,213 @@
+import hashlib
+import json
+import pathlib
+import shutil
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from backend.config.settings import Settings
+from backend.schemas.interview import InterviewChunk
+
+DENSE_INDEX_NAME = "dense"
+EMBEDDINGS_FILE = "embeddings.npy"
+META_FILE = "meta.json"
+
+
+class EmbeddingModel:
+    """
+    Small sentence embedding model that runs locally on the CPU.
+
+    sentence-transformers is an optional dependency and only has to be installed
+    if dense retrieval is enabled.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "Dense retrieval requires sentence-transformers, install it with "
+                "`poetry install --with dense`."
+            ) from e
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts in batches.
+
+        Args:
+            texts (list[str]): Texts to embed.
+
+        Returns:
+            numpy.ndarray: Unit-length float32 vectors, one row per text.
+        """
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> EmbeddingModel:
+    """
+    Get the embedding model configured in the search settings.
+
+    Returns:
+        EmbeddingModel: Shared embedding model.
+    """
+    settings = Settings().search
+    return EmbeddingModel(settings.embedding_model, settings.embedding_batch_size)
+
+
+def get_chunks_fingerprint(chunks: list[InterviewChunk]) -> str:
+    """
+    Fingerprint the chunks of an index, so embeddings can be matched to the
+    BM25 index they were built for.
+
+    Args:
+        chunks (list[InterviewChunk]): Chunks of the index, in index order.
+
+    Returns:
+        str: Hex digest of the chunk positions and texts, so embeddings of a
+            transcript that changed in place aren't reused.
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(f"{chunk.interview_id}:{chunk.start_pos}:{chunk.end_pos}:".encode())
+        digest.update(chunk.original_text.encode())
+        digest.update(b";")
+    return digest.hexdigest()
+
+
+class DenseIndex:
+    """
+    Embeddings of all chunks of a study, in the order of the study's BM25 index.
+    Saved indexes are memory-mapped instead of read into memory.
+    """
+
+    def __init__(
+        self, study_id: str, model_name: str, fingerprint: str, vectors: np.ndarray
+    ):
+        self.study_id = study_id
+        self.model_name = model_name
+        self.fingerprint = fingerprint
+        self.vectors = vectors
+
+    def get_scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """
+        Score every chunk against a query embedding.
+
+        Args:
+            query_vector (numpy.ndarray): Unit-length query embedding.
+
+        Returns:
+            numpy.ndarray: Cosine similarity per chunk.
+        """
+        return self.vectors @ query_vector
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 10,
+        mask: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve the top `k` chunks for a batch of queries.
+
+        Args:
+            query_vectors (numpy.ndarray): Unit-length query embeddings, one row per query.
+            k (int): Number of chunks per query.
+            mask (Optional[numpy.ndarray]): Boolean mask of the chunks that may be returned.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Chunk indices and scores per query, best first.
+        """
+        query_vectors = np.atleast_2d(query_vectors)
+        scores = query_vectors @ self.vectors.T
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, scores.shape[1])
+        if k == 0:
+            empty = np.empty((len(query_vectors), 0))
+            return empty.astype(np.int64), empty
+
+        # Partial sort, only the top k of every row are ordered
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+
+def get_dense_index_dir(study_id: str) -> pathlib.Path:
+    return pathlib.Path(Settings().ingestion.index_dir) / study_id / DENSE_INDEX_NAME
+
+
+def build_dense_index(
+    study_id: str,
+    chunks: list[InterviewChunk],
+    model: Optional[EmbeddingModel] = None,
+) -> DenseIndex:
+    """
+    Embed all chunks of a study.
+
+    Args:
+        study_id (str): Study ID.
+        chunks (list[InterviewChunk]): Chunks of the study's BM25 index.
+        model (Optional[EmbeddingModel]): Embedding model, defaults to the configured one.
+
+    Returns:
+        DenseIndex: The built index.
+    """
+    model = model or get_embedding_model()
+    vectors = model.embed([chunk.original_text for chunk in chunks])
+    return DenseIndex(study_id, model.model_name, get_chunks_fingerprint(chunks), vectors)
+
+
+def save_dense_index(index: DenseIndex) -> None:
+    """
+    Persist a dense index to the index directory, replacing any previous version.
+
+    Args:
+        index (DenseIndex): Index to save.
+    """
+    index_dir = get_dense_index_dir(index.study_id)
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+    index_dir.mkdir(parents=True)
+
+    np.save(index_dir / EMBEDDINGS_FILE, index.vectors)
+    with open(index_dir / META_FILE, "w") as f:
+        json.dump({"model": index.model_name, "fingerprint": index.fingerprint}, f)
+
+
+def load_dense_index(study_id: str) -> Optional[DenseIndex]:
+    """
+    Memory-map a dense index from the index directory.
+
+    Args:
+        study_id (str): Study ID.
+
+    Returns:
+        Optional[DenseIndex]: The index, or None if the study was never embedded.
+    """
+    index_dir = get_dense_index_dir(study_id)
+    if not (index_dir / META_FILE).exists():
+        return None
+
+    with open(index_dir / META_FILE) as f:
+        meta = json.load(f)
+    vectors = np.load(index_dir / EMBEDDINGS_FILE, mmap_mode="r")
+    return DenseIndex(study_id, meta["model"], meta["fingerprint"], vectors)
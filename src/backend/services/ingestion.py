@@ -0,0 +1,217 @@
+import asyncio
+import pathlib
+import shutil
+from typing import Optional
+
+import anyio
+import docx
+import pandas as pd
+from fastapi import UploadFile
+from pypdf import PdfReader
+from sqlalchemy.orm import Session
+
+from backend.config.settings import Settings
+from backend.crud import interview as interview_crud
+from backend.crud import study as study_crud
+from backend.database_models.base import CustomFilterQuery
+from backend.database_models.database import engine
+from backend.database_models.interview import Interview
+from backend.schemas.study import StudyIngestionJob
+from backend.services.compute import compute_service
+from backend.services.search_index import rebuild_study_index
+from backend.services.speaker_turns import dump_speaker_turns
+
+
+async def save_upload(file: UploadFile, path: pathlib.Path) -> pathlib.Path:
+    """
+    Write an uploaded file to disk in chunks without blocking the event loop.
+
+    Args:
+        file (UploadFile): Uploaded file.
+        path (pathlib.Path): Destination path.
+
+    Returns:
+        pathlib.Path: Destination path.
+    """
+    chunk_size = Settings().ingestion.upload_chunk_size
+    await anyio.Path(path.parent).mkdir(parents=True, exist_ok=True)
+
+    async with await anyio.open_file(path, "wb") as buffer:
+        while chunk := await file.read(chunk_size):
+            await buffer.write(chunk)
+
+    await file.close()
+    return path
+
+
+def get_upload_path(study_id: str, interview_type: str, filename: str) -> pathlib.Path:
+    """
+    Get the path an uploaded study file is stored at.
+
+    Args:
+        study_id (str): Study ID.
+        interview_type (str): Interview type (TI, GD, Memo or meta).
+        filename (str): Name of the uploaded file.
+
+    Returns:
+        pathlib.Path: Upload path.
+    """
+    # Only keep the file name, uploads must not be able to escape the study folder
+    name = pathlib.PurePath(filename).name
+    return pathlib.Path(Settings().ingestion.upload_dir) / study_id / interview_type / name
+
+
+def delete_uploads(study_id: str) -> None:
+    """
+    Delete the uploaded files of a study.
+
+    Args:
+        study_id (str): Study ID.
+    """
+    shutil.rmtree(
+        pathlib.Path(Settings().ingestion.upload_dir) / study_id, ignore_errors=True
+    )
+
+
+def read_transcript(path: pathlib.Path) -> str:
+    """
+    Extract the text of a transcript file.
+
+    Args:
+        path (pathlib.Path): Transcript file (.txt, .docx or .pdf).
+
+    Returns:
+        str: Transcript text.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".docx":
+        return "\n\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs)
+    if suffix == ".pdf":
+        return "\n\n".join(page.extract_text() for page in PdfReader(path).pages)
+
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def read_meta_file(path: Optional[pathlib.Path]) -> dict[str, dict]:
+    """
+    Read the study meta file, mapping interview titles to their meta fields.
+    The first column of the sheet is expected to hold the interview title.
+
+    Args:
+        path (Optional[pathlib.Path]): Meta file (.csv or spreadsheet).
+
+    Returns:
+        dict[str, dict]: Meta fields per interview title.
+    """
+    if path is None or not path.exists():
+        return {}
+
+    try:
+        if path.suffix.lower() == ".csv":
+            frame = pd.read_csv(path, dtype=str)
+        else:
+            frame = pd.read_excel(path, dtype=str, engine="calamine")
+    except Exception as e:
+        print(f"[Ingestion] Could not read meta file {path}: {str(e)}")
+        return {}
+
+    frame = frame.dropna(how="all").fillna("")
+    title_column = frame.columns[0]
+    return {
+        row[title_column]: row.drop(labels=[title_column]).to_dict()
+        for _, row in frame.iterrows()
+    }
+
+
+def ingest_study_files(job: StudyIngestionJob) -> int:
+    """
+    Parse the uploaded transcripts of a study, create their interviews and
+    rebuild the search index of the study. Runs outside of the event loop.
+
+    Args:
+        job (StudyIngestionJob): Files to ingest.
+
+    Returns:
+        int: Number of created interviews.
+    """
+    with Session(engine, query_cls=CustomFilterQuery) as session:
+        try:
+            meta = read_meta_file(pathlib.Path(job.meta_file) if job.meta_file else None)
+            existing_titles = interview_crud.get_interview_titles_by_study_id(
+                session, job.study_id
+            )
+
+            interviews = []
+            for file in job.files:
+                path = pathlib.Path(file.path)
+                title = path.stem
+                if title in existing_titles:
+                    continue
+
+                text = read_transcript(path)
+                interviews.append(
+                    Interview(
+                        text=text,
+                        speaker_turns=dump_speaker_turns(text),
+                        title=title,
+                        interview_type=file.interview_type,
+                        fields=meta.get(title),
+                        study_id=job.study_id,
+                    )
+                )
+                existing_titles.add(title)
+
+            interview_crud.create_interviews(session, interviews)
+
+            study_interviews = interview_crud.get_interviews_by_study_id(
+                session, job.study_id
+            )
+            compute_service.run(
+                rebuild_study_index,
+                job.study_id,
+                [interview.id for interview in study_interviews],
+                texts=[interview.text for interview in study_interviews],
+            )
+
+            return len(interviews)
+        finally:
+            study_crud.set_study_being_added(session, job.study_id, False)
+
+
+class IngestionQueue:
+    """
+    In-process job queue with a fixed pool of workers that ingest study uploads.
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue[StudyIngestionJob] = asyncio.Queue()
+        self.workers: list[asyncio.Task] = []
+
+    def start(self, num_workers: int) -> None:
+        for _ in range(num_workers):
+            self.workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def enqueue(self, job: StudyIngestionJob) -> None:
+        self.queue.put_nowait(job)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                created = await asyncio.to_thread(ingest_study_files, job)
+                print(
+                    f"[Ingestion] Study {job.study_id}: created {created} interviews."
+                )
+            except Exception as e:
+                print(f"[Ingestion] Study {job.study_id} failed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+
+ingestion_queue = IngestionQueue()
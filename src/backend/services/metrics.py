@@ -0,0 +1,64 @@
+from typing import Callable
+
+
+class Counter:
+    """
+    In-process counter with labels, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            label_text = ",".join(
+                f'{name}="{label}"' for name, label in zip(self.label_names, labels)
+            )
+            lines.append(f"{self.name}{{{label_text}}} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    Gauge whose value is computed when the metrics are rendered.
+    """
+
+    def __init__(self, name: str, description: str, compute: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self.compute = compute
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.compute()}",
+        ]
+
+
+METRICS: list[Counter | Gauge] = []
+
+
+def register(metric: Counter | Gauge) -> Counter | Gauge:
+    METRICS.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """
+    Render all metrics of this process in the Prometheus text format.
+
+    Returns:
+        str: The metrics.
+    """
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
@@ -0,0 +1,317 @@
+import asyncio
+import datetime
+import io
+from typing import Optional
+from uuid import uuid4
+
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend.config.settings import Settings
+from backend.crud import conversation as conversation_crud
+from backend.crud import message as message_crud
+from backend.database_models.base import CustomFilterQuery
+from backend.database_models.conversation import Conversation
+from backend.database_models.database import engine
+from backend.database_models.message import Message, MessageAgent
+from backend.model_deployments.prompts import get_system_prompt
+from backend.model_deployments.scheduler import Priority, get_scheduler
+from backend.model_deployments.tgi import TGIDeployment
+from backend.schemas.chat import FinishReason
+from backend.schemas.persona_interview import (
+    CreatePersonaInterviewJobRequest,
+    ExportFormat,
+    PersonaInterviewJob,
+    PersonaInterviewStatus,
+)
+
+AGENT_ID = "kerlin"
+DEFAULT_JOB_NAME = "Synthetisches Interview"
+
+
+def store_persona_interview(
+    user_id: str,
+    conversation_id: str,
+    title: str,
+    persona: str,
+    questions: list[str],
+    answers: list[str],
+) -> None:
+    """
+    Store the interview of a persona as a conversation of the kerlin agent.
+    """
+    conversation = Conversation(
+        id=conversation_id,
+        user_id=user_id,
+        agent_id=AGENT_ID,
+        title=title,
+        description=persona,
+    )
+
+    # All rows are inserted in one transaction, which has a single now() in
+    # Postgres, so the messages get explicit timestamps to keep their order
+    created_at = datetime.datetime.now()
+    messages = []
+    for position, (question, answer) in enumerate(zip(questions, answers)):
+        for agent, text in ((MessageAgent.USER, question), (MessageAgent.CHATBOT, answer)):
+            messages.append(
+                Message(
+                    id=str(uuid4()),
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    text=text,
+                    position=position,
+                    is_active=True,
+                    agent=agent,
+                    finish_reason=(
+                        FinishReason.COMPLETE if agent == MessageAgent.CHATBOT else None
+                    ),
+                    created_at=created_at,
+                )
+            )
+            created_at += datetime.timedelta(microseconds=1)
+
+    with Session(engine, query_cls=CustomFilterQuery) as session:
+        conversation_crud.create_conversations_with_messages(
+            session, [conversation], messages
+        )
+
+
+def export_persona_interview(job: PersonaInterviewJob, export_format: ExportFormat) -> bytes:
+    """
+    Export the answers of a job as a table with one row per persona and question.
+
+    Args:
+        job (PersonaInterviewJob): Job to export.
+        export_format (ExportFormat): CSV or Parquet.
+
+    Returns:
+        bytes: The exported file.
+    """
+    conversation_ids = [id for id in job.conversation_ids if id is not None]
+    with Session(engine, query_cls=CustomFilterQuery) as session:
+        conversations = {
+            conversation.id: conversation
+            for conversation in conversation_crud.get_conversations_by_ids(
+                session, conversation_ids
+            )
+            if conversation.user_id == job.user_id
+        }
+        messages = message_crud.get_messages_by_conversation_ids(
+            session, conversation_ids, job.user_id
+        )
+
+    persona_indices = {
+        conversation_id: index
+        for index, conversation_id in enumerate(job.conversation_ids)
+        if conversation_id in conversations
+    }
+    answers = {
+        (message.conversation_id, message.position): message.text
+        for message in messages
+        if message.agent == MessageAgent.CHATBOT
+    }
+    rows = [
+        {
+            "job_id": job.id,
+            "persona_index": persona_indices[message.conversation_id],
+            "persona": conversations[message.conversation_id].description,
+            "conversation_id": message.conversation_id,
+            "question_index": message.position,
+            "question": message.text,
+            "answer": answers.get((message.conversation_id, message.position)),
+        }
+        for message in messages
+        if message.agent == MessageAgent.USER
+        and message.conversation_id in persona_indices
+    ]
+    rows.sort(key=lambda row: (row["persona_index"], row["question_index"]))
+    frame = pd.DataFrame(
+        rows,
+        columns=[
+            "job_id",
+            "persona_index",
+            "persona",
+            "conversation_id",
+            "question_index",
+            "question",
+            "answer",
+        ],
+    )
+
+    buffer = io.BytesIO()
+    if export_format == ExportFormat.PARQUET:
+        frame.to_parquet(buffer, engine="pyarrow", index=False)
+    else:
+        frame.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+class PersonaInterviewRunner:
+    """
+    Runs questionnaires against simulated personas of the kerlin agent.
+
+    Every persona is interviewed in its own conversation, one question after the
+    other, so each call extends the prompt of the previous one. The calls of a
+    persona share its conversation as affinity key and therefore stay on the
+    replica that has the prefix cached. Personas are interviewed concurrently,
+    at the lowest scheduler priority so interactive chats go first, and every
+    finished interview is stored with bulk inserts.
+
+    Jobs and their progress are kept in memory, the stored conversations
+    outlive them.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, PersonaInterviewJob] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str, user_id: str) -> Optional[PersonaInterviewJob]:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def start(
+        self, user_id: str, job_request: CreatePersonaInterviewJobRequest
+    ) -> PersonaInterviewJob:
+        """
+        Start a job in the background.
+
+        Args:
+            user_id (str): User the job belongs to.
+            job_request (CreatePersonaInterviewJobRequest): Personas and questions.
+
+        Returns:
+            PersonaInterviewJob: The queued job.
+
+        Raises:
+            HTTPException: If the job has too many personas or questions.
+        """
+        settings = Settings().persona_interview
+        if len(job_request.personas) > settings.max_personas:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A job can have at most {settings.max_personas} personas.",
+            )
+        if len(job_request.questions) > settings.max_questions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A job can have at most {settings.max_questions} questions.",
+            )
+
+        job = PersonaInterviewJob(
+            id=str(uuid4()),
+            user_id=user_id,
+            name=job_request.name or DEFAULT_JOB_NAME,
+            created_at=datetime.datetime.now(),
+            total_answers=len(job_request.personas) * len(job_request.questions),
+            conversation_ids=[None] * len(job_request.personas),
+        )
+        self.jobs[job.id] = job
+        self.tasks[job.id] = asyncio.create_task(
+            self._run(job, job_request, settings.max_concurrency, settings.retention)
+        )
+        return job
+
+    async def stop(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks = {}
+
+    async def _run(
+        self,
+        job: PersonaInterviewJob,
+        job_request: CreatePersonaInterviewJobRequest,
+        max_concurrency: int,
+        retention: float,
+    ) -> None:
+        job.status = PersonaInterviewStatus.RUNNING
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def interview(index: int, persona: str) -> None:
+            async with semaphore:
+                try:
+                    await self.interview_persona(job, index, persona, job_request.questions)
+                except Exception as e:
+                    job.failed_personas += 1
+                    print(f"[Personas] Job {job.id}, persona {index} failed: {str(e)}")
+
+        try:
+            await asyncio.gather(
+                *(
+                    interview(index, persona)
+                    for index, persona in enumerate(job_request.personas)
+                )
+            )
+            if job.failed_personas == len(job_request.personas):
+                job.status = PersonaInterviewStatus.FAILED
+                job.error = "All personas failed."
+            else:
+                job.status = PersonaInterviewStatus.COMPLETE
+        except asyncio.CancelledError:
+            job.status = PersonaInterviewStatus.FAILED
+            job.error = "The job was cancelled."
+            raise
+        finally:
+            self.tasks.pop(job.id, None)
+            asyncio.get_running_loop().call_later(retention, self.jobs.pop, job.id, None)
+
+    async def interview_persona(
+        self,
+        job: PersonaInterviewJob,
+        index: int,
+        persona: str,
+        questions: list[str],
+    ) -> None:
+        """
+        Ask a persona all questions in order and store the interview.
+
+        Args:
+            job (PersonaInterviewJob): Job the persona belongs to.
+            index (int): Index of the persona in the job.
+            persona (str): Description of the persona.
+            questions (list[str]): Questions to ask.
+        """
+        conversation_id = str(uuid4())
+        deployment = TGIDeployment()
+        scheduler = get_scheduler()
+        messages = [
+            {
+                "role": "system",
+                "content": get_system_prompt(agent_id=AGENT_ID, description=persona),
+            }
+        ]
+
+        answers = []
+        for question in questions:
+            messages.append({"role": "user", "content": question})
+            # Batch jobs get their own bucket, so they don't use up the quota
+            # of the user's interactive chats
+            async with scheduler.slot(f"{job.user_id}:batch", AGENT_ID, Priority.BATCH):
+                chunks = [
+                    chunk
+                    async for chunk in deployment.stream_chat_completion(
+                        messages, affinity_key=conversation_id
+                    )
+                ]
+            answer = "".join(chunk for chunk in chunks if chunk)
+            messages.append({"role": "assistant", "content": answer})
+            answers.append(answer)
+            job.completed_answers += 1
+
+        await asyncio.to_thread(
+            store_persona_interview,
+            job.user_id,
+            conversation_id,
+            f"{job.name} - Persona {index + 1}",
+            persona,
+            questions,
+            answers,
+        )
+        job.conversation_ids[index] = conversation_id
+
+
+persona_interview_runner = PersonaInterviewRunner()
@@ -0,0 +1,83 @@
+from typing import Annotated, Callable, Optional, TypeVar
+
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+
+from backend.crud import conversation as conversation_crud
+from backend.crud import study as study_crud
+from backend.crud import user as user_crud
+from backend.database_models.conversation import Conversation
+from backend.database_models.database import DBSessionDep
+from backend.database_models.study import Study
+from backend.database_models.user import User
+
+Row = TypeVar("Row")
+
+
+class RequestLoader:
+    """
+    Identity map of the conversations, users and studies loaded while handling
+    one request. Validators and handlers load rows through it, so each row is
+    queried at most once per request, including rows that don't exist.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.conversations: dict[tuple[str, str], Optional[Conversation]] = {}
+        self.users: dict[str, Optional[User]] = {}
+        self.studies: dict[str, Optional[Study]] = {}
+
+    def _load(self, rows: dict, key, load: Callable[[], Optional[Row]]) -> Optional[Row]:
+        if key not in rows:
+            rows[key] = load()
+        return rows[key]
+
+    def get_conversation(
+        self, conversation_id: str, user_id: str
+    ) -> Optional[Conversation]:
+        return self._load(
+            self.conversations,
+            (conversation_id, user_id),
+            lambda: conversation_crud.get_conversation(
+                self.session, conversation_id, user_id
+            ),
+        )
+
+    def set_conversation(self, conversation: Conversation) -> None:
+        """
+        Add a conversation created during the request.
+        """
+        self.conversations[(conversation.id, conversation.user_id)] = conversation
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        return self._load(
+            self.users, user_id, lambda: user_crud.get_user(self.session, user_id)
+        )
+
+    def get_study(self, study_id: str) -> Optional[Study]:
+        return self._load(
+            self.studies,
+            study_id,
+            lambda: study_crud.get_study_by_id(self.session, study_id),
+        )
+
+
+def get_request_loader(request: Request, session: DBSessionDep) -> RequestLoader:
+    """
+    Get the loader of the request, shared by its validators and its handler.
+
+    Args:
+        request (Request): current Request
+        session (DBSessionDep): Database session of the request.
+
+    Returns:
+        RequestLoader: Loader of the request.
+    """
+    loader = getattr(request.state, "loader", None)
+    if loader is None or loader.session is not session:
+        loader = RequestLoader(session)
+        request.state.loader = loader
+    return loader
+
+
+RequestLoaderDep = Annotated[RequestLoader, Depends(get_request_loader)]
@@ -1,16 +1,16 @@
 from fastapi import HTTPException, Request
 
-import backend.crud.user as user_crud
-from backend.crud import conversation as conversation_crud
 from backend.crud import study as study_crud
 from backend.database_models.database import DBSessionDep
 from backend.services.auth.utils import get_header_user_id
+from backend.services.request_loader import get_request_loader
+from backend.services.user_cache import user_id_cache
 
 
 def validate_user_header(session: DBSessionDep, request: Request):
     """
     Validate that the request has the `User-Id` header, used for requests
-    that require a User.
+    that require a User. Known and unknown user IDs are cached.
 
     Args:
         request (Request): The request to validate
@@ -27,8 +27,13 @@ def validate_user_header(session: DBSessionDep, request: Request):
             status_code=401, detail="User-Id required in request headers."
         )
 
-    user = user_crud.get_user(session, user_id)
-    if not user:
+    exists = user_id_cache.get(user_id)
+    if exists is None:
+        generation = user_id_cache.get_generation()
+        exists = get_request_loader(request, session).get_user(user_id) is not None
+        user_id_cache.put(user_id, exists, generation)
+
+    if not exists:
         print(f"User {user_id} not found.")
         raise HTTPException(status_code=401, detail="User not found.")
 
@@ -52,8 +57,8 @@ async def validate_chat_request(session: DBSessionDep, request: Request):
     # If conversation_id is passed in with agent_id, then make sure that conversation exists with the agent_id
     conversation_id = body.get("conversation_id")
     if conversation_id and agent_id:
-        conversation = conversation_crud.get_conversation(
-            session, conversation_id, user_id
+        conversation = get_request_loader(request, session).get_conversation(
+            conversation_id, user_id
         )
         if conversation is None or conversation.agent_id != agent_id:
             raise HTTPException(
@@ -103,17 +108,12 @@ async def validate_update_study_request(session: DBSessionDep, request: Request)
     if not study_id:
         raise HTTPException(status_code=400, detail="Study ID is required.")
 
-    study = study_crud.get_study_by_id(session, study_id, user_id)
+    study = get_request_loader(request, session).get_study(study_id)
     if not study:
         raise HTTPException(
             status_code=404, detail=f"Study with ID {study_id} not found."
         )
 
-    if study.user_id != user_id:
-        raise HTTPException(
-            status_code=401, detail=f"Study with ID {study_id} does not belong to user."
-        )
-
     body = await request.json()
     name = body.get("name")
     if name:
@@ -0,0 +1,199 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+import backend.crud.interview as interview_crud
+from backend.database_models.interview import Interview as InterviewModel
+from backend.schemas.citation import CitationList
+from backend.schemas.interview import Interview
+
+# Interview columns that change whenever its transcript or metadata changes
+Fingerprint = tuple[str, str, Optional[dict], Optional[str], Optional[int]]
+# Content hash of the searched transcript, the query and the previous queries
+ResultKey = tuple[str, tuple[str, ...]]
+
+# Search results kept per interview, e.g. for regenerated responses
+MAX_RESULTS_PER_INTERVIEW = 8
+
+
+def get_fingerprint(interview: InterviewModel) -> Fingerprint:
+    return (
+        interview.title,
+        interview.interview_type,
+        interview.fields,
+        interview.content_hash,
+        interview.text_size,
+    )
+
+
+class RetrievalSession:
+    """
+    Parsed interviews searched in one conversation and the search results of
+    their transcripts, keyed by interview ID.
+    """
+
+    def __init__(self):
+        self.interviews: dict[str, tuple[Fingerprint, Interview]] = {}
+        self.results: dict[str, OrderedDict[ResultKey, CitationList]] = {}
+        self.used_at = time.monotonic()
+
+
+class RetrievalSessionCache:
+    """
+    Keeps the parsed interviews of zitatki conversations in memory, so follow-up
+    questions don't load and validate every transcript of the study again.
+
+    Each turn still lists the interviews without their transcripts, and only
+    the transcripts of interviews that are new or changed since the previous
+    turn are loaded. Interviews without a content hash are always reloaded.
+    At most `max_sessions` conversations are kept, idle ones for `ttl` seconds,
+    and the least recently used ones are evicted.
+
+    The citations found in an interview are kept too, so searching it again
+    for the same question and conversation history, e.g. when a response is
+    regenerated, doesn't need another LLM call. They are dropped with the
+    interview when its transcript changes.
+    """
+
+    def __init__(self):
+        self.sessions: OrderedDict[str, RetrievalSession] = OrderedDict()
+        self.max_sessions = 64
+        self.ttl = 1800.0
+
+    def start(self, max_sessions: int, ttl: float) -> None:
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+
+    def get_session(self, conversation_id: str) -> RetrievalSession:
+        now = time.monotonic()
+        session = self.sessions.get(conversation_id)
+        if session is None or session.used_at + self.ttl <= now:
+            session = RetrievalSession()
+            self.sessions[conversation_id] = session
+        session.used_at = now
+        self.sessions.move_to_end(conversation_id)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return session
+
+    def discard(self, conversation_id: str) -> None:
+        self.sessions.pop(conversation_id, None)
+
+    def get_interviews(
+        self,
+        db: Session,
+        conversation_id: str,
+        study_id: Optional[str] = None,
+        interview_ids: Optional[list[str]] = None,
+    ) -> list[Interview]:
+        """
+        Get the interviews searched in a turn of a conversation, reusing the ones
+        parsed in previous turns.
+
+        Args:
+            db (Session): Database session.
+            conversation_id (str): Conversation ID.
+            study_id (Optional[str]): Study whose interviews are searched.
+            interview_ids (Optional[list[str]]): Interviews that are searched,
+                takes precedence over `study_id`.
+
+        Returns:
+            list[Interview]: Interviews of the turn.
+        """
+        if interview_ids:
+            rows = interview_crud.get_interviews_by_ids(
+                db, interview_ids, with_text=False
+            )
+        elif study_id:
+            rows = interview_crud.get_interviews_by_study_id(
+                db, study_id, with_text=False
+            )
+        else:
+            return []
+
+        session = self.get_session(conversation_id)
+        fingerprints = {row.id: get_fingerprint(row) for row in rows}
+        stale_ids = [
+            row.id
+            for row in rows
+            if row.content_hash is None
+            or row.id not in session.interviews
+            or session.interviews[row.id][0] != fingerprints[row.id]
+        ]
+        if stale_ids:
+            # Loads the transcripts into the rows listed above
+            for row in interview_crud.get_interviews_by_ids(db, stale_ids):
+                session.interviews[row.id] = (
+                    fingerprints[row.id],
+                    Interview.model_validate(row),
+                )
+                session.results.pop(row.id, None)
+
+        # Interviews that were deleted or are no longer selected
+        for interview_id in session.interviews.keys() - fingerprints.keys():
+            del session.interviews[interview_id]
+            session.results.pop(interview_id, None)
+
+        return [session.interviews[row.id][1] for row in rows]
+
+    def get_search_results(
+        self, conversation_id: str, interview: Interview, queries: tuple[str, ...]
+    ) -> Optional[CitationList]:
+        """
+        Get the citations found in an interview in an earlier turn.
+
+        Args:
+            conversation_id (str): Conversation ID.
+            interview (Interview): Searched interview.
+            queries (tuple[str, ...]): Query of the search and the previous queries.
+
+        Returns:
+            Optional[CitationList]: Citations, None if the interview wasn't
+                searched with these queries yet.
+        """
+        session = self.sessions.get(conversation_id)
+        if session is None or interview.content_hash is None:
+            return None
+
+        results = session.results.get(interview.id)
+        key = (interview.content_hash, queries)
+        if results is None or key not in results:
+            return None
+
+        results.move_to_end(key)
+        return results[key]
+
+    def put_search_results(
+        self,
+        conversation_id: str,
+        interview: Interview,
+        queries: tuple[str, ...],
+        citations: CitationList,
+    ) -> None:
+        """
+        Keep the citations found in an interview, if the conversation has a session.
+
+        Args:
+            conversation_id (str): Conversation ID.
+            interview (Interview): Searched interview.
+            queries (tuple[str, ...]): Query of the search and the previous queries.
+            citations (CitationList): Citations found in the interview.
+        """
+        session = self.sessions.get(conversation_id)
+        if (
+            session is None
+            or interview.content_hash is None
+            or interview.id not in session.interviews
+        ):
+            return
+
+        results = session.results.setdefault(interview.id, OrderedDict())
+        results[(interview.content_hash, queries)] = citations
+        results.move_to_end((interview.content_hash, queries))
+        while len(results) > MAX_RESULTS_PER_INTERVIEW:
+            results.popitem(last=False)
+
+
+retrieval_sessions = RetrievalSessionCache()
@@ -0,0 +1,518 @@
+import hashlib
+import json
+import pathlib
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import bm25s
+import numpy as np
+
+from backend.config.settings import Settings
+from backend.schemas.interview import InterviewChunk
+from backend.services.chunking import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    chunk_interviews,
+)
+from backend.services.embeddings import (
+    DenseIndex,
+    build_dense_index,
+    get_chunks_fingerprint,
+    get_embedding_model,
+    load_dense_index,
+    save_dense_index,
+)
+from backend.services.text_analysis import get_text_analyzer
+
+BM25_INDEX_NAME = "bm25"
+# Indexes over respondent turns are kept apart from indexes over whole transcripts
+RESPONDENT_BM25_INDEX_NAME = "bm25-respondents"
+# What an index was built from, saved next to the BM25 files
+INDEX_META_FILE = "index_meta.json"
+
+# Study indexes loaded in this process, with the modification time they were loaded at
+loaded_indexes: OrderedDict[str, tuple[int, "StudyIndex"]] = OrderedDict()
+loaded_indexes_lock = threading.Lock()
+
+
+def get_study_index_dir(study_id: str) -> pathlib.Path:
+    """
+    Get the directory in which the search indexes of a study are stored.
+
+    Args:
+        study_id (str): Study ID.
+
+    Returns:
+        pathlib.Path: Index directory of the study.
+    """
+    return pathlib.Path(Settings().ingestion.index_dir) / study_id
+
+
+def get_bm25_index_dir(study_id: str) -> pathlib.Path:
+    """
+    Get the directory of the BM25 index of a study, which depends on whether
+    only respondent turns are indexed.
+
+    Args:
+        study_id (str): Study ID.
+
+    Returns:
+        pathlib.Path: BM25 index directory of the study.
+    """
+    if Settings().search.respondent_turns_only:
+        return get_study_index_dir(study_id) / RESPONDENT_BM25_INDEX_NAME
+    return get_study_index_dir(study_id) / BM25_INDEX_NAME
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def get_index_config() -> str:
+    """
+    Fingerprint the text analysis and chunking settings an index is built with,
+    so indexes are rebuilt when they change.
+
+    Returns:
+        str: Hex digest of the settings.
+    """
+    settings = Settings().search
+    config = {
+        "language": settings.language,
+        "remove_stopwords": settings.remove_stopwords,
+        "stemming": settings.stemming,
+        "compound_splitting": settings.compound_splitting,
+        "min_compound_part_length": settings.min_compound_part_length,
+        "respondent_turns_only": settings.respondent_turns_only,
+        "interviewer_labels": settings.interviewer_labels,
+        "chunk_size": DEFAULT_CHUNK_SIZE,
+        "chunk_overlap": DEFAULT_CHUNK_OVERLAP,
+    }
+    return get_text_hash(json.dumps(config, sort_keys=True))
+
+
+class StudyIndex:
+    """
+    BM25 index over all chunks of all interviews in a study, optionally
+    paired with a dense index over the same chunks for hybrid search.
+
+    The index records the hash of every indexed transcript and the settings it
+    was built with, so it is rebuilt when a transcript is changed in place,
+    e.g. by the bulk import, or the settings change.
+    """
+
+    def __init__(
+        self,
+        study_id: str,
+        retriever: bm25s.BM25,
+        chunks: list[InterviewChunk],
+        dense: Optional[DenseIndex] = None,
+        text_hashes: Optional[dict[str, str]] = None,
+        config: Optional[str] = None,
+    ):
+        self.study_id = study_id
+        self.retriever = retriever
+        self.chunks = chunks
+        self.dense = dense
+        self.text_hashes = text_hashes or {}
+        self.config = config
+
+    def analyze_query(self, query: str) -> list[str]:
+        """
+        Tokenize a query with the same text analysis the chunks were indexed with.
+        Compounds in the query are split into parts that occur in the study.
+
+        Args:
+            query (str): Search query.
+
+        Returns:
+            list[str]: Query tokens.
+        """
+        return get_text_analyzer().analyze(query, self.retriever.vocab_dict)
+
+    def get_scores(self, query_tokens: list[str]):
+        """
+        Score every chunk of the study against the query.
+
+        Args:
+            query_tokens (list[str]): Tokenized query.
+
+        Returns:
+            numpy.ndarray: BM25 score per chunk, in the order of `self.chunks`.
+        """
+        # Queries of only stopwords or punctuation have no tokens, which bm25s rejects
+        if not query_tokens:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.retriever.get_scores(query_tokens)
+
+    def get_interview_scores(
+        self, query_tokens: list[str], interview_ids: list[str]
+    ) -> dict[str, float]:
+        """
+        Score interviews by the BM25 score of their best chunk.
+
+        Args:
+            query_tokens (list[str]): Tokenized query.
+            interview_ids (list[str]): Interviews to score.
+
+        Returns:
+            dict[str, float]: Score per interview in the given order, 0 for
+                interviews without chunks.
+        """
+        interview_scores = dict.fromkeys(interview_ids, 0.0)
+        if not self.chunks:
+            return interview_scores
+
+        for chunk, score in zip(self.chunks, self.get_scores(query_tokens)):
+            if chunk.interview_id in interview_scores:
+                interview_scores[chunk.interview_id] = max(
+                    interview_scores[chunk.interview_id], float(score)
+                )
+        return interview_scores
+
+    def search(
+        self,
+        query_tokens: list[str],
+        k: int = 10,
+        interview_ids: Optional[set[str]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        dense_weight: float = 0.5,
+    ) -> list[tuple[InterviewChunk, float]]:
+        """
+        Retrieve the top `k` chunks of the study for the query.
+
+        If a query embedding is given and the index has a dense index, BM25 scores
+        are normalized to [0, 1] and mixed with the cosine similarities.
+
+        Args:
+            query_tokens (list[str]): Tokenized query.
+            k (int): Number of chunks to return.
+            interview_ids (Optional[set[str]]): Only search chunks of these interviews.
+            query_embedding (Optional[numpy.ndarray]): Unit-length query embedding.
+            dense_weight (float): Weight of the dense score in the hybrid score.
+
+        Returns:
+            list[tuple[InterviewChunk, float]]: Chunks and scores, best first.
+        """
+        if not self.chunks:
+            return []
+
+        scores = self.get_scores(query_tokens)
+        if query_embedding is not None and self.dense is not None:
+            max_score = scores.max()
+            if max_score > 0:
+                scores = scores / max_score
+            dense_scores = np.clip(self.dense.get_scores(query_embedding), 0, None)
+            scores = (1 - dense_weight) * scores + dense_weight * dense_scores
+        if interview_ids is not None:
+            mask = np.array(
+                [chunk.interview_id in interview_ids for chunk in self.chunks]
+            )
+            scores = np.where(mask, scores, 0)
+        k = min(k, len(self.chunks))
+        top = scores.argsort()[::-1][:k]
+        return [(self.chunks[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def build_study_index(
+    study_id: str,
+    chunks: list[InterviewChunk],
+    text_hashes: Optional[dict[str, str]] = None,
+) -> StudyIndex:
+    """
+    Build a BM25 index over the given chunks.
+
+    Args:
+        study_id (str): Study ID.
+        chunks (list[InterviewChunk]): Chunks of all interviews in the study.
+        text_hashes (Optional[dict[str, str]]): Hash of each chunked transcript
+            by interview ID, see `get_text_hash`.
+
+    Returns:
+        StudyIndex: The built index.
+    """
+    retriever = bm25s.BM25()
+    retriever.index([chunk.bm25_tokens for chunk in chunks], show_progress=False)
+    return StudyIndex(
+        study_id, retriever, chunks, text_hashes=text_hashes, config=get_index_config()
+    )
+
+
+def get_text_hashes(interviews: list[tuple[str, str]]) -> dict[str, str]:
+    # Interviews without text have no chunks, so they can't be told apart from missing ones
+    return {
+        interview_id: get_text_hash(text)
+        for interview_id, text in interviews
+        if text.strip()
+    }
+
+
+def save_study_index(index: StudyIndex) -> None:
+    """
+    Persist a study index to the index directory, replacing any previous version.
+
+    Args:
+        index (StudyIndex): Index to save.
+    """
+    index_dir = get_bm25_index_dir(index.study_id)
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+    index_dir.mkdir(parents=True)
+
+    index.retriever.save(
+        index_dir, corpus=[chunk.model_dump() for chunk in index.chunks]
+    )
+    with open(index_dir / INDEX_META_FILE, "w") as f:
+        json.dump({"text_hashes": index.text_hashes, "config": index.config}, f)
+
+
+def load_study_index(study_id: str) -> Optional[StudyIndex]:
+    """
+    Load a study index from the index directory.
+
+    Args:
+        study_id (str): Study ID.
+
+    Returns:
+        Optional[StudyIndex]: The index, or None if the study was never indexed.
+    """
+    index_dir = get_bm25_index_dir(study_id)
+    if not index_dir.exists():
+        return None
+
+    retriever = bm25s.BM25.load(index_dir, load_corpus=True)
+    chunks = [InterviewChunk.model_validate(doc) for doc in retriever.corpus]
+    # Indexes saved without metadata don't match any transcripts and are rebuilt
+    meta = {}
+    if (index_dir / INDEX_META_FILE).exists():
+        with open(index_dir / INDEX_META_FILE) as f:
+            meta = json.load(f)
+    return StudyIndex(
+        study_id,
+        retriever,
+        chunks,
+        text_hashes=meta.get("text_hashes"),
+        config=meta.get("config"),
+    )
+
+
+def get_index_version(study_id: str) -> Optional[int]:
+    try:
+        return get_bm25_index_dir(study_id).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def remember_study_index(index: StudyIndex) -> None:
+    """
+    Keep a saved study index loaded in this process, evicting the least recently
+    used indexes beyond `retrieval_session.max_indexes`.
+
+    Args:
+        index (StudyIndex): Saved index.
+    """
+    version = get_index_version(index.study_id)
+    if version is None:
+        return
+
+    with loaded_indexes_lock:
+        loaded_indexes[index.study_id] = (version, index)
+        loaded_indexes.move_to_end(index.study_id)
+        while len(loaded_indexes) > Settings().retrieval_session.max_indexes:
+            loaded_indexes.popitem(last=False)
+
+
+def load_cached_study_index(study_id: str) -> Optional[StudyIndex]:
+    """
+    Get the index of a study from memory, loading it again only if it was saved
+    since, e.g. by another compute worker.
+
+    Args:
+        study_id (str): Study ID.
+
+    Returns:
+        Optional[StudyIndex]: The index, or None if the study was never indexed.
+    """
+    version = get_index_version(study_id)
+    with loaded_indexes_lock:
+        entry = loaded_indexes.get(study_id)
+        if entry is not None and entry[0] == version:
+            loaded_indexes.move_to_end(study_id)
+            return entry[1]
+        loaded_indexes.pop(study_id, None)
+
+    index = load_study_index(study_id)
+    if index is not None:
+        remember_study_index(index)
+    return index
+
+
+def attach_dense_index(index: StudyIndex, save: bool = True) -> StudyIndex:
+    """
+    Attach the dense index of a study to its BM25 index, embedding the chunks
+    if the saved embeddings are missing or were built for other chunks.
+
+    Args:
+        index (StudyIndex): BM25 index of the study.
+        save (bool): Whether newly built embeddings are saved.
+
+    Returns:
+        StudyIndex: The index with its dense index attached.
+    """
+    model = get_embedding_model()
+    dense = load_dense_index(index.study_id)
+    if (
+        dense is None
+        or dense.model_name != model.model_name
+        or dense.fingerprint != get_chunks_fingerprint(index.chunks)
+    ):
+        dense = build_dense_index(index.study_id, index.chunks, model)
+        if save:
+            save_dense_index(dense)
+
+    index.dense = dense
+    return index
+
+
+def get_or_build_study_index(
+    study_id: str, interviews: list[tuple[str, str]], is_complete: bool = True
+) -> StudyIndex:
+    """
+    Load the index of a study, (re)building it if it doesn't cover the given
+    interviews or their current transcripts, e.g. after a bulk import, or was
+    built with other settings. The dense index is attached if dense retrieval
+    is enabled.
+
+    Args:
+        study_id (str): Study ID.
+        interviews (list[tuple[str, str]]): IDs and transcripts of the interviews
+            that will be searched.
+        is_complete (bool): Whether `interviews` are all interviews of the study.
+            Indexes over a subset of the study are built on the fly but never saved.
+
+    Returns:
+        StudyIndex: Index over all chunks of the interviews.
+    """
+    index = load_cached_study_index(study_id)
+    text_hashes = get_text_hashes(interviews)
+    is_saved = False
+    if index is not None and index.config == get_index_config():
+        is_saved = text_hashes == index.text_hashes or (
+            not is_complete and text_hashes.items() <= index.text_hashes.items()
+        )
+
+    if not is_saved:
+        index = build_study_index(study_id, chunk_interviews(interviews), text_hashes)
+        if is_complete:
+            save_study_index(index)
+            remember_study_index(index)
+            is_saved = True
+
+    # Loaded indexes keep their dense index
+    if Settings().search.dense_retrieval and index.dense is None:
+        attach_dense_index(index, save=is_saved)
+    return index
+
+
+def search_study(
+    texts: list[str],
+    study_id: str,
+    interview_ids: list[str],
+    query: str,
+    k: int = 10,
+    is_complete: bool = True,
+    dense_weight: float = 0.5,
+) -> list[tuple[InterviewChunk, float]]:
+    """
+    Retrieve the top `k` chunks of the given interviews of a study. Meant to run
+    in the compute pool, see `backend.services.compute`.
+
+    Args:
+        texts (list[str]): Transcripts of the interviews.
+        study_id (str): Study ID.
+        interview_ids (list[str]): IDs of the interviews, in the order of `texts`.
+        query (str): Search query.
+        k (int): Number of chunks to return.
+        is_complete (bool): Whether these are all interviews of the study.
+        dense_weight (float): Weight of the dense score if dense retrieval is enabled.
+
+    Returns:
+        list[tuple[InterviewChunk, float]]: Chunks and scores, best first.
+    """
+    index = get_or_build_study_index(
+        study_id, list(zip(interview_ids, texts)), is_complete
+    )
+    query_embedding = None
+    if index.dense is not None:
+        query_embedding = get_embedding_model().embed([query])[0]
+
+    return index.search(
+        index.analyze_query(query),
+        k=k,
+        interview_ids=set(interview_ids),
+        query_embedding=query_embedding,
+        dense_weight=dense_weight,
+    )
+
+
+def rank_interviews(
+    texts: list[str],
+    study_id: str,
+    interview_ids: list[str],
+    query: str,
+    is_complete: bool = True,
+) -> Optional[list[tuple[str, float]]]:
+    """
+    Rank the given interviews of a study by the BM25 score of their best chunk.
+    Meant to run in the compute pool, see `backend.services.compute`.
+
+    Args:
+        texts (list[str]): Transcripts of the interviews.
+        study_id (str): Study ID.
+        interview_ids (list[str]): IDs of the interviews, in the order of `texts`.
+        query (str): Search query.
+        is_complete (bool): Whether these are all interviews of the study.
+
+    Returns:
+        Optional[list[tuple[str, float]]]: Interview IDs and scores, best first.
+            None if no query token occurs in the study, so the query can't be
+            judged lexically.
+    """
+    index = get_or_build_study_index(
+        study_id, list(zip(interview_ids, texts)), is_complete
+    )
+    query_tokens = index.analyze_query(query)
+    if not any(token in index.retriever.vocab_dict for token in query_tokens):
+        return None
+
+    # Ties keep the order of the request
+    interview_scores = index.get_interview_scores(query_tokens, interview_ids)
+    return sorted(interview_scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def rebuild_study_index(
+    texts: list[str], study_id: str, interview_ids: list[str]
+) -> int:
+    """
+    Rebuild and save the index of a study from all of its interviews. Meant to
+    run in the compute pool, see `backend.services.compute`.
+
+    Args:
+        texts (list[str]): Transcripts of all interviews in the study.
+        study_id (str): Study ID.
+        interview_ids (list[str]): IDs of the interviews, in the order of `texts`.
+
+    Returns:
+        int: Number of indexed chunks.
+    """
+    interviews = list(zip(interview_ids, texts))
+    index = build_study_index(
+        study_id, chunk_interviews(interviews), get_text_hashes(interviews)
+    )
+    save_study_index(index)
+    if Settings().search.dense_retrieval:
+        attach_dense_index(index)
+    remember_study_index(index)
+    return len(index.chunks)
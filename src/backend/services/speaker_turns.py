@@ -0,0 +1,121 @@
+import re
+from collections import Counter
+from typing import Optional
+
+from backend.config.settings import Settings
+from backend.schemas.interview import Interview, SpeakerTurn
+
+# A speaker label at the start of a line, e.g. "I:", "B:", "TN 3:" or "Frau Meier:"
+SPEAKER_LABEL = re.compile(
+    r"^[ \t]*(?P<speaker>[^\W\d_][\w.\-]{0,19}(?:[ \t][\w.\-]{1,20}){0,2})[ \t]*:",
+    re.MULTILINE,
+)
+# Labels that occur only once are more likely a sentence like "Ich meine: ..."
+MIN_LABEL_OCCURRENCES = 2
+
+
+def split_speaker_turns(
+    text: str, interviewer_labels: Optional[list[str]] = None
+) -> list[SpeakerTurn]:
+    """
+    Split a transcript into speaker turns.
+
+    Args:
+        text (str): Transcript text.
+        interviewer_labels (Optional[list[str]]): Speaker labels of interviewers,
+            defaults to `search.interviewer_labels`.
+
+    Returns:
+        list[SpeakerTurn]: Turns in transcript order, without text before the
+            first label. Empty if the transcript doesn't have both interviewer
+            and respondent turns, e.g. memos.
+    """
+    if interviewer_labels is None:
+        interviewer_labels = Settings().search.interviewer_labels
+    interviewers = {label.casefold() for label in interviewer_labels}
+
+    labels = list(SPEAKER_LABEL.finditer(text))
+    counts = Counter(label["speaker"] for label in labels)
+    labels = [
+        label for label in labels if counts[label["speaker"]] >= MIN_LABEL_OCCURRENCES
+    ]
+
+    turns = []
+    for label, next_label in zip(labels, labels[1:] + [None]):
+        start = label.end()
+        end = next_label.start() if next_label is not None else len(text)
+        content = text[start:end]
+        stripped = content.strip()
+        if not stripped:
+            continue
+        # Offsets of the turn without surrounding whitespace
+        start += len(content) - len(content.lstrip())
+        turns.append(
+            SpeakerTurn(
+                speaker=label["speaker"],
+                is_interviewer=label["speaker"].casefold() in interviewers,
+                start_pos=start,
+                end_pos=start + len(stripped),
+            )
+        )
+
+    has_interviewer = any(turn.is_interviewer for turn in turns)
+    has_respondent = any(not turn.is_interviewer for turn in turns)
+    return turns if has_interviewer and has_respondent else []
+
+
+def dump_speaker_turns(text: str) -> list[dict]:
+    """
+    Split a transcript into speaker turns for the `interviews.speaker_turns` column.
+
+    Args:
+        text (str): Transcript text.
+
+    Returns:
+        list[dict]: Turns in transcript order, see `split_speaker_turns`.
+    """
+    return [turn.model_dump() for turn in split_speaker_turns(text)]
+
+
+def get_respondent_turns(
+    text: str, speaker_turns: Optional[list[SpeakerTurn]] = None
+) -> list[SpeakerTurn]:
+    """
+    Get the respondent turns of a transcript that are searched instead of the
+    whole text, if `search.respondent_turns_only` is set.
+
+    Args:
+        text (str): Transcript text.
+        speaker_turns (Optional[list[SpeakerTurn]]): Turns stored at ingestion,
+            the transcript is split again if None.
+
+    Returns:
+        list[SpeakerTurn]: Respondent turns, empty if the whole text is searched.
+    """
+    if not Settings().search.respondent_turns_only:
+        return []
+
+    if speaker_turns is None:
+        speaker_turns = split_speaker_turns(text)
+    return [turn for turn in speaker_turns if not turn.is_interviewer]
+
+
+def get_search_text(interview: Interview) -> str:
+    """
+    Get the text of an interview that is sent to the LLM in a search.
+
+    Args:
+        interview (Interview): Interview.
+
+    Returns:
+        str: The respondent turns with their speaker labels, or the whole
+            transcript if it has no speaker labels.
+    """
+    turns = get_respondent_turns(interview.text, interview.speaker_turns)
+    if not turns:
+        return interview.text
+
+    return "\n\n".join(
+        f"{turn.speaker}: {interview.text[turn.start_pos : turn.end_pos]}"
+        for turn in turns
+    )
@@ -0,0 +1,212 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncGenerator, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.config.settings import Settings
+from backend.schemas.chat import ChatResponseEvent, FinishReason, StreamEnd, StreamEvent
+
+
+class StreamBuffer:
+    """
+    Events of a single chat response, numbered and kept in a bounded ring buffer.
+
+    The response is generated by a producer task that is independent of the
+    client connection, so a client that reconnects with its `Last-Event-ID`
+    receives the events it missed and then continues live. If no client is
+    connected for `resume_grace_period` seconds, the producer is cancelled, at
+    once if it is 0. This is the only place where a disconnect stops the
+    generation.
+    """
+
+    def __init__(
+        self,
+        message_id: str,
+        user_id: str,
+        conversation_id: str,
+        max_events: int = 4096,
+        resume_grace_period: float = 30.0,
+    ):
+        self.message_id = message_id
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.resume_grace_period = resume_grace_period
+        self.events: deque[tuple[int, str]] = deque(maxlen=max_events)
+        self.next_id = 0
+        self.is_finished = False
+        self.subscribers = 0
+        self.producer: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+        self._cancel_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def first_id(self) -> int:
+        return self.next_id - len(self.events)
+
+    def append(self, data: str) -> None:
+        self.events.append((self.next_id, data))
+        self.next_id += 1
+        self._notify()
+
+    def finish(self) -> None:
+        self.is_finished = True
+        if self._cancel_handle is not None:
+            self._cancel_handle.cancel()
+        self._notify()
+
+    def get_error_event(self, error: str) -> str:
+        """
+        Get the data of a stream-end event that ends the response with an error.
+        """
+        stream_end = StreamEnd(
+            message_id=self.message_id,
+            conversation_id=self.conversation_id,
+            text="",
+            finish_reason=FinishReason.ERROR,
+            error=error,
+        )
+        return json.dumps(
+            jsonable_encoder(
+                ChatResponseEvent(event=StreamEvent.STREAM_END, data=stream_end)
+            )
+        )
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def can_resume(self, last_event_id: Optional[int]) -> bool:
+        """
+        Whether all events after `last_event_id` are still buffered.
+        """
+        next_id = 0 if last_event_id is None else last_event_id + 1
+        return next_id >= self.first_id
+
+    def _cancel_producer(self) -> None:
+        if self.producer is not None and self.subscribers == 0:
+            print(f"[Streaming] No client resumed message {self.message_id}, cancelling.")
+            self.producer.cancel()
+
+    def _attach(self) -> None:
+        self.subscribers += 1
+        if self._cancel_handle is not None:
+            self._cancel_handle.cancel()
+            self._cancel_handle = None
+
+    def _detach(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers != 0 or self.is_finished:
+            return
+        if self.resume_grace_period <= 0:
+            self._cancel_producer()
+        else:
+            self._cancel_handle = asyncio.get_running_loop().call_later(
+                self.resume_grace_period, self._cancel_producer
+            )
+
+    async def subscribe(
+        self, last_event_id: Optional[int] = None
+    ) -> AsyncGenerator[dict[str, Any], Any]:
+        """
+        Stream the events after `last_event_id`, then the live events until the
+        response is finished. If events fell out of the buffer before they were
+        sent, e.g. to a slow client, the stream ends with an error event instead.
+
+        Args:
+            last_event_id (Optional[int]): ID of the last event the client received.
+
+        Yields:
+            dict[str, Any]: Server-sent events with their ID.
+        """
+        self._attach()
+        try:
+            next_id = 0 if last_event_id is None else last_event_id + 1
+            while True:
+                changed = self._changed
+                if next_id < self.first_id:
+                    # Without an ID, so the client's Last-Event-ID stays at the gap
+                    yield {
+                        "data": self.get_error_event(
+                            "Events of the response are no longer available, "
+                            "please retry the message."
+                        )
+                    }
+                    return
+                while next_id < self.next_id:
+                    event_id, data = self.events[next_id - self.first_id]
+                    yield {"id": str(event_id), "data": data}
+                    next_id += 1
+
+                if self.is_finished:
+                    return
+                await changed.wait()
+        finally:
+            self._detach()
+
+
+class StreamBufferRegistry:
+    """
+    Buffers of the chat responses that are being generated or finished recently.
+    """
+
+    def __init__(self):
+        self.buffers: dict[str, StreamBuffer] = {}
+
+    def get(self, message_id: str) -> Optional[StreamBuffer]:
+        return self.buffers.get(message_id)
+
+    def start(
+        self,
+        message_id: str,
+        user_id: str,
+        conversation_id: str,
+        stream: AsyncGenerator[str, Any],
+    ) -> StreamBuffer:
+        """
+        Start generating a response into a new buffer.
+
+        Args:
+            message_id (str): ID of the response message.
+            user_id (str): User the response belongs to.
+            conversation_id (str): Conversation the response belongs to.
+            stream (AsyncGenerator[str, Any]): Chat stream producing the event data.
+
+        Returns:
+            StreamBuffer: Buffer of the response.
+        """
+        settings = Settings().stream_buffer
+        buffer = StreamBuffer(
+            message_id,
+            user_id,
+            conversation_id,
+            max_events=settings.max_events,
+            resume_grace_period=settings.resume_grace_period,
+        )
+        self.buffers[message_id] = buffer
+        buffer.producer = asyncio.create_task(
+            self._produce(buffer, stream, settings.retention)
+        )
+        return buffer
+
+    async def _produce(
+        self, buffer: StreamBuffer, stream: AsyncGenerator[str, Any], retention: float
+    ) -> None:
+        try:
+            async for data in stream:
+                buffer.append(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[Streaming] Message {buffer.message_id} failed: {str(e)}")
+            buffer.append(buffer.get_error_event(str(e)))
+        finally:
+            await stream.aclose()
+            buffer.finish()
+            asyncio.get_running_loop().call_later(
+                retention, self.buffers.pop, buffer.message_id, None
+            )
+
+
+stream_buffers = StreamBufferRegistry()
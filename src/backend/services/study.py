@@ -1,12 +1,11 @@
 from fastapi import HTTPException
 
-from backend.crud import study as study_crud
-from backend.database_models.database import DBSessionDep
 from backend.database_models.study import Study
+from backend.services.request_loader import RequestLoader
 
 
-def validate_study_exists(session: DBSessionDep, study_id: str, user_id: str) -> Study:
-    study = study_crud.get_study_by_id(session, study_id)
+def validate_study_exists(loader: RequestLoader, study_id: str) -> Study:
+    study = loader.get_study(study_id)
 
     if not study:
         raise HTTPException(
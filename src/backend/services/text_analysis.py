@@ -0,0 +1,175 @@
+import re
+from functools import lru_cache
+from itertools import chain
+from typing import Collection, Iterable, Optional
+
+from bm25s.stopwords import STOPWORDS_EN, STOPWORDS_GERMAN
+from nltk.stem.snowball import SnowballStemmer
+
+from backend.config.settings import Settings
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+STOPWORDS = {
+    "german": STOPWORDS_GERMAN,
+    "english": STOPWORDS_EN,
+}
+
+# Fugenelemente that may join the parts of a German compound, e.g. Arbeit-s-platz
+LINKING_MORPHEMES = ("es", "en", "s", "n", "e")
+
+
+class TextAnalyzer:
+    """
+    Text analysis pipeline for the BM25 search: lowercasing, stopword removal,
+    compound splitting and Snowball stemming.
+
+    Word lists are cached per text (i.e. per chunk) and stems per word, in LRU
+    caches of `cache_size` entries each, so re-indexing a study only pays for
+    chunks that were never analyzed before.
+    """
+
+    def __init__(
+        self,
+        language: str = "german",
+        remove_stopwords: bool = True,
+        stemming: bool = True,
+        compound_splitting: bool = True,
+        min_compound_part_length: int = 4,
+        cache_size: int = 50_000,
+    ):
+        self.language = language
+        self.stopwords = (
+            frozenset(STOPWORDS.get(language, ())) if remove_stopwords else frozenset()
+        )
+        self.stemmer = SnowballStemmer(language) if stemming else None
+        self.compound_splitting = compound_splitting
+        self.min_compound_part_length = min_compound_part_length
+        self.words = lru_cache(maxsize=cache_size)(self._words)
+        self.stem = lru_cache(maxsize=cache_size)(self._stem)
+
+    def _words(self, text: str) -> tuple[str, ...]:
+        """
+        Lowercase and split a text into words, dropping stopwords.
+        """
+        return tuple(
+            word
+            for word in TOKEN_PATTERN.findall(text.lower())
+            if word not in self.stopwords
+        )
+
+    def _stem(self, word: str) -> str:
+        if self.stemmer is None:
+            return word
+        return self.stemmer.stem(word)
+
+    def split_compound(self, word: str, vocabulary: Collection[str]) -> list[str]:
+        """
+        Split a compound into the stems of its parts, if all parts are known words.
+
+        Args:
+            word (str): Word to split.
+            vocabulary (Collection[str]): Known stems.
+
+        Returns:
+            list[str]: Stems of the parts, or an empty list if the word can't be split.
+        """
+        min_length = self.min_compound_part_length
+        for i in range(min_length, len(word) - min_length + 1):
+            head, tail = word[:i], word[i:]
+            tail_stem = self.stem(tail)
+            if tail_stem not in vocabulary:
+                continue
+
+            for morpheme in ("",) + LINKING_MORPHEMES:
+                if not head.endswith(morpheme):
+                    continue
+                head_candidate = head[: len(head) - len(morpheme)]
+                if len(head_candidate) < min_length:
+                    continue
+
+                head_stem = self.stem(head_candidate)
+                if head_stem in vocabulary:
+                    return [head_stem] + (
+                        self.split_compound(tail, vocabulary) or [tail_stem]
+                    )
+
+        return []
+
+    def _expand(self, words: Iterable[str], vocabulary: Collection[str]) -> dict:
+        if not self.compound_splitting:
+            return {}
+
+        min_compound_length = 2 * self.min_compound_part_length
+        return {
+            word: parts
+            for word in words
+            if len(word) >= min_compound_length
+            and (parts := self.split_compound(word, vocabulary))
+        }
+
+    def analyze(
+        self, text: str, vocabulary: Optional[Collection[str]] = None
+    ) -> list[str]:
+        """
+        Analyze a single text, e.g. a search query.
+
+        Args:
+            text (str): Text to analyze.
+            vocabulary (Optional[Collection[str]]): Stems of the searched corpus,
+                compounds are only split into parts known to the corpus.
+
+        Returns:
+            list[str]: Tokens of the text.
+        """
+        words = self.words(text)
+        expansions = self._expand(set(words), vocabulary) if vocabulary else {}
+        return [
+            token
+            for word in words
+            for token in (self.stem(word), *expansions.get(word, ()))
+        ]
+
+    def analyze_corpus(self, texts: list[str]) -> list[list[str]]:
+        """
+        Analyze all texts of a corpus at once. Every distinct word is stemmed and
+        split only once, and compounds are split against the corpus' own vocabulary.
+
+        Args:
+            texts (list[str]): Texts to analyze, e.g. all chunks of a study.
+
+        Returns:
+            list[list[str]]: Tokens per text.
+        """
+        words_per_text = [self.words(text) for text in texts]
+        unique_words = set(chain.from_iterable(words_per_text))
+        stems = {word: self.stem(word) for word in unique_words}
+        expansions = self._expand(unique_words, set(stems.values()))
+
+        return [
+            [
+                token
+                for word in words
+                for token in (stems[word], *expansions.get(word, ()))
+            ]
+            for words in words_per_text
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_text_analyzer() -> TextAnalyzer:
+    """
+    Get the text analyzer configured in the search settings.
+
+    Returns:
+        TextAnalyzer: Shared text analyzer.
+    """
+    settings = Settings().search
+    return TextAnalyzer(
+        language=settings.language,
+        remove_stopwords=settings.remove_stopwords,
+        stemming=settings.stemming,
+        compound_splitting=settings.compound_splitting,
+        min_compound_part_length=settings.min_compound_part_length,
+        cache_size=settings.token_cache_size,
+    )
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Optional
+
+from pydantic import parse_obj_as
+from sqlalchemy.orm import Session
+
+from backend.crud import conversation as conversation_crud
+from backend.database_models.base import CustomFilterQuery
+from backend.database_models.database import engine
+from backend.schemas.conversation import Conversation
+from backend.services.conversation import generate_conversation_title
+
+
+def get_conversations(conversation_ids: list[str]) -> list[Conversation]:
+    with Session(engine, query_cls=CustomFilterQuery) as session:
+        conversations = conversation_crud.get_conversations_by_ids(
+            session, conversation_ids
+        )
+        return parse_obj_as(list[Conversation], conversations)
+
+
+def update_titles(titles: list[dict[str, str]]) -> None:
+    with Session(engine, query_cls=CustomFilterQuery) as session:
+        conversation_crud.update_conversation_titles(session, titles)
+
+
+class TitleGenerationQueue:
+    """
+    Background worker that titles conversations in batches.
+
+    Conversations keep their provisional title, the first words of the first
+    message, until the worker replaces it. The worker collects conversations for
+    up to `max_wait` seconds, generates their titles concurrently with a short
+    token budget and at the lowest scheduler priority, and writes all titles of
+    a batch in one update.
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        self.worker: Optional[asyncio.Task] = None
+        self.batch_size = 16
+        self.max_wait = 2.0
+        self.max_new_tokens = 24
+
+    def start(self, batch_size: int, max_wait: float, max_new_tokens: int) -> None:
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_new_tokens = max_new_tokens
+        self.worker = asyncio.create_task(self._work())
+
+    async def stop(self) -> None:
+        if self.worker is not None:
+            self.worker.cancel()
+            await asyncio.gather(self.worker, return_exceptions=True)
+            self.worker = None
+
+    def enqueue(self, conversation_id: str) -> None:
+        self.queue.put_nowait(conversation_id)
+
+    async def _next_batch(self) -> list[str]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def generate_titles(self, conversation_ids: list[str]) -> int:
+        """
+        Generate and store the titles of a batch of conversations.
+
+        Args:
+            conversation_ids (list[str]): Conversation IDs.
+
+        Returns:
+            int: Number of generated titles.
+        """
+        conversations = await asyncio.to_thread(get_conversations, conversation_ids)
+        results = await asyncio.gather(
+            *(
+                generate_conversation_title(conversation, self.max_new_tokens)
+                for conversation in conversations
+            ),
+            return_exceptions=True,
+        )
+
+        titles = []
+        for conversation, result in zip(conversations, results):
+            if isinstance(result, BaseException):
+                print(f"[Titles] Conversation {conversation.id} failed: {str(result)}")
+                continue
+            if result:
+                titles.append(
+                    {
+                        "id": conversation.id,
+                        "user_id": conversation.user_id,
+                        "old_title": conversation.title,
+                        "title": result,
+                    }
+                )
+
+        await asyncio.to_thread(update_titles, titles)
+        return len(titles)
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                # A conversation may have been queued more than once
+                await self.generate_titles(list(dict.fromkeys(batch)))
+            except Exception as e:
+                print(f"[Titles] Batch of {len(batch)} conversations failed: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+title_generation_queue = TitleGenerationQueue()
@@ -0,0 +1,330 @@
+import hashlib
+import io
+import json
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import Connection, bindparam, text
+
+from backend.services.speaker_turns import dump_speaker_turns
+from backend.services.transcript_storage import (
+    collect_garbage,
+    get_transcript_storage,
+)
+
+DEFAULT_TRANSCRIPTS_DIR = "/data/transcripts"
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_WORKERS = 8
+
+STAGING_TABLE = "interviews_import"
+IMPORT_COLUMNS = (
+    "id",
+    "title",
+    "interview_type",
+    "study_id",
+    "storage_backend",
+    "text",
+    "compressed_text",
+    "content_hash",
+    "text_size",
+    "speaker_turns",
+)
+
+
+class TranscriptFile(BaseModel):
+    study_name: str
+    title: str
+    interview_type: str
+    path: str
+
+
+class ImportStats(BaseModel):
+    files: int = 0
+    bytes: int = 0
+    studies: int = 0
+    written: int = 0
+    skipped_duplicates: int = 0
+    skipped_unchanged: int = 0
+    deleted_files: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"{self.files} files ({self.bytes / 1e6:.1f} MB) from {self.studies} studies "
+            f"in {self.seconds:.2f}s: {self.written} written, "
+            f"{self.skipped_unchanged} unchanged, {self.skipped_duplicates} duplicates, "
+            f"{self.deleted_files} replaced transcript files deleted "
+            f"({self.files / seconds:.1f} files/s, {self.bytes / 1e6 / seconds:.1f} MB/s)"
+        )
+
+
+def get_interview_type(title: str) -> str:
+    """
+    Derive the interview type from a transcript file name.
+
+    Args:
+        title (str): Transcript file name without suffix.
+
+    Returns:
+        str: One of GD, Memo or TI.
+    """
+    prefix = title.split("_")[0]
+    if prefix.startswith("GD"):
+        return "GD"
+    if prefix.startswith("Memo"):
+        return "Memo"
+    return "TI"
+
+
+def discover_transcripts(root: pathlib.Path) -> list[TranscriptFile]:
+    """
+    Find all transcripts below `root`, one folder per study.
+
+    Args:
+        root (pathlib.Path): Transcripts directory.
+
+    Returns:
+        list[TranscriptFile]: Transcripts, ordered by study and title.
+    """
+    return [
+        TranscriptFile(
+            study_name=study_folder.name,
+            title=path.stem,
+            interview_type=get_interview_type(path.stem),
+            path=str(path),
+        )
+        for study_folder in sorted(root.iterdir())
+        if study_folder.is_dir()
+        for path in sorted(study_folder.glob("*.txt"))
+    ]
+
+
+def read_transcript_file(file: TranscriptFile) -> tuple[TranscriptFile, str, str]:
+    """
+    Read a transcript and hash its content.
+
+    Args:
+        file (TranscriptFile): Transcript to read.
+
+    Returns:
+        tuple[TranscriptFile, str, str]: The transcript, its text and the SHA-256 hex digest of the text.
+    """
+    with open(file.path, "r") as f:
+        interview_text = f.read()
+    return file, interview_text, hashlib.sha256(interview_text.encode()).hexdigest()
+
+
+def upsert_studies(connection: Connection, study_names: list[str]) -> dict[str, str]:
+    """
+    Create the studies that don't exist yet.
+
+    Args:
+        connection (Connection): Database connection.
+        study_names (list[str]): Study names.
+
+    Returns:
+        dict[str, str]: Study ID per study name.
+    """
+    connection.execute(
+        text(
+            """
+            INSERT INTO studies (
+                id, name, description, is_transcribed, created_at, updated_at
+            )
+            VALUES (:id, :name, '', true, now(), now())
+            ON CONFLICT (name) DO NOTHING;
+            """
+        ),
+        [{"id": str(uuid4()), "name": name} for name in study_names],
+    )
+    rows = connection.execute(
+        text("SELECT id, name FROM studies WHERE name IN :names").bindparams(
+            bindparam("names", expanding=True)
+        ),
+        {"names": study_names},
+    )
+    return {row.name: row.id for row in rows}
+
+
+def get_existing_hashes(
+    connection: Connection, study_ids: list[str]
+) -> dict[tuple[str, str], str]:
+    """
+    Get the content hashes of the interviews already stored for the studies.
+
+    Args:
+        connection (Connection): Database connection.
+        study_ids (list[str]): Study IDs.
+
+    Returns:
+        dict[tuple[str, str], str]: SHA-256 hex digest per (study ID, title).
+    """
+    rows = connection.execute(
+        text(
+            "SELECT study_id, title, content_hash FROM interviews "
+            "WHERE study_id IN :study_ids"
+        ).bindparams(bindparam("study_ids", expanding=True)),
+        {"study_ids": study_ids},
+    )
+    return {(row.study_id, row.title): row.content_hash for row in rows}
+
+
+def format_csv_row(row: tuple) -> str:
+    """
+    Format a row for COPY in CSV format. Strings are always quoted, because
+    COPY reads unquoted empty values as NULL, e.g. empty inline transcripts.
+
+    Args:
+        row (tuple): Column values.
+
+    Returns:
+        str: CSV line.
+    """
+    fields = []
+    for value in row:
+        if value is None:
+            fields.append("")
+        elif isinstance(value, str):
+            fields.append('"' + value.replace('"', '""') + '"')
+        else:
+            fields.append(str(value))
+    return ",".join(fields) + "\n"
+
+
+def copy_interviews(connection: Connection, rows: list[tuple]) -> None:
+    """
+    Load interview rows with COPY into a staging table and upsert them on
+    (title, study_id).
+
+    Args:
+        connection (Connection): Database connection.
+        rows (list[tuple]): Rows in the column order of `IMPORT_COLUMNS`.
+    """
+    buffer = io.StringIO()
+    buffer.writelines(format_csv_row(row) for row in rows)
+    buffer.seek(0)
+
+    columns = ", ".join(IMPORT_COLUMNS)
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+            "AS SELECT * FROM interviews WITH NO DATA"
+        )
+    )
+    cursor = connection.connection.cursor()
+    cursor.copy_expert(
+        f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+    connection.execute(
+        text(
+            f"""
+            INSERT INTO interviews ({columns}, fields, created_at, updated_at)
+            SELECT {columns}, NULL, now(), now()
+            FROM {STAGING_TABLE}
+            ON CONFLICT (title, study_id) DO UPDATE
+            SET interview_type = excluded.interview_type,
+                storage_backend = excluded.storage_backend,
+                text = excluded.text,
+                compressed_text = excluded.compressed_text,
+                content_hash = excluded.content_hash,
+                text_size = excluded.text_size,
+                speaker_turns = excluded.speaker_turns,
+                updated_at = now();
+            """
+        )
+    )
+    connection.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+
+def import_transcripts(
+    connection: Connection,
+    root: pathlib.Path = pathlib.Path(DEFAULT_TRANSCRIPTS_DIR),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    commit: bool = True,
+) -> ImportStats:
+    """
+    Bulk import all transcripts below `root`. Files are read in parallel,
+    deduplicated by content hash, split into speaker turns, stored with the
+    configured transcript storage backend and loaded in batches. Re-running the import
+    only writes interviews that are new or whose text changed. Once committed, the
+    transcript files that are no longer referenced are deleted.
+
+    Args:
+        connection (Connection): Database connection.
+        root (pathlib.Path): Transcripts directory, one folder per study.
+        batch_size (int): Number of interviews loaded per batch.
+        max_workers (int): Number of threads reading files.
+        commit (bool): Commit after every batch so an interrupted import can be resumed.
+
+    Returns:
+        ImportStats: Import statistics.
+    """
+    start = time.perf_counter()
+    stats = ImportStats()
+
+    files = discover_transcripts(root)
+    if not files:
+        return stats
+
+    study_ids = upsert_studies(connection, sorted({f.study_name for f in files}))
+    existing_hashes = get_existing_hashes(connection, list(study_ids.values()))
+    stats.studies = len(study_ids)
+    seen_hashes: set[tuple[str, str]] = set()
+    storage = get_transcript_storage()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch_start in range(0, len(files), batch_size):
+            rows = []
+            batch = files[batch_start : batch_start + batch_size]
+            for file, interview_text, content_hash in pool.map(
+                read_transcript_file, batch
+            ):
+                study_id = study_ids[file.study_name]
+                stats.files += 1
+                stats.bytes += len(interview_text.encode())
+
+                if (study_id, content_hash) in seen_hashes:
+                    stats.skipped_duplicates += 1
+                    continue
+                seen_hashes.add((study_id, content_hash))
+
+                if existing_hashes.get((study_id, file.title)) == content_hash:
+                    stats.skipped_unchanged += 1
+                    continue
+
+                stored = storage.encode(interview_text)
+                compressed_text = stored["compressed_text"]
+                rows.append(
+                    (
+                        str(uuid4()),
+                        file.title,
+                        file.interview_type,
+                        study_id,
+                        stored["storage_backend"],
+                        stored["inline_text"],
+                        # bytea columns are loaded from their hex representation
+                        "\\x" + compressed_text.hex() if compressed_text else None,
+                        stored["content_hash"],
+                        stored["text_size"],
+                        json.dumps(dump_speaker_turns(interview_text)),
+                    )
+                )
+
+            if rows:
+                copy_interviews(connection, rows)
+                stats.written += len(rows)
+            if commit:
+                connection.commit()
+
+            print(f"[Import] {stats.files}/{len(files)} files processed.")
+
+    if commit:
+        stats.deleted_files = collect_garbage(connection)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import pathlib
+import tempfile
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import Connection, text
+
+from backend.config.settings import Settings
+
+# Files younger than this may belong to an interview that is not committed yet
+DEFAULT_GC_MIN_AGE = 3600
+
+
+class TranscriptStorage:
+    """
+    Base storage backend for interview transcript bodies, abstract class that should be inherited from.
+
+    Backends translate a transcript into the interview columns that hold it and back.
+    Every backend records the content hash and size of the transcript, so interviews
+    can be compared and listed without loading their text.
+
+    Attributes:
+        NAME (str): The name stored in `Interview.storage_backend`.
+    """
+
+    NAME = "base"
+
+    def encode(self, text: str) -> dict[str, Any]:
+        """
+        Store a transcript.
+
+        Args:
+            text (str): Transcript text.
+
+        Returns:
+            dict[str, Any]: Interview column values referencing the stored transcript.
+        """
+        return {
+            "storage_backend": self.NAME,
+            "inline_text": None,
+            "compressed_text": None,
+            "content_hash": hashlib.sha256(text.encode()).hexdigest(),
+            "text_size": len(text),
+        }
+
+    def decode(self, interview: Any) -> str:
+        """
+        Load the transcript of an interview.
+
+        Args:
+            interview (Interview): Interview referencing the transcript.
+
+        Returns:
+            str: Transcript text.
+        """
+        raise NotImplementedError
+
+
+class InlineTranscriptStorage(TranscriptStorage):
+    """
+    Uncompressed text in the `interviews.text` column, used by rows created before
+    transcript storage backends existed.
+    """
+
+    NAME = "inline"
+
+    def encode(self, text: str) -> dict[str, Any]:
+        return super().encode(text) | {"inline_text": text}
+
+    def decode(self, interview: Any) -> str:
+        return interview.inline_text or ""
+
+
+class CompressedTranscriptStorage(TranscriptStorage):
+    """
+    zlib compressed text in the `interviews.compressed_text` bytea column.
+    """
+
+    NAME = "compressed"
+
+    def __init__(self, compression_level: int = 6):
+        self.compression_level = compression_level
+
+    def encode(self, text: str) -> dict[str, Any]:
+        return super().encode(text) | {
+            "compressed_text": zlib.compress(text.encode(), self.compression_level)
+        }
+
+    def decode(self, interview: Any) -> str:
+        if interview.compressed_text is None:
+            return ""
+        return zlib.decompress(interview.compressed_text).decode()
+
+
+class FileTranscriptStorage(TranscriptStorage):
+    """
+    Content-addressed files on local disk, named by the transcript's SHA-256 hash.
+    Transcripts are deduplicated on disk and kept out of the database.
+
+    A file can be shared by several interviews, so it is not removed with an
+    interview. Deleted and replaced transcripts are removed by
+    `collect_garbage`, which runs after every bulk import and with
+    `make gc-transcripts`.
+    """
+
+    NAME = "file"
+
+    def __init__(self, directory: str):
+        self.directory = pathlib.Path(directory)
+
+    def get_path(self, content_hash: str) -> pathlib.Path:
+        return self.directory / content_hash[:2] / f"{content_hash}.txt"
+
+    def encode(self, text: str) -> dict[str, Any]:
+        columns = super().encode(text)
+        path = self.get_path(columns["content_hash"])
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial transcripts
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(text.encode())
+            os.replace(tmp_path, path)
+
+        return columns
+
+    def decode(self, interview: Any) -> str:
+        # Read as bytes, read_text would translate line endings of the stored text
+        return self.get_path(interview.content_hash).read_bytes().decode()
+
+    def delete_unreferenced(
+        self, referenced_hashes: set[str], min_age: float = DEFAULT_GC_MIN_AGE
+    ) -> int:
+        """
+        Delete the transcript files that no interview references.
+
+        Args:
+            referenced_hashes (set[str]): Content hashes of the file backed interviews.
+            min_age (float): Seconds since the last write before a file can be deleted.
+
+        Returns:
+            int: Number of deleted files.
+        """
+        if not self.directory.exists():
+            return 0
+
+        deleted = 0
+        cutoff = time.time() - min_age
+        for path in self.directory.glob("*/*.txt"):
+            if path.stem in referenced_hashes:
+                continue
+            try:
+                if path.stat().st_mtime <= cutoff:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+
+@lru_cache
+def get_transcript_storage(name: Optional[str] = None) -> TranscriptStorage:
+    """
+    Get a transcript storage backend.
+
+    Args:
+        name (Optional[str]): Backend name, defaults to the configured backend.
+
+    Returns:
+        TranscriptStorage: The storage backend.
+    """
+    settings = Settings().transcript_storage
+    name = name or settings.backend
+
+    if name == InlineTranscriptStorage.NAME:
+        return InlineTranscriptStorage()
+    if name == CompressedTranscriptStorage.NAME:
+        return CompressedTranscriptStorage(settings.compression_level)
+    if name == FileTranscriptStorage.NAME:
+        return FileTranscriptStorage(settings.directory)
+
+    raise ValueError(f"Unknown transcript storage backend: {name}")
+
+
+def collect_garbage(connection: Connection, min_age: float = DEFAULT_GC_MIN_AGE) -> int:
+    """
+    Delete the transcript files of deleted or re-imported interviews.
+
+    Args:
+        connection (Connection): Database connection.
+        min_age (float): Seconds since the last write before a file can be deleted.
+
+    Returns:
+        int: Number of deleted files.
+    """
+    rows = connection.execute(
+        text(
+            "SELECT DISTINCT content_hash FROM interviews WHERE storage_backend = :backend"
+        ),
+        {"backend": FileTranscriptStorage.NAME},
+    )
+    storage = FileTranscriptStorage(Settings().transcript_storage.directory)
+    return storage.delete_unreferenced({row.content_hash for row in rows}, min_age)
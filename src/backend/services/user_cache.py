@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from redis.asyncio import Redis
+
+INVALIDATION_CHANNEL = "user-cache:invalidate"
+
+
+class UserIdCache:
+    """
+    In-process cache of which user IDs exist, so `validate_user_header` doesn't
+    query the users table on every request.
+
+    Known IDs are kept for `ttl` seconds, unknown IDs for `negative_ttl` seconds,
+    so requests with made-up IDs don't reach the database either. The cache
+    holds at most `max_size` IDs and evicts the least recently used ones.
+
+    The user router invalidates IDs it creates, updates or deletes. With Redis
+    configured, invalidations are published so the other workers drop the ID too.
+    Without Redis, only the worker that handled the write drops the ID: on the
+    other workers a deleted user stays known for up to `ttl` seconds, and a
+    created user stays unknown for up to `negative_ttl` seconds.
+
+    A lookup that started before an invalidation may finish after it with the
+    old state of the users table, so `put` only stores results of lookups that
+    started after the last invalidation, see `get_generation`.
+    """
+
+    def __init__(self):
+        self.entries: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self.ttl = 300.0
+        self.negative_ttl = 30.0
+        self.max_size = 10_000
+        self.generation = 0
+        self.redis: Optional[Redis] = None
+        self.listener: Optional[asyncio.Task] = None
+
+    def start(
+        self,
+        ttl: float,
+        negative_ttl: float,
+        max_size: int,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        if redis_url:
+            self.redis = Redis.from_url(redis_url, decode_responses=True)
+            self.listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.cancel()
+            await asyncio.gather(self.listener, return_exceptions=True)
+            self.listener = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    def get(self, user_id: str) -> Optional[bool]:
+        """
+        Get whether a user exists, if it is cached.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            Optional[bool]: Whether the user exists, None if it isn't cached.
+        """
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, exists = entry
+        if expires_at <= time.monotonic():
+            del self.entries[user_id]
+            return None
+
+        self.entries.move_to_end(user_id)
+        return exists
+
+    def get_generation(self) -> int:
+        """
+        Get the number of invalidations so far, to be passed to `put` with the
+        result of a lookup that starts now.
+
+        Returns:
+            int: Invalidation generation.
+        """
+        return self.generation
+
+    def put(self, user_id: str, exists: bool, generation: Optional[int] = None) -> None:
+        """
+        Cache whether a user exists.
+
+        Args:
+            user_id (str): User ID.
+            exists (bool): Whether the user exists.
+            generation (Optional[int]): Generation from before the lookup, the
+                result is dropped if an invalidation happened since.
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        ttl = self.ttl if exists else self.negative_ttl
+        self.entries[user_id] = (time.monotonic() + ttl, exists)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def discard(self, user_id: str) -> None:
+        self.generation += 1
+        self.entries.pop(user_id, None)
+
+    async def invalidate(self, user_id: str) -> None:
+        """
+        Drop a user ID from the cache of this and, with Redis, all other workers.
+
+        Args:
+            user_id (str): User ID.
+        """
+        self.discard(user_id)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, user_id)
+        except Exception as e:
+            print(f"[Users] Could not publish the invalidation of {user_id}: {str(e)}")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # Invalidations may have been missed while disconnected
+                    self.generation += 1
+                    self.entries.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.discard(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Users] Cache invalidation listener failed: {str(e)}")
+                await asyncio.sleep(5)
+
+
+user_id_cache = UserIdCache()
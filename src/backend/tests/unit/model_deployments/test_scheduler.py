@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from backend.model_deployments.scheduler import Priority, TGIScheduler, Ticket
+
+
+@pytest.mark.asyncio
+async def test_wait_for_slot_admitted_between_positions():
+    scheduler = TGIScheduler(max_in_flight=1, user_rate=100.0, user_burst=100)
+    first = scheduler.ticket("user", "basic", Priority.CHAT)
+    async for _ in scheduler.wait_for_slot(first):
+        pass
+
+    second = scheduler.ticket("user", "basic", Priority.CHAT)
+    positions = scheduler.wait_for_slot(second)
+    assert await positions.__anext__() == 1
+
+    # Admitted while the consumer is between two positions
+    scheduler.release(first)
+    assert second.state == Ticket.ADMITTED
+
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(positions.__anext__(), timeout=1)
+    scheduler.release(second)
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_slot_reports_position_changes():
+    scheduler = TGIScheduler(max_in_flight=1, user_rate=100.0, user_burst=100)
+    running = scheduler.ticket("user", "basic", Priority.CHAT)
+    async for _ in scheduler.wait_for_slot(running):
+        pass
+
+    search = scheduler.ticket("user", "zitatki", Priority.SEARCH)
+    search_positions = scheduler.wait_for_slot(search)
+    assert await search_positions.__anext__() == 1
+
+    chat = scheduler.ticket("user", "basic", Priority.CHAT)
+    chat_positions = scheduler.wait_for_slot(chat)
+    assert await chat_positions.__anext__() == 1
+    assert await asyncio.wait_for(search_positions.__anext__(), timeout=1) == 2
+
+    scheduler.release(running)
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(chat_positions.__anext__(), timeout=1)
+    assert search.state == Ticket.WAITING
+
+    scheduler.release(chat)
+    scheduler.release(search)
+    await search_positions.aclose()
+    await chat_positions.aclose()
@@ -0,0 +1,176 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import backend.model_deployments.tgi as tgi
+from backend.model_deployments.scheduler import Priority, TGIScheduler
+from backend.model_deployments.tgi import TGIDeployment, get_chat_flight_key
+from backend.schemas.chat import FinishReason, SalonChatRequest, StreamEvent
+from backend.schemas.citation import CitationList
+from backend.schemas.interview import Interview
+from backend.services import completion_cache as cache_module
+from backend.services.completion_cache import completion_cache
+from backend.services.retrieval_session import RetrievalSessionCache
+
+
+def get_request(text: str, content_hash: str | None) -> SalonChatRequest:
+    return SalonChatRequest(
+        agent_id="zitatki",
+        message="Wie erleben die Befragten ihren Arbeitsweg?",
+        study_id="study",
+        interviews=[
+            Interview(
+                id="interview",
+                title="TI_01",
+                interview_type="TI",
+                study_id="study",
+                content_hash=content_hash,
+                text=text,
+            )
+        ],
+    )
+
+
+def test_chat_flight_key_uses_content_hash():
+    key = get_chat_flight_key(get_request("I: Frage\nB: Antwort", "hash"))
+    assert key == get_chat_flight_key(get_request("", "hash"))
+    assert key != get_chat_flight_key(get_request("", "other hash"))
+    # Interviews without a content hash are keyed by their text
+    assert get_chat_flight_key(
+        get_request("I: Frage\nB: Antwort", None)
+    ) != get_chat_flight_key(get_request("I: Frage\nB: Andere Antwort", None))
+
+
+@pytest.mark.asyncio
+async def test_users_attached_to_one_flight_use_their_own_quota(monkeypatch):
+    scheduler = TGIScheduler(max_in_flight=1, user_rate=0.001, user_burst=1)
+    monkeypatch.setattr(tgi, "get_scheduler", lambda: scheduler)
+    release = asyncio.Event()
+    started_by = []
+
+    async def handle_search(chat_request, user_id=""):
+        started_by.append(user_id)
+        async with scheduler.slot(user_id, chat_request.agent_id, Priority.SEARCH):
+            await release.wait()
+            yield {"event_type": StreamEvent.TEXT_GENERATION, "text": "Zitat"}
+
+    deployment = TGIDeployment(registry=object())
+    monkeypatch.setattr(deployment, "handle_search", handle_search)
+    request = get_request("I: Frage\nB: Antwort", "hash")
+
+    async def collect(user_id):
+        return [
+            event["event_type"]
+            async for event in deployment.invoke_chat_stream(request, user_id)
+        ]
+
+    first = asyncio.create_task(collect("first user"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(collect("second user"))
+    await asyncio.sleep(0.01)
+    release.set()
+    events = await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+    # One generation, started by the first user
+    assert started_by == ["first user"]
+    assert events[0] == events[1]
+    assert StreamEvent.TEXT_GENERATION in events[1]
+    # Both users paid a token of their own bucket
+    assert scheduler.user_buckets["first user"].tokens < 1
+    assert scheduler.user_buckets["second user"].tokens < 1
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+@pytest.mark.asyncio
+async def test_cached_chat_replays_finish_reason(monkeypatch):
+    monkeypatch.setattr(completion_cache, "redis", FakeRedis())
+    monkeypatch.setattr(completion_cache, "agents", ["basic"])
+    monkeypatch.setattr(
+        tgi,
+        "get_scheduler",
+        lambda: TGIScheduler(max_in_flight=1, user_rate=1, user_burst=10),
+    )
+    generated = []
+
+    async def stream_chat_choices(messages, affinity_key=None):
+        generated.append(messages)
+        yield SimpleNamespace(delta=SimpleNamespace(content="Ab"), finish_reason=None)
+        yield SimpleNamespace(
+            delta=SimpleNamespace(content="gebrochen"), finish_reason="length"
+        )
+
+    deployment = TGIDeployment(registry=object())
+    monkeypatch.setattr(deployment, "stream_chat_choices", stream_chat_choices)
+    request = SalonChatRequest(agent_id="basic", message="Fasse zusammen")
+
+    async def collect():
+        return [
+            event
+            async for event in deployment.invoke_chat_stream(request, "user")
+            if event["event_type"]
+            in (StreamEvent.TEXT_GENERATION, StreamEvent.STREAM_END)
+        ]
+
+    generated_events = await collect()
+    cached_events = await collect()
+
+    assert len(generated) == 1
+    assert cached_events == generated_events
+    assert generated_events[-1]["finish_reason"] == FinishReason.MAX_TOKENS
+
+
+def test_hit_ratio_ignores_failed_lookups(monkeypatch):
+    monkeypatch.setattr(
+        cache_module.cache_lookups,
+        "values",
+        {("chat", "hit"): 3.0, ("chat", "miss"): 1.0, ("chat", "error"): 4.0},
+    )
+    assert cache_module.get_hit_ratio() == 0.75
+
+
+@pytest.mark.asyncio
+async def test_search_reuses_results_of_the_conversation(monkeypatch):
+    monkeypatch.setattr(
+        tgi,
+        "get_scheduler",
+        lambda: TGIScheduler(max_in_flight=1, user_rate=1, user_burst=10),
+    )
+    monkeypatch.setattr(tgi, "retrieval_sessions", RetrievalSessionCache())
+    searched = []
+
+    async def generate_json(prompt, model, affinity_key=None):
+        searched.append(affinity_key)
+        return CitationList(zitate=[])
+
+    deployment = TGIDeployment(registry=object())
+    monkeypatch.setattr(deployment, "generate_json", generate_json)
+    request = get_request("I: Frage\nB: Antwort", "hash")
+    request.study_id = None
+    request.conversation_id = "conversation"
+    session = tgi.retrieval_sessions.get_session("conversation")
+    session.interviews["interview"] = (None, request.interviews[0])
+
+    async def search():
+        return [
+            event["search_results"]
+            async for event in deployment.handle_search(request, "user")
+            if event["event_type"] == StreamEvent.SEARCH_RESULTS
+        ]
+
+    assert await search() == await search()
+    assert searched == ["interview"]
+
+    request.message = "Und auf dem Heimweg?"
+    await search()
+    assert searched == ["interview", "interview"]
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import backend.services.chat as chat_service
+from backend.database_models.message import Message, MessageAgent
+from backend.schemas.chat import FinishReason, StreamEvent
+from backend.services.compute import ComputeSaturatedError
+
+
+@pytest.mark.asyncio
+async def test_generate_chat_stream_ends_with_error(monkeypatch):
+    stored = []
+    monkeypatch.setattr(
+        chat_service,
+        "update_conversation_after_turn",
+        lambda session, message, *args: stored.append(message),
+    )
+
+    async def deployment_stream():
+        yield {"event_type": StreamEvent.STREAM_START, "generation_id": "generation"}
+        yield {"event_type": StreamEvent.TEXT_GENERATION, "text": "Partial"}
+        raise ComputeSaturatedError()
+
+    response_message = Message(
+        id="message", text="", position=1, agent=MessageAgent.CHATBOT
+    )
+    events = [
+        json.loads(event)
+        async for event in chat_service.generate_chat_stream(
+            None, deployment_stream(), response_message, "user", "conversation"
+        )
+    ]
+
+    assert [event["event"] for event in events] == [
+        StreamEvent.STREAM_START,
+        StreamEvent.TEXT_GENERATION,
+        StreamEvent.STREAM_END,
+    ]
+    stream_end = events[-1]["data"]
+    assert stream_end["finish_reason"] == FinishReason.ERROR
+    assert stream_end["error"] == str(ComputeSaturatedError())
+    assert stream_end["text"] == "Partial"
+    assert stored == [response_message]
+    assert response_message.finish_reason == FinishReason.ERROR
+    assert response_message.text == "Partial"
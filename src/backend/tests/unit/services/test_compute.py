@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+import backend.services.compute as compute
+from backend.services.compute import ComputeService
+
+
+def count_texts(texts: list[str], started: threading.Event, release: threading.Event):
+    started.set()
+    release.wait(timeout=5)
+    return len(texts)
+
+
+@pytest.fixture
+def service():
+    service = ComputeService()
+    service.executor = ThreadPoolExecutor(max_workers=1)
+    service.max_pending = 2
+    yield service
+    service.executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_submit_releases_pending_if_shared_memory_fails(service, monkeypatch):
+    def fail(texts):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(compute, "SharedTexts", fail)
+
+    with pytest.raises(OSError):
+        await service.submit(len, texts=["Transkript"])
+    assert service.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_keeps_shared_memory_until_the_task_finished(
+    service, monkeypatch
+):
+    created = []
+    shared_texts = compute.SharedTexts
+
+    def create_shared_texts(texts):
+        created.append(shared_texts(texts))
+        return created[-1]
+
+    monkeypatch.setattr(compute, "SharedTexts", create_shared_texts)
+    started, release = threading.Event(), threading.Event()
+
+    task = asyncio.create_task(
+        service.submit(count_texts, started, release, texts=["Transkript"])
+    )
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The worker still runs, so the block must still exist
+    SharedMemory(name=created[0].memory.name).close()
+
+    release.set()
+    await asyncio.to_thread(service.executor.shutdown, True)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=created[0].memory.name)
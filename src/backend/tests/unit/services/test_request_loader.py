@@ -0,0 +1,91 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.database_models import get_session
+from backend.database_models.base import Base, CustomFilterQuery
+from backend.database_models.conversation import Conversation
+from backend.database_models.user import User
+from backend.main import app
+from backend.schemas.chat import StreamEvent
+from backend.services.user_cache import user_id_cache
+
+# `backend.routers` exports the route functions under the module names
+chat_router = importlib.import_module("backend.routers.chat")
+
+
+class FakeDeployment:
+    async def invoke_chat_stream(self, chat_request, user_id=""):
+        yield {"event_type": StreamEvent.STREAM_START, "generation_id": ""}
+        yield {"event_type": StreamEvent.TEXT_GENERATION, "text": "Antwort"}
+        yield {"event_type": StreamEvent.STREAM_END, "finish_reason": "COMPLETE"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id="user", fullname="Forscherin"))
+        session.add(Conversation(id="conversation", user_id="user", agent_id="basic"))
+        session.commit()
+
+    def get_test_session():
+        with Session(engine, query_cls=CustomFilterQuery) as session:
+            yield session
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    monkeypatch.setattr(chat_router, "TGIDeployment", FakeDeployment)
+    app.dependency_overrides[get_session] = get_test_session
+    user_id_cache.entries.clear()
+    yield TestClient(app), statements
+    app.dependency_overrides.clear()
+
+
+def count_conversation_queries(statements: list[str]) -> int:
+    return sum(
+        1
+        for statement in statements
+        if statement.lstrip().startswith("SELECT")
+        and "FROM conversations" in statement
+    )
+
+
+def test_get_conversation_loads_conversation_once(client):
+    client, statements = client
+
+    response = client.get(
+        "/v1/conversations/conversation", headers={"User-Id": "user"}
+    )
+
+    assert response.status_code == 200
+    assert count_conversation_queries(statements) == 1
+
+
+def test_chat_stream_loads_conversation_once(client):
+    client, statements = client
+
+    response = client.post(
+        "/v1/chat-stream?agent_id=basic",
+        headers={"User-Id": "user"},
+        json={
+            "agent_id": "basic",
+            "message": "Worum geht es?",
+            "conversation_id": "conversation",
+        },
+    )
+
+    assert response.status_code == 200
+    assert StreamEvent.STREAM_END in response.text
+    assert count_conversation_queries(statements) == 1
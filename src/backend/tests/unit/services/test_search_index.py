@@ -0,0 +1,43 @@
+from backend.schemas.interview import InterviewChunk
+from backend.services import search_index
+from backend.services.search_index import build_study_index
+
+
+def get_index():
+    chunks = [
+        InterviewChunk(
+            interview_id=interview_id,
+            original_text=" ".join(tokens),
+            start_pos=0,
+            end_pos=len(" ".join(tokens)),
+            bm25_tokens=tokens,
+        )
+        for interview_id, tokens in [("a", ["fahrrad", "stadt"]), ("b", ["wett"])]
+    ]
+    return build_study_index("study", chunks)
+
+
+def test_search_without_query_tokens():
+    index = get_index()
+
+    assert index.search([]) == []
+    assert index.get_interview_scores([], ["a", "b"]) == {"a": 0.0, "b": 0.0}
+
+
+def test_search_with_query_tokens():
+    index = get_index()
+
+    results = index.search(["fahrrad"])
+
+    assert [chunk.interview_id for chunk, _ in results] == ["a"]
+
+
+def test_index_rebuilt_when_transcript_changes_in_place(tmp_path, monkeypatch):
+    monkeypatch.setenv("INGESTION_INDEX_DIR", str(tmp_path))
+    search_study = search_index.search_study
+
+    assert search_study(["Wir fahren Fahrrad."], "study", ["a"], "Fahrrad")
+    # Updated by the bulk import, which keeps the interview ID
+    assert not search_study(["Wir gehen zu Fuß."], "study", ["a"], "Fahrrad")
+    [(chunk, _)] = search_study(["Wir gehen zu Fuß."], "study", ["a"], "Fuß")
+    assert chunk.original_text == "Wir gehen zu Fuß."
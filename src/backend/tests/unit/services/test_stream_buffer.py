@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.schemas.chat import FinishReason, StreamEvent
+from backend.services.stream_buffer import StreamBuffer, StreamBufferRegistry
+
+
+@pytest.mark.asyncio
+async def test_subscribe_signals_dropped_events():
+    buffer = StreamBuffer("message", "user", "conversation", max_events=2)
+    for data in ("first", "second", "third"):
+        buffer.append(data)
+    buffer.finish()
+
+    events = [event async for event in buffer.subscribe()]
+
+    assert len(events) == 1
+    assert "id" not in events[0]
+    stream_end = json.loads(events[0]["data"])
+    assert stream_end["event"] == StreamEvent.STREAM_END
+    assert stream_end["data"]["finish_reason"] == FinishReason.ERROR
+
+
+@pytest.mark.asyncio
+async def test_failed_producer_publishes_error():
+    async def stream():
+        yield "first"
+        raise RuntimeError("Storing the response failed")
+
+    registry = StreamBufferRegistry()
+    buffer = registry.start("message", "user", "conversation", stream())
+    await asyncio.wait_for(buffer.producer, timeout=1)
+
+    events = [event async for event in buffer.subscribe()]
+
+    assert [event["id"] for event in events] == ["0", "1"]
+    stream_end = json.loads(events[1]["data"])["data"]
+    assert stream_end["finish_reason"] == FinishReason.ERROR
+    assert stream_end["error"] == "Storing the response failed"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_producer_without_grace_period():
+    generating = asyncio.Event()
+    closed = []
+
+    async def stream():
+        try:
+            yield "first"
+            generating.set()
+            await asyncio.sleep(60)
+            yield "second"
+        finally:
+            closed.append(True)
+
+    registry = StreamBufferRegistry()
+    buffer = registry.start("message", "user", "conversation", stream())
+    buffer.resume_grace_period = 0
+
+    subscriber = buffer.subscribe()
+    await subscriber.__anext__()
+    await generating.wait()
+    await subscriber.aclose()
+
+    await asyncio.wait_for(buffer.producer, timeout=1)
+    assert closed
+    assert [data for _, data in buffer.events] == ["first"]
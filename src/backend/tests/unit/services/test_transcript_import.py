@@ -0,0 +1,18 @@
+import csv
+import io
+
+from backend.services.transcript_import import format_csv_row
+
+
+def test_format_csv_row_keeps_empty_strings_apart_from_null():
+    line = format_csv_row(("id", "", None, 3, 'Sie sagte "ja"\nund ging.'))
+
+    # COPY reads unquoted empty values as NULL and quoted ones as empty strings
+    assert line.startswith('"id","",,3,')
+    assert next(csv.reader(io.StringIO(line))) == [
+        "id",
+        "",
+        "",
+        "3",
+        'Sie sagte "ja"\nund ging.',
+    ]
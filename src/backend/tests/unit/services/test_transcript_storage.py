@@ -0,0 +1,47 @@
+import os
+import time
+
+import backend.database_models.interview as interview_model
+from backend.database_models.interview import Interview
+from backend.services.transcript_storage import (
+    FileTranscriptStorage,
+    InlineTranscriptStorage,
+)
+
+
+def test_text_is_decoded_once_until_it_changes(monkeypatch):
+    decoded = []
+
+    class CountingStorage(InlineTranscriptStorage):
+        def decode(self, interview):
+            decoded.append(interview.content_hash)
+            return super().decode(interview)
+
+    monkeypatch.setattr(
+        interview_model, "get_transcript_storage", lambda name=None: CountingStorage()
+    )
+    interview = Interview(title="Interview 1", interview_type="Einzel", study_id="s")
+
+    interview.text = "Erste Fassung"
+    assert interview.text == interview.text == "Erste Fassung"
+    interview.text = "Zweite Fassung"
+    assert interview.text == interview.text == "Zweite Fassung"
+
+    # Once per version of the text
+    assert len(decoded) == 2
+
+
+def test_delete_unreferenced_keeps_referenced_and_recent_files(tmp_path):
+    storage = FileTranscriptStorage(str(tmp_path))
+    referenced = storage.encode("Noch verwendet")["content_hash"]
+    replaced = storage.encode("Ersetzt")["content_hash"]
+    recent = storage.encode("Gerade importiert")["content_hash"]
+
+    an_hour_ago = time.time() - 7200
+    for content_hash in (referenced, replaced):
+        os.utime(storage.get_path(content_hash), (an_hour_ago, an_hour_ago))
+
+    assert storage.delete_unreferenced({referenced}) == 1
+    assert storage.get_path(referenced).exists()
+    assert not storage.get_path(replaced).exists()
+    assert storage.get_path(recent).exists()
@@ -0,0 +1,18 @@
+import pytest
+
+from backend.services.user_cache import UserIdCache
+
+
+@pytest.mark.asyncio
+async def test_lookup_started_before_invalidation_is_not_cached():
+    cache = UserIdCache()
+
+    # A request looks up the user while it is being created
+    generation = cache.get_generation()
+    await cache.invalidate("user")
+    cache.put("user", False, generation)
+    assert cache.get("user") is None
+
+    generation = cache.get_generation()
+    cache.put("user", True, generation)
+    assert cache.get("user") is True